@@ -0,0 +1,256 @@
+"""
+``d2lfg.d2core.data.gamedata``
+==============================
+
+This module contains :py:class:`Diablo2GameData`, which gives access to
+all of the .txt tables in a game data directory, or in a zip or tar
+archive of one.
+
+Tables are parsed the first time they are used and kept for later use,
+so a script only pays for the tables it reads, and never parses a table
+twice.
+"""
+
+from pathlib import Path, PurePath
+from threading import Lock
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    overload,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ...error import DataLookupError
+from .txt import Diablo2TxtFile, Diablo2TxtParser
+from .txtcache import Diablo2TxtParseCache
+from .txtarchive import find_txt_archive_tables, is_txt_archive, load_txt_archive
+from .txtdir import find_txt_tables, load_txt_directory
+
+_T = TypeVar("_T")
+
+
+class Diablo2GameData(Mapping[str, Diablo2TxtFile]):
+    """
+    The .txt tables in a game data directory or archive, by table name.
+
+    Table names are those of
+    :py:func:`~d2lfg.d2core.data.txtdir.find_txt_tables` (e.g.
+    ``"Weapons"`` for ``Weapons.txt``) and are looked up case
+    insensitively. The directory is listed on first use. Each table is
+    parsed the first time it is looked up; iterating over the tables'
+    names does not parse them, but iterating over their values does.
+
+    Tables may be looked up from several threads; each is parsed once.
+
+    If ``directory`` is a zip or tar archive (see
+    :py:mod:`~d2lfg.d2core.data.txtarchive`), tables are read straight out
+    of it. A tar archive can only be read front to back, so each table
+    looked up reads the archive up to that table; use :py:meth:`preload`
+    to read several tables in one pass.
+
+    :param directory: the directory containing the .txt files, or an \
+        archive of them
+    :param parser: the parser to parse tables with
+    :param cache: if given, tables in a directory are parsed through this \
+        cache instead of with ``parser``; tables in an archive are always \
+        parsed with ``parser``
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        parser: Optional[Diablo2TxtParser] = None,
+        cache: Optional[Diablo2TxtParseCache] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.parser = Diablo2TxtParser() if parser is None else parser
+        self.cache = cache
+        self._listing: Optional[Tuple[bool, Dict[str, PurePath], Dict[str, str]]] = None
+        self._tables: Dict[str, Diablo2TxtFile] = dict()
+        self._lock = Lock()
+        self._table_locks: Dict[str, Lock] = dict()
+
+    @property
+    def paths(self) -> Mapping[str, PurePath]:
+        """
+        The path of each table, by table name. For an archive, these are
+        the paths of its members within the archive.
+        """
+        return self._list()[1]
+
+    @property
+    def names(self) -> Mapping[str, str]:
+        """
+        The name of each table, by :py:meth:`~str.casefold` ed name.
+        """
+        return self._list()[2]
+
+    @property
+    def loaded(self) -> Mapping[str, Diablo2TxtFile]:
+        """
+        The tables that have been parsed so far, by table name.
+        """
+        with self._lock:
+            return dict(self._tables)
+
+    def __getitem__(self, table: str) -> Diablo2TxtFile:
+        """
+        Returns a table, parsing it if it has not been parsed yet.
+
+        :param table: the name of the table; case insensitive
+        :raises DataLookupError: if there is no such table
+        """
+        name = self._name(table)
+        txt_file = self._tables.get(name)
+        if txt_file is not None:
+            return txt_file
+
+        with self._lock:
+            lock = self._table_locks.setdefault(name, Lock())
+        # Tables are parsed under their own lock, so that other tables
+        # can be parsed at the same time.
+        with lock:
+            txt_file = self._tables.get(name)
+            if txt_file is None:
+                txt_file = self._parse(name)
+                with self._lock:
+                    self._tables[name] = txt_file
+        return txt_file
+
+    def __contains__(self, table: object) -> bool:
+        """
+        Returns whether a table exists, without parsing it.
+
+        :param table: the name of the table; case insensitive
+        """
+        return isinstance(table, str) and table.casefold() in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yields the name of each table.
+        """
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tables.
+        """
+        return len(self.paths)
+
+    @overload
+    def get(self, table: str) -> Optional[Diablo2TxtFile]:
+        ...
+
+    @overload
+    def get(
+        self, table: str, default: Union[Diablo2TxtFile, _T]
+    ) -> Union[Diablo2TxtFile, _T]:
+        ...
+
+    def get(self, table: str, default: object = None) -> object:
+        """
+        Returns a table, or ``default`` if there is no such table.
+
+        :param table: the name of the table; case insensitive
+        :param default: the value to return if there is no such table
+        """
+        return self[table] if table in self else default
+
+    def preload(
+        self, tables: Optional[Iterable[str]] = None, max_workers: Optional[int] = None
+    ) -> None:
+        """
+        Parses several tables ahead of use, in parallel. Tables that have
+        already been parsed are not parsed again.
+
+        :param tables: the names of the tables to parse, case insensitive; \
+            if ``None``, all tables are parsed
+        :param max_workers: see \
+            :py:func:`~d2lfg.d2core.data.txtdir.load_txt_directory`
+        :raises DataLookupError: if a requested table does not exist
+        """
+        selected = list(self) if tables is None else [self._name(t) for t in tables]
+        missing = [name for name in selected if name not in self._tables]
+        if not missing:
+            return
+        loaded: Mapping[str, Diablo2TxtFile]
+        if self._list()[0]:
+            loaded = load_txt_archive(self.directory, self.parser, missing)
+        elif self.cache is not None or len(missing) <= 1:
+            for name in missing:
+                self[name]
+            return
+        else:
+            loaded = load_txt_directory(
+                self.directory, self.parser, missing, max_workers, use_processes=True
+            )
+        with self._lock:
+            for name, txt_file in loaded.items():
+                self._tables.setdefault(name, txt_file)
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """
+        Discards a parsed table, so that it is parsed again on its next
+        use. Without a table, discards all tables and lists the directory
+        again on next use.
+
+        :param table: the name of the table; case insensitive
+        :raises DataLookupError: if there is no such table
+        """
+        if table is None:
+            with self._lock:
+                self._listing = None
+                self._tables.clear()
+            return
+        name = self._name(table)
+        with self._lock:
+            self._tables.pop(name, None)
+
+    def _list(self) -> Tuple[bool, Dict[str, PurePath], Dict[str, str]]:
+        """
+        Lists the directory if it has not been listed yet, returning
+        whether it is an archive, the path of each table by name, and each
+        table's name by case folded name.
+        """
+        with self._lock:
+            if self._listing is None:
+                archive = is_txt_archive(self.directory)
+                paths: Dict[str, PurePath] = dict(
+                    find_txt_archive_tables(self.directory)
+                    if archive
+                    else find_txt_tables(self.directory)
+                )
+                names = {name.casefold(): name for name in paths}
+                self._listing = archive, paths, names
+            return self._listing
+
+    def _name(self, table: str) -> str:
+        """
+        Returns the name of a table as it is in the directory.
+
+        :param table: the name of the table; case insensitive
+        :raises DataLookupError: if there is no such table
+        """
+        name = self.names.get(table.casefold())
+        if name is None:
+            raise DataLookupError(f"{table}: no such txt table")
+        return name
+
+    def _parse(self, name: str) -> Diablo2TxtFile:
+        """
+        Parses a table.
+
+        :param name: the name of the table, as it is in the directory
+        """
+        archive, paths, _ = self._list()
+        if archive:
+            return load_txt_archive(self.directory, self.parser, [name])[name]
+        path = Path(paths[name])
+        if self.cache is not None:
+            return self.cache.parse(path)
+        return self.parser.parse(path)
@@ -11,11 +11,148 @@ the various .txt files and what their fields do.
 .. _Phrozen Keep File Guide: https://www.d2mods.info/forum/viewtopic.php?t=34455
 """
 
+from bisect import bisect_left
+import codecs
 from io import TextIOBase
+from itertools import islice
+import mmap
 from pathlib import Path
 import re
-from types import MappingProxyType
-from typing import Callable, List, Mapping, overload, Sequence, Union
+from types import MappingProxyType, ModuleType
+from typing import (
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    overload,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ...error import DataConversionError
+from .txtcolumntypes import Diablo2TxtColumnType, Diablo2TxtTypedColumn
+from .txtfilter import CompiledRowFilter, DEFAULT_ROW_FILTERS, Diablo2TxtRowFilter
+from .txtindex import (
+    Diablo2TxtHashIndex,
+    Diablo2TxtRangeIndex,
+    Diablo2TxtUniqueIndex,
+)
+from .txtintern import Diablo2TxtStringPool
+
+
+#: The text encoding used by Diablo 2 .txt files.
+DEFAULT_ENCODING = "windows-1252"
+
+#: The line ending used by Diablo 2 .txt files.
+DEFAULT_NEWLINE = "\r\n"
+
+#: A .txt file to parse: a file path, a text IO object, or a binary IO
+#: object such as a member of an archive. Binary IO objects are decoded
+#: as they are read.
+Diablo2TxtSource = Union[Path, str, TextIOBase, IO[bytes]]
+
+
+class Diablo2TxtLazyFields(Sequence[str]):
+    """
+    Sequence of the fields of one line of a .txt file, left undecoded in a
+    buffer such as a memory-mapped file.
+
+    Only the position of the line in the buffer is stored. The line is
+    decoded and split the first time one of its fields is read, and the
+    decoded fields are kept from then on.
+
+    :param buffer: the buffer containing the line
+    :param start: the offset of the line in ``buffer``
+    :param end: the offset of the end of the line in ``buffer``, not \
+        including its line ending; if ``None``, the end of ``buffer``
+    :param encoding: the encoding used to decode fields
+    :param keep: the ascending indices of the line's fields that are in \
+        the sequence; if ``None``, all of its fields are
+    :param length: the number of fields in the sequence, if already known
+    """
+
+    __slots__ = ("buffer", "start", "end", "encoding", "keep", "_length", "_decoded")
+
+    def __init__(
+        self,
+        buffer: Union[bytes, mmap.mmap],
+        start: int = 0,
+        end: Optional[int] = None,
+        encoding: str = DEFAULT_ENCODING,
+        keep: Optional[Sequence[int]] = None,
+        length: Optional[int] = None,
+    ) -> None:
+        self.buffer = buffer
+        self.start = start
+        self.end = len(buffer) if end is None else end
+        self.encoding = encoding
+        self.keep = keep
+        if length is None:
+            length = buffer[start : self.end].count(b"\t") + 1
+            if keep is not None:
+                length = bisect_left(keep, length)
+        self._length = length
+        self._decoded: Optional[List[str]] = None
+
+    @overload
+    def __getitem__(self, i: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, Sequence[str]]:
+        """
+        Returns the decoded field at the given index, or a list of decoded
+        fields if given a slice.
+
+        :param i: the index or slice to fetch
+        """
+        decoded = self._decoded
+        if decoded is None:
+            decoded = self._decoded = self._decode()
+        return decoded[i]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of fields.
+        """
+        return self._length
+
+    def __repr__(self) -> str:
+        """
+        Returns a representation of the fields as a string.
+        """
+        return repr(list(self))
+
+    def line(self) -> bytes:
+        """
+        Returns the whole undecoded line, including any fields that are not
+        in the sequence.
+        """
+        return self.buffer[self.start : self.end]
+
+    def _decode(self) -> List[str]:
+        """
+        Decodes and splits the line.
+        """
+        decoded = self.line().decode(self.encoding).split("\t")
+        if self.keep is not None:
+            decoded = [decoded[i] for i in self.keep[: self._length]]
+        return decoded
 
 
 class Diablo2TxtRecord(Sequence[str], Mapping[str, str]):
@@ -27,6 +164,8 @@ class Diablo2TxtRecord(Sequence[str], Mapping[str, str]):
     :param data: the row as a sequence; each element contains one field
     """
 
+    __slots__ = ("fields", "data")
+
     def __init__(self, fields: Mapping[str, int], data: Sequence[str]) -> None:
         self.fields = fields
         self.data = data
@@ -60,7 +199,10 @@ class Diablo2TxtRecord(Sequence[str], Mapping[str, str]):
         """
         if not isinstance(other, Diablo2TxtRecord):
             return False
-        return self.data == other.data and self.fields == other.fields
+        # Record data may be any sequence type (e.g. a list or
+        # Diablo2TxtLazyFields), so compare the values rather than
+        # the containers.
+        return tuple(self.data) == tuple(other.data) and self.fields == other.fields
 
     def __len__(self) -> int:
         """
@@ -76,21 +218,393 @@ class Diablo2TxtRecord(Sequence[str], Mapping[str, str]):
         return repr({f"{v}/{k}": self.data[v] for k, v in self.fields.items()})
 
 
+class Diablo2CompactTxtRecord(Diablo2TxtRecord):
+    """
+    A :py:class:`Diablo2TxtRecord` whose data is stored in a :py:class:`tuple`.
+
+    Compact records are immutable and hashable. Pass this class as the
+    ``record_type`` of a :py:class:`Diablo2TxtParser` to produce them.
+
+    :param fields: see :py:class:`Diablo2TxtRecord`
+    :param data: see :py:class:`Diablo2TxtRecord`; it is copied into a \
+        :py:class:`tuple`, decoding any lazily decoded fields
+    """
+
+    __slots__ = ()
+
+    def __init__(self, fields: Mapping[str, int], data: Sequence[str]) -> None:
+        super().__init__(fields, tuple(data))
+
+    def __hash__(self) -> int:
+        """
+        Returns a hash of the record's data.
+        """
+        return hash(self.data)
+
+
+class Diablo2TxtColumnAccessor:
+    """
+    A column name resolved to a field index, for fast repeated access
+    to the same column of many records.
+
+    Calling the accessor with a record returns that record's value in the
+    column. Unlike ``record[name]``, this does no case folding or field
+    lookup, so the accessor must only be used with records that share the
+    fields it was resolved against.
+
+    :param fields: the fields of the records the accessor will be used with
+    :param name: the name of the column; case insensitive
+    """
+
+    __slots__ = ("name", "index")
+
+    def __init__(self, fields: Mapping[str, int], name: str) -> None:
+        self.name = name
+        self.index = fields[name.casefold()]
+
+    def __call__(self, record: Diablo2TxtRecord) -> str:
+        """
+        Returns the record's value in this accessor's column.
+
+        :param record: the record to read from
+        """
+        return record.data[self.index]
+
+    def __repr__(self) -> str:
+        """
+        Returns a representation of the accessor as a string.
+        """
+        return f"{type(self).__name__}({self.name!r} -> {self.index})"
+
+
 class Diablo2TxtFile:
     """
     Object representing a Diablo 2 .txt file.
+
+    :param path: path to the file the records were read from
+    :param records: the records in the file; all records should share \
+        the same fields
+    :param fields: the fields of the records; if not given, they are \
+        taken from the first record
+    :param header: the column names as they appear in the file's header, \
+        including duplicates; if not given, they are taken from ``fields``
+    :param newline: the line ending used by the file
     """
 
     def __init__(
-        self, path: Union[None, str, Path], records: Sequence[Diablo2TxtRecord]
+        self,
+        path: Union[None, str, Path],
+        records: Sequence[Diablo2TxtRecord],
+        fields: Optional[Mapping[str, int]] = None,
+        header: Optional[Sequence[str]] = None,
+        newline: str = DEFAULT_NEWLINE,
     ):
         if isinstance(path, str):
             self.path: Union[None, str, Path] = Path(path)
         else:
             self.path = path
 
+        if fields is None:
+            fields = records[0].fields if records else MappingProxyType({})
+        self.fields = fields
+        if header is None:
+            header = sorted(fields, key=fields.__getitem__)
+        self.header = header
+        self.newline = newline
+        self._cache: Dict[Hashable, Any] = dict()
         self.records = records
 
+    @property
+    def records(self) -> Sequence[Diablo2TxtRecord]:
+        """
+        The records in the file.
+
+        Assigning new records discards anything derived from the old
+        ones, like typed columns and indexes. If the records are changed
+        in place, call :py:meth:`invalidate` instead.
+        """
+        return self._records
+
+    @records.setter
+    def records(self, records: Sequence[Diablo2TxtRecord]) -> None:
+        self._records = records
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Discards everything derived from this file's records, like typed
+        columns and indexes. They will be rebuilt when they are next used.
+        """
+        self._cache.clear()
+
+    def fingerprints(self) -> Sequence[int]:
+        """
+        Returns a fingerprint of each record's data, in record order.
+
+        Records with equal data have equal fingerprints; records with
+        different data almost certainly do not. Fingerprints are computed
+        the first time they are requested and cached until the records
+        change. They are only comparable within a single process.
+        """
+        fingerprints: Optional[Sequence[int]] = self._cache.get("fingerprints")
+        if fingerprints is None:
+            fingerprints = [hash(tuple(r.data)) for r in self.records]
+            self._cache["fingerprints"] = fingerprints
+        return fingerprints
+
+    def accessor(self, name: str) -> Diablo2TxtColumnAccessor:
+        """
+        Resolves a column name into a :py:class:`Diablo2TxtColumnAccessor`
+        for this file's records.
+
+        :param name: the name of the column; case insensitive
+        """
+        return Diablo2TxtColumnAccessor(self.fields, name)
+
+    def column(self, name: str) -> Sequence[str]:
+        """
+        Returns every value in the given column, in record order. Records
+        that end before the column (see :py:func:`skip_record`) have an
+        empty value.
+
+        :param name: the name of the column; case insensitive
+        """
+        i = self.fields[name.casefold()]
+        return [r.data[i] if i < len(r.data) else "" for r in self.records]
+
+    @overload
+    def index(
+        self, name: str, unique: Literal[False] = False
+    ) -> Diablo2TxtHashIndex[Diablo2TxtRecord]:
+        ...
+
+    @overload
+    def index(
+        self, name: str, unique: Literal[True]
+    ) -> Diablo2TxtUniqueIndex[Diablo2TxtRecord]:
+        ...
+
+    def index(
+        self, name: str, unique: bool = False
+    ) -> Diablo2TxtHashIndex[Diablo2TxtRecord]:
+        """
+        Returns a hash index over the given column, for fast lookups of the
+        records with a given value.
+
+        The index is built the first time it is requested and cached until
+        the records change.
+
+        :param name: the name of the column; case insensitive
+        :param unique: if ``True``, returns a \
+            :py:class:`~d2lfg.d2core.data.txtindex.Diablo2TxtUniqueIndex`, \
+            which maps each value to a single record
+        :raises DuplicateKeyError: if ``unique`` is ``True`` and a value \
+            appears more than once
+        """
+        index_type = Diablo2TxtUniqueIndex if unique else Diablo2TxtHashIndex
+        key = ("index", name.casefold(), unique)
+        index = self._cache.get(key)
+        if index is None:
+            index = index_type.build(self.records, self.column(name))
+            self._cache[key] = index
+        return index
+
+    def cached_index(
+        self, name: str
+    ) -> Optional[Diablo2TxtHashIndex[Diablo2TxtRecord]]:
+        """
+        Returns a hash index over the given column if one has already been
+        built, or ``None`` otherwise. A unique index is preferred.
+
+        :param name: the name of the column; case insensitive
+        """
+        for unique in (True, False):
+            index: Optional[Diablo2TxtHashIndex[Diablo2TxtRecord]] = self._cache.get(
+                ("index", name.casefold(), unique)
+            )
+            if index is not None:
+                return index
+        return None
+
+    def range_index(
+        self, name: str, column_type: Optional[Diablo2TxtColumnType] = None
+    ) -> Diablo2TxtRangeIndex[Diablo2TxtRecord]:
+        """
+        Returns a sorted index over the given integer column, for fast range
+        and top-k queries.
+
+        The index is built from :py:meth:`typed_column` the first time it
+        is requested and cached until the records change.
+
+        :param name: the name of the column; case insensitive
+        :param column_type: see :py:meth:`typed_column`; if not given, \
+            :py:meth:`column_type` is used
+        :raises DataConversionError: if the column cannot be converted
+        """
+        if column_type is None:
+            column_type = self.column_type(name)
+            if column_type is None:
+                # Raises the conversion error.
+                self.typed_column(name)
+        key = ("range_index", name.casefold(), column_type)
+        index: Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]] = self._cache.get(key)
+        if index is None:
+            values = self.typed_column(name, column_type)
+            index = Diablo2TxtRangeIndex.build(self.records, values)
+            self._cache[key] = index
+        return index
+
+    def cached_range_index(
+        self, name: str, column_type: Optional[Diablo2TxtColumnType] = None
+    ) -> Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]]:
+        """
+        Returns a sorted index over the given column if one has already been
+        built, or ``None`` otherwise.
+
+        :param name: the name of the column; case insensitive
+        :param column_type: the type the index was built with; if not \
+            given, an index of integers is returned, preferring one built \
+            with :py:attr:`~Diablo2TxtColumnType.INT`
+        """
+        folded = name.casefold()
+        types = (
+            (Diablo2TxtColumnType.INT, Diablo2TxtColumnType.OPTIONAL_INT)
+            if column_type is None
+            else (column_type,)
+        )
+        for t in types:
+            index: Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]] = self._cache.get(
+                ("range_index", folded, t)
+            )
+            if index is not None:
+                return index
+        return None
+
+    def column_type(self, name: str) -> Optional[Diablo2TxtColumnType]:
+        """
+        Returns the type of the given column as inferred by
+        :py:meth:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtColumnType.infer`,
+        or ``None`` if the column is not numeric.
+
+        The type is inferred the first time it is requested and cached
+        until the records change.
+
+        :param name: the name of the column; case insensitive
+        """
+        key = ("column_type", name.casefold())
+        if key in self._cache:
+            cached: Optional[Diablo2TxtColumnType] = self._cache[key]
+            return cached
+        column_type: Optional[Diablo2TxtColumnType]
+        try:
+            column_type = Diablo2TxtColumnType.infer(self.column(name))
+        except DataConversionError:
+            column_type = None
+        self._cache[key] = column_type
+        return column_type
+
+    def typed_column(
+        self, name: str, column_type: Optional[Diablo2TxtColumnType] = None
+    ) -> Diablo2TxtTypedColumn:
+        """
+        Returns the values in the given column converted to a
+        :py:class:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtTypedColumn`.
+
+        The column is converted the first time it is requested and cached
+        until the records change.
+
+        :param name: the name of the column; case insensitive
+        :param column_type: the type to convert the column to; if not \
+            given, it is inferred with \
+            :py:meth:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtColumnType.infer`
+        :raises DataConversionError: if the column cannot be converted
+        """
+        key = ("typed_column", name.casefold(), column_type)
+        typed = self._cache.get(key)
+        if typed is None:
+            values = self.column(name)
+            try:
+                if column_type is None:
+                    column_type = Diablo2TxtColumnType.infer(values)
+                typed = Diablo2TxtTypedColumn.from_strings(values, column_type)
+            except DataConversionError as e:
+                raise DataConversionError(f"column {name!r}: {e}") from None
+            self._cache[key] = typed
+        return typed
+
+
+class Diablo2TxtReader(Iterator[Diablo2TxtRecord]):
+    """
+    Reads the records of a Diablo 2 .txt file a few at a time.
+
+    Readers are created by :py:meth:`Diablo2TxtParser.reader`, which reads
+    the file's header. Close the reader (or use it as a context manager)
+    if it is not read to the end.
+
+    :param path: path to the file being read, if any
+    :param fields: the fields of the file's records
+    :param header: the column names as they appear in the file's header
+    :param newline: the line ending used by the file
+    :param records: an iterator over the file's records
+    """
+
+    def __init__(
+        self,
+        path: Union[None, str, Path],
+        fields: Mapping[str, int],
+        header: Sequence[str],
+        newline: str,
+        records: Iterator[Diablo2TxtRecord],
+    ) -> None:
+        self.path = path
+        self.fields = fields
+        self.header = header
+        self.newline = newline
+        self._records = records
+
+    def __next__(self) -> Diablo2TxtRecord:
+        """
+        Returns the next record.
+        """
+        return next(self._records)
+
+    def read(self, n: int = -1) -> List[Diablo2TxtRecord]:
+        """
+        Returns up to ``n`` more records. An empty list means the whole
+        file has been read.
+
+        :param n: the maximum number of records to read; if negative, all \
+            remaining records are read
+        """
+        if n < 0:
+            return list(self._records)
+        return list(islice(self._records, n))
+
+    def txt_file(self, records: Sequence[Diablo2TxtRecord]) -> Diablo2TxtFile:
+        """
+        Returns a :py:class:`Diablo2TxtFile` for the file being read.
+
+        :param records: the file's records, e.g. everything returned by \
+            :py:meth:`read`
+        """
+        return Diablo2TxtFile(
+            self.path, records, self.fields, self.header, self.newline
+        )
+
+    def close(self) -> None:
+        """
+        Stops reading, closing the file if the reader opened it.
+        """
+        close = getattr(self._records, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "Diablo2TxtReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
 
 #: Regular expression describing an empty Diablo 2 .txt file field.
 empty_field = re.compile(r"^\s*$")
@@ -116,8 +630,12 @@ def skip_record(record: Diablo2TxtRecord) -> bool:
     if len(record.data) < len(record.fields):
         return True
 
-    for v in record.data[1:]:
-        if not empty_field.match(v):
+    # islice avoids copying the record data and lets lazily decoded
+    # records stop decoding at the first non-empty field. Checking
+    # for whitespace with str methods is equivalent to matching
+    # empty_field, but much faster.
+    for v in islice(record.data, 1, None):
+        if v and not v.isspace():
             return False
 
     return True
@@ -130,32 +648,223 @@ class Diablo2TxtParser:
     :param skip_record: a :py:class:`~collections.abc.Callable` that accepts a \
         :py:class:`Diablo2TxtRecord` and returns ``True`` if it should be not \
         be included in the resulting :py:class:`Diablo2TxtFile`
+    :param encoding: the text encoding of parsed files
+    :param use_mmap: if ``True``, files given by path are memory-mapped, and \
+        each record only stores where its line is in the mapped file until \
+        one of its fields is read. See :py:class:`Diablo2TxtLazyFields`. The \
+        file stays mapped as long as any of its records do, so it must not \
+        be truncated in the meantime, and cannot be replaced on Windows.
+    :param record_type: the :py:class:`Diablo2TxtRecord` subclass to create \
+        records with, e.g. :py:class:`Diablo2CompactTxtRecord`
+    :param columns: the names of the columns to keep, case insensitive; if \
+        given, records only contain these columns. Names that are not in a \
+        file's header are ignored. The default ``skip_record`` still judges \
+        each row by all of its fields, so projecting does not change which \
+        rows are kept; any other ``skip_record`` only sees the kept columns.
+    :param filters: :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtRowFilter` \
+        objects that every kept row must satisfy. Filters are checked in order \
+        on each line before its record is created, so they are much cheaper \
+        than ``skip_record``; put the most selective filters first. To \
+        replace ``skip_record`` entirely, pass ``None`` for it and include \
+        :py:data:`~d2lfg.d2core.data.txtfilter.DEFAULT_ROW_FILTERS`.
+    :param string_pool: if given, every field value of the kept records is \
+        interned in this \
+        :py:class:`~d2lfg.d2core.data.txtintern.Diablo2TxtStringPool`, so \
+        that equal values share one object. Pools may be shared between \
+        parsers. With ``use_mmap``, fields are then decoded as soon as \
+        their line is read.
     """
 
     def __init__(
-        self, skip_record: Callable[[Diablo2TxtRecord], bool] = skip_record
+        self,
+        skip_record: Optional[Callable[[Diablo2TxtRecord], bool]] = skip_record,
+        encoding: str = DEFAULT_ENCODING,
+        use_mmap: bool = False,
+        record_type: Type[Diablo2TxtRecord] = Diablo2TxtRecord,
+        columns: Optional[Iterable[str]] = None,
+        filters: Iterable[Diablo2TxtRowFilter] = (),
+        string_pool: Optional[Diablo2TxtStringPool] = None,
     ) -> None:
         self.skip_record = skip_record
+        self.encoding = encoding
+        self.use_mmap = use_mmap
+        self.record_type = record_type
+        self.columns: Optional[FrozenSet[str]] = None
+        if columns is not None:
+            self.columns = frozenset(c.casefold() for c in columns)
+        self.filters = tuple(filters)
+        self.string_pool = string_pool
+
+    def cache_key(self) -> Optional[str]:
+        """
+        Returns a string identifying the parser settings that affect which
+        records :py:meth:`parse` produces and what they contain.
+
+        Returns ``None`` if the settings cannot be identified reliably; for
+        example, if :py:attr:`skip_record` is a lambda or a nested function.
+        """
+        skip: Optional[str] = "none"
+        if self.skip_record is not None:
+            skip = _callable_identity(self.skip_record)
+        if skip is None:
+            return None
+        columns = "*" if self.columns is None else ",".join(sorted(self.columns))
+        filters = ",".join(f.cache_key() for f in self.filters)
+        return (
+            f"skip_record={skip};encoding={self.encoding};"
+            f"columns={columns};filters={filters}"
+        )
 
-    def parse(self, file: Union[Path, str, TextIOBase]) -> Diablo2TxtFile:
+    def parse(self, file: Diablo2TxtSource) -> Diablo2TxtFile:
         """
         Parses the given file into a :py:class:`Diablo2TxtFile`.
 
-        :param file: a file path or text IO object to parse
+        IO objects are read from their current position and are not
+        closed.
+
+        :param file: a file path, or a text or binary IO object to parse
         """
-        records: List[Diablo2TxtRecord] = list()
+        path = file if isinstance(file, (Path, str)) else None
 
-        if isinstance(file, TextIOBase):
-            f = file
-            path = None
-        else:
-            f = open(file, "r")
-            path = file
+        fields, header, newline, records = self._read(file)
+        return Diablo2TxtFile(path, list(records), fields, header, newline)
+
+    def iter_records(self, file: Diablo2TxtSource) -> Iterator[Diablo2TxtRecord]:
+        """
+        Parses the given file, yielding one :py:class:`Diablo2TxtRecord`
+        at a time.
+
+        Unlike :py:meth:`parse`, records are not collected into a list, so
+        a table can be scanned in constant memory. Records for which
+        :py:attr:`skip_record` returns ``True`` are not yielded.
+
+        If ``file`` is a path, the file is closed once the iterator is
+        exhausted or closed.
+
+        :param file: a file path, or a text or binary IO object to parse
+        """
+        return self._read(file)[3]
+
+    def reader(self, file: Diablo2TxtSource) -> Diablo2TxtReader:
+        """
+        Reads the header of the given file and returns a
+        :py:class:`Diablo2TxtReader` for the rest of it.
+
+        This allows a file to be parsed in pieces, e.g. to do other work
+        in between. Reading the whole file with the reader produces the
+        same records as :py:meth:`parse`.
+
+        :param file: a file path, or a text or binary IO object to parse
+        """
+        path = file if isinstance(file, (Path, str)) else None
+        fields, header, newline, records = self._read(file)
+        return Diablo2TxtReader(path, fields, header, newline, records)
+
+    def _records(
+        self,
+        fields: Mapping[str, int],
+        rows: Iterator[Sequence[str]],
+        skip: Optional[Callable[[Diablo2TxtRecord], bool]],
+    ) -> Iterator[Diablo2TxtRecord]:
+        """
+        Creates records from rows, interning the fields of kept records in
+        :py:attr:`string_pool`.
+
+        :param fields: the fields of the rows' file
+        :param rows: the rows to create records from
+        :param skip: returns ``True`` for records to skip; see \
+            :py:attr:`skip_record`
+        """
+        record_type = self.record_type
+        pool = self.string_pool
+        if skip is None:
+            if pool is not None:
+                rows = map(pool.intern_all, rows)
+            for data in rows:
+                yield record_type(fields, data)
+            return
+
+        for data in rows:
+            record = record_type(fields, data)
+            if skip(record):
+                continue
+            if pool is not None:
+                # Skipped rows are not interned, so they are not kept
+                # alive by the pool.
+                record = record_type(fields, pool.intern_all(data))
+            yield record
+
+    def _read(
+        self, file: Diablo2TxtSource
+    ) -> Tuple[Mapping[str, int], Sequence[str], str, Iterator[Diablo2TxtRecord]]:
+        """
+        Reads the header of the given file.
+
+        Returns the fields of the file's records, the names of the kept
+        columns as they appear in the header, the file's line ending and
+        an iterator over the kept records, which reads the rest of the
+        file.
 
+        :param file: a file path or text IO object to read
+        """
         # In a properly formed Diablo 2 .txt file, the first line is
         # always a header containing field names.
-        header = self._as_data(f.readline())
+        if self.use_mmap and isinstance(file, (Path, str)):
+            encoding = self.encoding
+            m = self._map(file)
+            raw_lines = iter(m.readline, b"") if m is not None else iter(())
+            raw_header = next(raw_lines, None)
+            header = None
+            newline = DEFAULT_NEWLINE
+            if raw_header is not None:
+                header = [v.decode(encoding) for v in self._as_raw_data(raw_header)]
+                newline = _newline(raw_header.decode(encoding))
+            pool = self.string_pool
+            fields, names, plan = self._plan(header, encoding, pool is None)
+
+            rows: Iterator[Sequence[str]]
+            if m is None:
+                rows = iter(())
+            elif pool is None:
+                rows = self._iter_lazy_data(m, raw_lines, len(raw_header or b""), plan)
+            else:
+
+                def decode(raw: Sequence[bytes]) -> Sequence[str]:
+                    return [v.decode(encoding) for v in raw]
+
+                rows = self._iter_data(raw_lines, b"\t", b"\r\n", plan, decode)
+            return fields, names, newline, self._records(fields, rows, plan.skip)
+
+        lines = self._iter_lines(file)
+        first = next(lines, None)
+        if first is None:
+            fields, names, plan = self._plan(None, None)
+            newline = DEFAULT_NEWLINE
+        else:
+            fields, names, plan = self._plan(self._as_data(first), None)
+            newline = _newline(first)
+        rows = self._iter_data(lines, "\t", "\r\n", plan, _as_is)
+        return fields, names, newline, self._records(fields, rows, plan.skip)
+
+    def _plan(
+        self,
+        header: Optional[Sequence[str]],
+        encoding: Optional[str],
+        lazy: bool = False,
+    ) -> Tuple[Mapping[str, int], Sequence[str], "_ReadPlan"]:
+        """
+        Creates the field mapping shared by all records of a file and
+        decides how to turn its lines into record data.
+
+        Returns the field mapping, the names of the kept columns as they
+        appear in the header, and the plan.
 
+        :param header: the file's header row, or ``None`` if the file is empty
+        :param encoding: if lines will be read as :py:class:`bytes`, their \
+            encoding; ``None`` if lines will be read as :py:class:`str`
+        :param lazy: whether lines will become \
+            :py:class:`Diablo2TxtLazyFields`
+        """
         # To be *somewhat* efficient, each record will share the set
         # of fields parsed from the .txt file. However, by doing this
         # we need to be careful that the field mapping is not mutable.
@@ -163,15 +872,158 @@ class Diablo2TxtParser:
         # *all* records from the same file. That would be confusing
         # and very undesirable behavior, so we provide read-only access
         # to fields using the MappingProxyType.
-        fields = MappingProxyType({v.casefold(): k for k, v in enumerate(header)})
+        if header is None:
+            header = []
+        fields = {v.casefold(): k for k, v in enumerate(header)}
+        filters: List[CompiledRowFilter] = list()
+        skip = self.skip_record
+        # The fields that filters read; later fields are left unsplit.
+        filter_split = -1
+        if header:
+            if skip is skip_record and (self.columns is not None or lazy):
+                # Projected records cannot tell whether their row was a
+                # comment or incomplete, and checking lazy records would
+                # decode them all, so check the whole line instead.
+                filters.extend(f.compile(fields, encoding) for f in DEFAULT_ROW_FILTERS)
+                skip = None
+            filters.extend(f.compile(fields, encoding) for f in self.filters)
+            filter_split = 1 + max(
+                (fields[c.casefold()] for f in self.filters for c in f.columns()),
+                default=1,
+            )
+
+        if self.columns is None:
+            plan = _ReadPlan(None, filters, -1, filter_split, skip)
+            return MappingProxyType(fields), header, plan
+
+        keep = sorted(i for name, i in fields.items() if name in self.columns)
+        kept_fields = {header[i].casefold(): j for j, i in enumerate(keep)}
+
+        # Fields after the last field that is kept or filtered on are
+        # never split apart.
+        needed = list(keep)
+        if filters:
+            for f in self.filters:
+                needed.extend(fields[c.casefold()] for c in f.columns())
+        maxsplit = max(needed, default=-1) + 1
+        names = [header[i] for i in keep]
+        plan = _ReadPlan(keep, filters, maxsplit, filter_split, skip)
+        return MappingProxyType(kept_fields), names, plan
+
+    @staticmethod
+    def _iter_data(
+        lines: Iterator[AnyStr],
+        tab: AnyStr,
+        eol: AnyStr,
+        plan: "_ReadPlan",
+        wrap: Callable[[Sequence[AnyStr]], Sequence[str]],
+    ) -> Iterator[Sequence[str]]:
+        """
+        Splits lines into record data.
 
-        for line in f.readlines():
-            record = Diablo2TxtRecord(fields, self._as_data(line))
-            if self.skip_record(record):
+        :param lines: the lines to split
+        :param tab: the field separator
+        :param eol: the line ending characters to strip
+        :param plan: how to filter and split lines
+        :param wrap: converts the fields of a line into record data
+        """
+        keep = plan.keep
+        filters = plan.filters
+        maxsplit = plan.maxsplit
+        for line in lines:
+            line = line.rstrip(eol)
+            row = line.split(tab, maxsplit)
+            if filters and not _passes(filters, line, row):
                 continue
-            records.append(record)
+            if keep is None:
+                yield wrap(row)
+            elif len(row) > maxsplit:
+                yield wrap([row[i] for i in keep])
+            else:
+                # A line that ends before the last field we need. Keep
+                # the fields it has, so that its record is incomplete too.
+                n = len(row)
+                yield wrap([row[i] for i in keep if i < n])
+
+    def _iter_lines(self, file: Diablo2TxtSource) -> Iterator[str]:
+        """
+        Yields each line of the given file.
+
+        :param file: a file path, or a text or binary IO object to read
+        """
+        if isinstance(file, TextIOBase):
+            yield from file
+        elif not isinstance(file, (Path, str)):
+            # Binary files (e.g. archive members) are decoded a line at a
+            # time as they are read. They are not wrapped in a text IO
+            # object, which would need them to be seekable and close them.
+            decode = codecs.getincrementaldecoder(self.encoding)().decode
+            for line in file:
+                yield decode(line)
+            tail = decode(b"", True)
+            if tail:
+                yield tail
+        else:
+            # Line endings are not translated, so that the file's own
+            # line ending can be recorded.
+            with open(file, "r", encoding=self.encoding, newline="") as f:
+                yield from f
 
-        return Diablo2TxtFile(path, records)
+    def _iter_lazy_data(
+        self, m: mmap.mmap, lines: Iterator[bytes], offset: int, plan: "_ReadPlan"
+    ) -> Iterator[Sequence[str]]:
+        """
+        Turns the lines of a memory-mapped file into
+        :py:class:`Diablo2TxtLazyFields`.
+
+        Lines are only split as far as the plan's filters need, and the
+        fields are never copied out of the file.
+
+        :param m: the mapped file
+        :param lines: the remaining lines of ``m``
+        :param offset: the offset of the first of ``lines`` in ``m``
+        :param plan: how to filter lines
+        """
+        encoding = self.encoding
+        keep = plan.keep
+        filters = plan.filters
+        split = plan.filter_split
+        for line in lines:
+            start = offset
+            offset += len(line)
+            line = line.rstrip(b"\r\n")
+            if filters and not _passes(filters, line, line.split(b"\t", split)):
+                continue
+            length = line.count(b"\t") + 1
+            if keep is not None:
+                length = bisect_left(keep, length)
+            yield Diablo2TxtLazyFields(
+                m, start, start + len(line), encoding, keep, length
+            )
+
+    @staticmethod
+    def _map(path: Union[Path, str]) -> Optional[mmap.mmap]:
+        """
+        Memory-maps the file at the given path for reading. Returns
+        ``None`` if the file is empty, since empty files cannot be mapped.
+
+        :param path: path to the file to map
+        """
+        with open(path, "rb") as f:
+            if f.seek(0, 2) == 0:
+                return None
+            # The mapping stays valid after the file is closed.
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def _as_raw_data(cls, line: bytes) -> Sequence[bytes]:
+        """
+        Splits a raw line from a Diablo 2 .txt file into a sequence
+        of undecoded data fields.
+
+        :param line: the line to process
+        """
+        return line.rstrip(b"\r\n").split(b"\t")
 
     @classmethod
     def _as_data(cls, line: str) -> Sequence[str]:
@@ -182,3 +1034,79 @@ class Diablo2TxtParser:
         :param line: the line to process
         """
         return line.rstrip("\r\n").split("\t")
+
+
+def _callable_identity(f: Callable[..., Any]) -> Optional[str]:
+    """
+    Returns the importable name of a function, or ``None`` if it does not
+    have one (e.g. it is a lambda, a nested function or a callable object),
+    or if it is bound to an object whose state it may depend on.
+
+    :param f: the function to identify
+    """
+    bound_to = getattr(f, "__self__", None)
+    if bound_to is not None and not isinstance(bound_to, (ModuleType, type)):
+        return None
+    module = getattr(f, "__module__", None)
+    qualname = getattr(f, "__qualname__", None)
+    if module is None or qualname is None or "<" in qualname:
+        return None
+    return f"{module}.{qualname}"
+
+
+def _passes(filters: Sequence[CompiledRowFilter], line: Any, row: Any) -> bool:
+    """
+    Returns ``True`` if a line satisfies all of the given filters.
+
+    :param filters: the compiled filters to check
+    :param line: the line, without its line ending
+    :param row: the fields of the line
+    """
+    for f in filters:
+        if not f(line, row):
+            return False
+    return True
+
+
+def _newline(line: str) -> str:
+    """
+    Returns the line ending of a line, or :py:data:`DEFAULT_NEWLINE` if
+    it does not have one.
+
+    :param line: the line
+    """
+    return line[len(line.rstrip("\r\n")) :] or DEFAULT_NEWLINE
+
+
+def _as_is(data: Sequence[str]) -> Sequence[str]:
+    """
+    Returns record data unchanged.
+
+    :param data: the record data
+    """
+    return data
+
+
+class _ReadPlan(NamedTuple):
+    """
+    Describes how :py:class:`Diablo2TxtParser` turns the lines of a file
+    into record data.
+    """
+
+    #: The ascending indices of the fields to keep, or ``None`` to keep
+    #: all fields.
+    keep: Optional[Sequence[int]]
+
+    #: Compiled row filters that a line must satisfy to be kept.
+    filters: Sequence[CompiledRowFilter]
+
+    #: The maximum number of splits to make in each line; ``-1`` to split
+    #: every field.
+    maxsplit: int
+
+    #: The number of splits the filters need to check a lazily read line.
+    filter_split: int
+
+    #: The function that judges each record, if records are judged after
+    #: they are created; see :py:attr:`Diablo2TxtParser.skip_record`.
+    skip: Optional[Callable[[Diablo2TxtRecord], bool]]
@@ -0,0 +1,177 @@
+"""
+``d2lfg.d2core.data.txtarchive``
+================================
+
+This module contains code for loading Diablo 2 .txt files straight out
+of zip and tar archives (including compressed tar archives such as
+``.tar.gz``).
+
+Members are never extracted to disk. Each member is decompressed as the
+parser reads it, so only a buffer of it is in memory at a time besides
+the parsed records. Tar archives are read in a single streaming pass,
+so even compressed tar archives are only decompressed once.
+"""
+
+from contextlib import closing
+from pathlib import Path, PurePosixPath
+import tarfile
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import zipfile
+
+from ...error import DataLookupError, DuplicateKeyError
+from .txt import Diablo2TxtFile, Diablo2TxtParser
+
+
+def is_txt_archive(path: Union[Path, str]) -> bool:
+    """
+    Returns whether a path is a zip or tar archive.
+
+    :param path: the path to check
+    """
+    if not Path(path).is_file():
+        return False
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def find_txt_archive_tables(path: Union[Path, str]) -> Dict[str, PurePosixPath]:
+    """
+    Returns the .txt files in an archive, keyed by table name, without
+    reading them. Table names are as in :py:func:`iter_txt_archive`.
+    Tables are returned in order of their case folded names.
+
+    Listing a tar archive reads it to the end, since its members are not
+    indexed.
+
+    :param path: the path of the zip or tar archive
+    :raises DuplicateKeyError: if two members have the same table name
+    """
+    members: Dict[str, PurePosixPath] = dict()
+    seen: Set[str] = set()
+    for name in _member_names(path):
+        member = PurePosixPath(name)
+        if member.suffix.casefold() != ".txt":
+            continue
+        if member.stem.casefold() in seen:
+            raise DuplicateKeyError(f"{member.stem}: more than one txt table in {path}")
+        seen.add(member.stem.casefold())
+        members[member.stem] = member
+    return {t: members[t] for t in sorted(members, key=str.casefold)}
+
+
+def iter_txt_archive(
+    path: Union[Path, str], tables: Optional[Iterable[str]] = None
+) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Yields the .txt files in an archive as binary IO objects, keyed by
+    table name, in the order they are stored.
+
+    The table name of a member is its file name without the ``.txt``
+    suffix; members are found in any directory of the archive. Each IO
+    object is only valid until the next member is yielded.
+
+    :param path: the path of the zip or tar archive
+    :param tables: the names of the tables to yield, case insensitive; \
+        if ``None``, all .txt files in the archive are yielded
+    :raises DuplicateKeyError: if two yielded members have the same table \
+        name
+    :raises DataLookupError: if a requested table is not in the archive, \
+        once the rest of the archive has been read
+    """
+    wanted = None if tables is None else {t.casefold(): t for t in tables}
+    seen: Set[str] = set()
+    for name, f in _iter_members(path):
+        member = PurePosixPath(name)
+        if member.suffix.casefold() != ".txt":
+            continue
+        table = member.stem
+        key = table.casefold()
+        if wanted is not None and key not in wanted:
+            continue
+        if key in seen:
+            raise DuplicateKeyError(f"{table}: more than one txt table in {path}")
+        seen.add(key)
+        with closing(f):
+            yield table, f
+
+    if wanted is not None:
+        for key, table in wanted.items():
+            if key not in seen:
+                raise DataLookupError(f"{table}: no such txt table")
+
+
+def load_txt_archive(
+    path: Union[Path, str],
+    parser: Optional[Diablo2TxtParser] = None,
+    tables: Optional[Iterable[str]] = None,
+) -> Dict[str, Diablo2TxtFile]:
+    """
+    Parses the .txt files in an archive.
+
+    Members are parsed one at a time while the archive is read. The
+    result is keyed by table name, like
+    :py:func:`~d2lfg.d2core.data.txtdir.load_txt_directory`: in the
+    requested order, or in order of the case folded table names. The
+    parsed files have no path.
+
+    :param path: the path of the zip or tar archive
+    :param parser: the parser to parse the files with
+    :param tables: the names of the tables to load, case insensitive; if \
+        ``None``, all .txt files in the archive are loaded
+    :raises DuplicateKeyError: if two loaded members have the same table name
+    :raises DataLookupError: if a requested table is not in the archive
+    """
+    if parser is None:
+        parser = Diablo2TxtParser()
+    if tables is not None:
+        tables = list(tables)
+    files = {
+        table.casefold(): (table, parser.parse(f))
+        for table, f in iter_txt_archive(path, tables)
+    }
+    if tables is None:
+        order = sorted(files)
+    else:
+        order = list(dict.fromkeys(t.casefold() for t in tables))
+    return dict(files[key] for key in order)
+
+
+def _member_names(path: Union[Path, str]) -> List[str]:
+    """
+    Returns the names of the regular files in an archive, in the order
+    they are stored.
+
+    :param path: the path of the zip or tar archive
+    :raises DataLookupError: if the file is not a zip or tar archive
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            return [i.filename for i in z.infolist() if not i.is_dir()]
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path, "r|*") as t:
+            return [m.name for m in t if m.isfile()]
+    raise DataLookupError(f"{path}: not a zip or tar archive")
+
+
+def _iter_members(path: Union[Path, str]) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Yields the regular files in an archive with binary IO objects to
+    read them, in the order they are stored.
+
+    :param path: the path of the zip or tar archive
+    :raises DataLookupError: if the file is not a zip or tar archive
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            for info in z.infolist():
+                if not info.is_dir():
+                    yield info.filename, z.open(info)
+    elif tarfile.is_tarfile(path):
+        # Stream mode reads the archive front to back, so a compressed
+        # archive is decompressed once instead of once per member.
+        with tarfile.open(path, "r|*") as t:
+            for member in t:
+                f = t.extractfile(member) if member.isfile() else None
+                if f is not None:
+                    yield member.name, f
+    else:
+        raise DataLookupError(f"{path}: not a zip or tar archive")
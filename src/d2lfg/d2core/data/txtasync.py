@@ -0,0 +1,233 @@
+"""
+``d2lfg.d2core.data.txtasync``
+==============================
+
+This module contains :py:mod:`asyncio` entry points for parsing Diablo 2
+.txt files.
+
+Parsing a large file takes long enough to stall an event loop. These
+functions parse in an executor (by default, the loop's default thread
+pool) a chunk of records at a time. The loop only ever waits on a
+single chunk, and cancelling a parse stops it at the next chunk and
+closes the file.
+
+Files are parsed in threads, so several files load concurrently without
+blocking the loop, but parsing is still limited by the GIL. For the
+fastest possible load of a whole directory, use
+:py:func:`~d2lfg.d2core.data.txtdir.load_txt_directory` in an executor
+instead; it cannot be cancelled part way through.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from pathlib import Path
+from threading import Lock
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from .txt import Diablo2TxtFile, Diablo2TxtParser, Diablo2TxtReader, Diablo2TxtRecord
+from .txtarchive import is_txt_archive, load_txt_archive
+from .txtdir import find_txt_tables, select_txt_tables
+
+#: The default number of records parsed in the executor at a time.
+DEFAULT_CHUNK_SIZE = 512
+
+
+class _AsyncTxtReader:
+    """
+    Runs a :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtReader` in an
+    executor.
+
+    Reads and closing are serialized by a lock, so the reader is never
+    closed while a cancelled read is still running in the executor.
+
+    :param reader: the reader to run
+    :param executor: the executor to run it in, or ``None`` for the \
+        event loop's default executor
+    """
+
+    def __init__(self, reader: Diablo2TxtReader, executor: Optional[Executor]) -> None:
+        self.reader = reader
+        self.executor = executor
+        self._lock = Lock()
+
+    @classmethod
+    async def open(
+        cls,
+        file: Union[Path, str],
+        parser: Optional[Diablo2TxtParser],
+        executor: Optional[Executor],
+    ) -> "_AsyncTxtReader":
+        """
+        Reads the header of a file in an executor.
+
+        :param file: the path of the file to read
+        :param parser: the parser to read the file with
+        :param executor: the executor to read in
+        """
+        if parser is None:
+            parser = Diablo2TxtParser()
+        loop = asyncio.get_running_loop()
+        reader = await loop.run_in_executor(executor, parser.reader, file)
+        return cls(reader, executor)
+
+    async def read(self, n: int) -> List[Diablo2TxtRecord]:
+        """
+        Reads up to ``n`` more records in the executor.
+
+        :param n: the maximum number of records to read
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._read, n)
+
+    async def close(self) -> None:
+        """
+        Closes the reader in the executor, once any running read finishes.
+        """
+        loop = asyncio.get_running_loop()
+        # Shielded, so that the file is closed even if the task is
+        # cancelled again while waiting.
+        await asyncio.shield(loop.run_in_executor(self.executor, self._close))
+
+    def _read(self, n: int) -> List[Diablo2TxtRecord]:
+        with self._lock:
+            return self.reader.read(n)
+
+    def _close(self) -> None:
+        with self._lock:
+            self.reader.close()
+
+
+async def iter_records_async(
+    file: Union[Path, str],
+    parser: Optional[Diablo2TxtParser] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[List[Diablo2TxtRecord]]:
+    """
+    Parses a file in an executor, yielding a chunk of records at a time.
+
+    The file is closed when the iterator is exhausted, closed or
+    cancelled.
+
+    :param file: the path of the file to parse
+    :param parser: the parser to parse the file with
+    :param chunk_size: the number of records to parse at a time
+    :param executor: the executor to parse in; defaults to the event \
+        loop's default executor. It must not be a process pool.
+    """
+    reader = await _AsyncTxtReader.open(file, parser, executor)
+    try:
+        while True:
+            chunk = await reader.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        await reader.close()
+
+
+async def parse_txt_file_async(
+    file: Union[Path, str],
+    parser: Optional[Diablo2TxtParser] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+) -> Diablo2TxtFile:
+    """
+    Parses a file without blocking the event loop.
+
+    The result is the same as that of
+    :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.parse`.
+
+    :param file: the path of the file to parse
+    :param parser: the parser to parse the file with
+    :param chunk_size: the number of records to parse at a time
+    :param executor: see :py:func:`iter_records_async`
+    """
+    reader = await _AsyncTxtReader.open(file, parser, executor)
+    records: List[Diablo2TxtRecord] = list()
+    try:
+        while True:
+            chunk = await reader.read(chunk_size)
+            if not chunk:
+                return reader.reader.txt_file(records)
+            records.extend(chunk)
+    finally:
+        await reader.close()
+
+
+async def load_txt_files_async(
+    files: Mapping[str, Union[Path, str]],
+    parser: Optional[Diablo2TxtParser] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+) -> Dict[str, Diablo2TxtFile]:
+    """
+    Parses several files concurrently without blocking the event loop.
+
+    If parsing any file fails, or this coroutine is cancelled, the other
+    files stop parsing too.
+
+    :param files: the paths of the files to parse, keyed by table name
+    :param parser: the parser to parse the files with
+    :param chunk_size: the number of records to parse at a time
+    :param executor: see :py:func:`iter_records_async`
+    """
+    tasks = {
+        name: asyncio.ensure_future(
+            parse_txt_file_async(path, parser, chunk_size, executor)
+        )
+        for name, path in files.items()
+    }
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        # Wait for cancelled parses to close their files.
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return {name: task.result() for name, task in tasks.items()}
+
+
+async def load_txt_directory_async(
+    directory: Union[Path, str],
+    parser: Optional[Diablo2TxtParser] = None,
+    tables: Optional[Iterable[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+) -> Dict[str, Diablo2TxtFile]:
+    """
+    Parses the .txt files in a directory concurrently without blocking the
+    event loop. See :py:func:`load_txt_files_async`.
+
+    A zip or tar archive is read front to back in a single executor call
+    (see :py:func:`~d2lfg.d2core.data.txtarchive.load_txt_archive`), which
+    cannot be cancelled part way through.
+
+    :param directory: the directory containing the .txt files, or an \
+        archive of them
+    :param parser: the parser to parse the files with
+    :param tables: the names of the tables to load, case insensitive; if \
+        ``None``, all .txt files in the directory are loaded
+    :param chunk_size: the number of records to parse at a time
+    :param executor: see :py:func:`iter_records_async`
+    :raises DataLookupError: if a requested table does not exist
+    """
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(executor, is_txt_archive, directory):
+        if tables is not None:
+            tables = list(tables)
+        return await loop.run_in_executor(
+            executor, load_txt_archive, directory, parser, tables
+        )
+    available = await loop.run_in_executor(executor, find_txt_tables, directory)
+    paths = select_txt_tables(available, tables)
+    return await load_txt_files_async(paths, parser, chunk_size, executor)
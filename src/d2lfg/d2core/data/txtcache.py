@@ -0,0 +1,139 @@
+"""
+``d2lfg.d2core.data.txtcache``
+==============================
+
+This module contains an on-disk cache of parsed Diablo 2 .txt files.
+
+Cache entries are keyed by a hash of the file's content and the settings
+of the parser that read it, so an entry is only used if parsing the file
+again would produce the same records. Entries are stored with
+:py:mod:`marshal`, which loads much faster than the .txt file parses.
+"""
+
+from hashlib import sha256
+import marshal
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from types import MappingProxyType
+from typing import Dict, List, Optional, Union
+
+from .txt import Diablo2TxtFile, Diablo2TxtParser, Diablo2TxtSource
+
+#: Version of the cache entry format. Changing it invalidates all entries.
+CACHE_FORMAT_VERSION = 4
+
+
+class Diablo2TxtParseCache:
+    """
+    Parses Diablo 2 .txt files with a :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`,
+    storing the results in a directory and reusing them while the files
+    are unchanged.
+
+    If the parser's settings cannot be identified (see
+    :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.cache_key`), files
+    are always parsed.
+
+    :param directory: the directory to store cache entries in; it is \
+        created if it does not exist
+    :param parser: the parser used to parse files
+    """
+
+    def __init__(
+        self, directory: Union[Path, str], parser: Optional[Diablo2TxtParser] = None
+    ) -> None:
+        self.directory = Path(directory)
+        self.parser = Diablo2TxtParser() if parser is None else parser
+
+    def parse(self, file: Diablo2TxtSource) -> Diablo2TxtFile:
+        """
+        Returns the parsed contents of the given file, loading them from
+        the cache if possible.
+
+        IO objects are always parsed.
+
+        :param file: a file path, or a text or binary IO object to parse
+        """
+        parser_key = self.parser.cache_key()
+        if not isinstance(file, (Path, str)) or parser_key is None:
+            return self.parser.parse(file)
+
+        with open(file, "rb") as f:
+            content = f.read()
+        entry = self.entry_path(content, parser_key)
+
+        txt_file = self._load(file, entry)
+        if txt_file is None:
+            txt_file = self.parser.parse(file)
+            self._store(txt_file, entry)
+        return txt_file
+
+    def entry_path(self, content: bytes, parser_key: str) -> Path:
+        """
+        Returns the path of the cache entry for a file.
+
+        :param content: the content of the file
+        :param parser_key: the :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.cache_key` \
+            of the parser reading the file
+        """
+        h = sha256()
+        h.update(f"{CACHE_FORMAT_VERSION};{marshal.version};{parser_key}\0".encode())
+        h.update(content)
+        return self.directory / f"{h.hexdigest()}.marshal"
+
+    def _load(self, path: Union[Path, str], entry: Path) -> Optional[Diablo2TxtFile]:
+        """
+        Loads a parsed file from a cache entry. Returns ``None`` if the
+        entry does not exist or cannot be read.
+
+        :param path: the path of the parsed file
+        :param entry: the path of the cache entry
+        """
+        try:
+            # marshal.load reads from a file in small pieces, which is far
+            # slower than reading the whole entry and unmarshalling it.
+            with open(entry, "rb") as f:
+                content = f.read()
+            fields, header, newline, rows = marshal.loads(content)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        fields = MappingProxyType(fields)
+        record_type = self.parser.record_type
+        pool = self.parser.string_pool
+        if pool is not None:
+            rows = [pool.intern_all(row) for row in rows]
+        records = [record_type(fields, row) for row in rows]
+        return Diablo2TxtFile(path, records, fields, header, newline)
+
+    def _store(self, txt_file: Diablo2TxtFile, entry: Path) -> None:
+        """
+        Stores a parsed file in a cache entry.
+
+        Identical values are stored once, which makes the entry faster to
+        load. The entry is written to a temporary file first, so readers
+        never see a partially written entry.
+
+        :param txt_file: the parsed file
+        :param entry: the path of the cache entry
+        """
+        values: Dict[str, str] = dict()
+        rows: List[List[str]] = [
+            [values.setdefault(v, v) for v in r.data] for r in txt_file.records
+        ]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("wb", dir=self.directory, delete=False) as f:
+            try:
+                state = (
+                    dict(txt_file.fields),
+                    list(txt_file.header),
+                    txt_file.newline,
+                    rows,
+                )
+                marshal.dump(state, f)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, entry)
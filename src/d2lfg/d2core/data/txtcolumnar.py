@@ -0,0 +1,366 @@
+"""
+``d2lfg.d2core.data.txtcolumnar``
+=================================
+
+This module contains a columnar storage backend for Diablo 2 .txt files.
+
+Instead of storing each row as its own list of strings,
+:py:class:`Diablo2ColumnarTxtFile` stores one sequence per column.
+Columns with few distinct values (like ``type``, ``normcode`` or
+``nodurability``) are dictionary-encoded: each distinct value is stored
+once and rows hold a small integer code. Records are exposed as
+lightweight views over the columns.
+"""
+
+from array import array
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    overload,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .txt import Diablo2TxtFile, Diablo2TxtRecord
+
+
+class Diablo2TxtDictColumn(Sequence[str]):
+    """
+    A dictionary-encoded .txt file column.
+
+    :param values: the distinct values appearing in the column
+    :param codes: for each row, the index of its value in ``values``
+    """
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: Sequence[str], codes: Sequence[int]) -> None:
+        self.values = values
+        self.codes = codes
+
+    @overload
+    def __getitem__(self, i: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, Sequence[str]]:
+        """
+        Returns the value in the given row, or a list of values if given
+        a slice.
+
+        :param i: the row index or slice to fetch
+        """
+        if isinstance(i, slice):
+            values = self.values
+            return [values[c] for c in self.codes[i]]
+        return self.values[self.codes[i]]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows in the column.
+        """
+        return len(self.codes)
+
+    def where(self, predicate: Callable[[str], bool]) -> List[int]:
+        """
+        Returns the indices of rows whose value satisfies ``predicate``.
+
+        ``predicate`` is called once per *distinct* value rather than once
+        per row.
+
+        :param predicate: returns ``True`` for values that should match
+        """
+        matching = {c for c, v in enumerate(self.values) if predicate(v)}
+        return [i for i, c in enumerate(self.codes) if c in matching]
+
+
+class Diablo2ColumnarRowData(Sequence[str]):
+    """
+    A view of a single row of a :py:class:`Diablo2ColumnarTxtFile`.
+
+    This is used as the ``data`` of the file's
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord` objects.
+
+    :param columns: the columns of the file
+    :param row: the index of the row being viewed
+    :param length: the number of fields in the row
+    """
+
+    __slots__ = ("columns", "row", "length")
+
+    def __init__(self, columns: Sequence[Sequence[str]], row: int, length: int) -> None:
+        self.columns = columns
+        self.row = row
+        self.length = length
+
+    @overload
+    def __getitem__(self, i: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, Sequence[str]]:
+        """
+        Returns the field at the given index, or a list of fields if given
+        a slice.
+
+        :param i: the field index or slice to fetch
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("row field index out of range")
+        return self.columns[i][self.row]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of fields in the row.
+        """
+        return self.length
+
+
+class _ColumnarRecords(Sequence[Diablo2TxtRecord]):
+    """
+    Sequence of record views over a :py:class:`Diablo2ColumnarTxtFile`.
+    """
+
+    def __init__(self, txt_file: "Diablo2ColumnarTxtFile") -> None:
+        self._txt_file = txt_file
+
+    @overload
+    def __getitem__(self, i: int) -> Diablo2TxtRecord:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[Diablo2TxtRecord]:
+        ...
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Diablo2TxtRecord, Sequence[Diablo2TxtRecord]]:
+        f = self._txt_file
+        if isinstance(i, slice):
+            return [f.record(j) for j in range(*i.indices(f.row_count))]
+        if i < 0:
+            i += f.row_count
+        if not 0 <= i < f.row_count:
+            raise IndexError("record index out of range")
+        return f.record(i)
+
+    def __len__(self) -> int:
+        return self._txt_file.row_count
+
+
+class Diablo2ColumnarTxtFile(Diablo2TxtFile):
+    """
+    A :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtFile` that stores its
+    data by column.
+
+    Use :py:meth:`from_records` or :py:meth:`from_txt_file` to build one.
+    :py:attr:`records` is a sequence of
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord` views whose data
+    is read from the columns on access.
+
+    :param path: path to the file the data was read from
+    :param fields: a mapping of :py:meth:`~str.casefold` ed column name to \
+        its index in ``columns``
+    :param columns: the file's columns; each contains one value per row
+    :param lengths: the number of fields in each row, if rows are not all \
+        as wide as the file
+    """
+
+    def __init__(
+        self,
+        path: Union[None, str, Path],
+        fields: Mapping[str, int],
+        columns: Sequence[Sequence[str]],
+        lengths: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.columns = columns
+        self.lengths = lengths
+        self.row_count = len(columns[0]) if columns else 0
+        self.max_cardinality = 0.5
+        super().__init__(path, _ColumnarRecords(self), fields)
+
+    @property
+    def records(self) -> Sequence[Diablo2TxtRecord]:
+        """
+        The records in the file.
+
+        Assigning new records stores them by column, as
+        :py:meth:`from_records` does, and discards anything derived from
+        the old ones.
+        """
+        return self._records
+
+    @records.setter
+    def records(self, records: Sequence[Diablo2TxtRecord]) -> None:
+        if not isinstance(records, _ColumnarRecords) or records._txt_file is not self:
+            fields, columns, lengths = _build_columns(records, self.max_cardinality)
+            if columns and fields != self.fields:
+                self.fields = fields
+                self.header = sorted(fields, key=fields.__getitem__)
+            self.columns = columns
+            self.lengths = lengths
+            self.row_count = len(columns[0]) if columns else 0
+            records = _ColumnarRecords(self)
+        self._records = records
+        self.invalidate()
+
+    @classmethod
+    def from_records(
+        cls,
+        path: Union[None, str, Path],
+        records: Iterable[Diablo2TxtRecord],
+        max_cardinality: float = 0.5,
+    ) -> "Diablo2ColumnarTxtFile":
+        """
+        Builds a :py:class:`Diablo2ColumnarTxtFile` from records.
+
+        ``records`` is consumed one record at a time, so it may be
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`.
+        All records must share the same fields.
+
+        A column is dictionary-encoded if its number of distinct values
+        is no more than ``max_cardinality`` times the number of rows.
+
+        :param path: path to the file the records were read from
+        :param records: the records to store
+        :param max_cardinality: the maximum ratio of distinct values to rows \
+            for a column to be dictionary-encoded
+        """
+        fields, columns, lengths = _build_columns(records, max_cardinality)
+        columnar = cls(path, fields, columns, lengths)
+        columnar.max_cardinality = max_cardinality
+        return columnar
+
+    @classmethod
+    def from_txt_file(
+        cls, txt_file: Diablo2TxtFile, max_cardinality: float = 0.5
+    ) -> "Diablo2ColumnarTxtFile":
+        """
+        Builds a :py:class:`Diablo2ColumnarTxtFile` with the same data
+        as ``txt_file``.
+
+        :param txt_file: the file to convert
+        :param max_cardinality: see :py:meth:`from_records`
+        """
+        columnar = cls.from_records(txt_file.path, txt_file.records, max_cardinality)
+        columnar.header = txt_file.header
+        columnar.newline = txt_file.newline
+        return columnar
+
+    def column(self, name: str) -> Sequence[str]:
+        """
+        Returns the stored column with the given name. This does not copy
+        the column.
+
+        :param name: the name of the column; case insensitive
+        """
+        return self.columns[self.fields[name.casefold()]]
+
+    def record(self, row: int) -> Diablo2TxtRecord:
+        """
+        Returns a view of the record at the given row.
+
+        :param row: the index of the row; must not be negative
+        """
+        length = len(self.columns) if self.lengths is None else self.lengths[row]
+        return Diablo2TxtRecord(
+            self.fields, Diablo2ColumnarRowData(self.columns, row, length)
+        )
+
+    def where(self, name: str, predicate: Callable[[str], bool]) -> Iterator[int]:
+        """
+        Yields the indices of rows whose value in the given column satisfies
+        ``predicate``.
+
+        For dictionary-encoded columns, ``predicate`` is called once per
+        distinct value.
+
+        :param name: the name of the column; case insensitive
+        :param predicate: returns ``True`` for values that should match
+        """
+        column = self.column(name)
+        if isinstance(column, Diablo2TxtDictColumn):
+            yield from column.where(predicate)
+        else:
+            for i, v in enumerate(column):
+                if predicate(v):
+                    yield i
+
+
+def _build_columns(
+    records: Iterable[Diablo2TxtRecord], max_cardinality: float
+) -> Tuple[Mapping[str, int], List[Sequence[str]], Optional[Sequence[int]]]:
+    """
+    Splits records into columns for :py:class:`Diablo2ColumnarTxtFile`.
+
+    :param records: the records to store
+    :param max_cardinality: see :py:meth:`Diablo2ColumnarTxtFile.from_records`
+    """
+    fields: Mapping[str, int] = MappingProxyType({})
+    width = 0
+    lookups: List[Dict[str, int]] = []
+    values: List[List[str]] = []
+    codes: List[List[int]] = []
+    lengths: List[int] = []
+
+    for row, record in enumerate(records):
+        data = record.data
+        if row == 0:
+            fields = record.fields
+            width = max(fields.values(), default=-1) + 1
+            lookups = [dict() for _ in range(width)]
+            values = [list() for _ in range(width)]
+            codes = [list() for _ in range(width)]
+        # Fields beyond the header have no column to go in.
+        lengths.append(min(len(data), width))
+        for i in range(width):
+            v = data[i] if i < len(data) else ""
+            lookup = lookups[i]
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(lookup)
+                values[i].append(v)
+            codes[i].append(code)
+
+    row_count = len(lengths)
+    columns: List[Sequence[str]] = list()
+    for column_values, column_codes in zip(values, codes):
+        if len(column_values) <= max_cardinality * row_count:
+            columns.append(Diablo2TxtDictColumn(column_values, _compact(column_codes)))
+        else:
+            columns.append([column_values[c] for c in column_codes])
+
+    ragged = any(n != width for n in lengths)
+    return fields, columns, _compact(lengths) if ragged else None
+
+
+def _compact(values: List[int]) -> Sequence[int]:
+    """
+    Stores non-negative integers in the smallest :py:class:`~array.array`
+    that will hold them.
+
+    :param values: the integers to store
+    """
+    largest = max(values, default=0)
+    for typecode in ("B", "H", "I", "Q"):
+        if largest < 2 ** (array(typecode).itemsize * 8):
+            return array(typecode, values)
+    return values
@@ -0,0 +1,153 @@
+"""
+``d2lfg.d2core.data.txtcolumntypes``
+====================================
+
+This module contains typed columns for Diablo 2 .txt files.
+
+Every field in a .txt file is a string. A typed column converts the
+values of one column to integers or booleans once and stores them in
+a compact :py:class:`~array.array`, so repeated numeric filtering does
+not pay string conversion costs each time.
+"""
+
+from array import array
+from enum import Enum
+from typing import Iterable, Optional, overload, Sequence, Union
+
+from ...error import DataConversionError
+
+
+class Diablo2TxtColumnType(Enum):
+    """
+    :py:class:`~enum.Enum` describing the types a .txt file column
+    may be converted to.
+    """
+
+    #: An integer column. Empty fields are ``0``.
+    INT = "int"
+
+    #: An integer column. Empty fields are ``None``.
+    OPTIONAL_INT = "optional_int"
+
+    #: A boolean column. Empty fields and ``0`` are ``False``; other
+    #: integers are ``True``.
+    BOOL = "bool"
+
+    @classmethod
+    def infer(cls, values: Iterable[str]) -> "Diablo2TxtColumnType":
+        """
+        Infers the type of a column from its values.
+
+        A column of integers is :py:attr:`INT`, unless it has empty fields,
+        in which case it is :py:attr:`OPTIONAL_INT`. Boolean columns look
+        like integer columns, so :py:attr:`BOOL` is never inferred.
+
+        :param values: the column's values
+        :raises DataConversionError: if the column is not numeric
+        """
+        has_empty = False
+        for v in values:
+            if not v.strip():
+                has_empty = True
+                continue
+            try:
+                int(v)
+            except ValueError:
+                raise DataConversionError(f"{v!r}: not an integer") from None
+        return cls.OPTIONAL_INT if has_empty else cls.INT
+
+
+class Diablo2TxtTypedColumn(Sequence[Optional[int]]):
+    """
+    A .txt file column converted to integers or booleans.
+
+    Use :py:meth:`from_strings` to create one.
+
+    :param column_type: the type of the column
+    :param values: the converted value of each row; rows with no value \
+        hold ``0``
+    :param present: for :py:attr:`Diablo2TxtColumnType.OPTIONAL_INT` columns \
+        with empty fields, whether each row has a value
+    """
+
+    __slots__ = ("column_type", "values", "present")
+
+    def __init__(
+        self,
+        column_type: Diablo2TxtColumnType,
+        values: Sequence[int],
+        present: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.column_type = column_type
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_strings(
+        cls, values: Iterable[str], column_type: Diablo2TxtColumnType
+    ) -> "Diablo2TxtTypedColumn":
+        """
+        Converts string values to a :py:class:`Diablo2TxtTypedColumn`.
+
+        :param values: the column's values
+        :param column_type: the type to convert the values to
+        :raises DataConversionError: if a value cannot be converted
+        """
+        converted = array("b" if column_type is Diablo2TxtColumnType.BOOL else "q")
+        present = array("B")
+        has_empty = False
+
+        for i, v in enumerate(values):
+            try:
+                n = int(v)
+            except ValueError:
+                if v.strip():
+                    raise DataConversionError(
+                        f"row {i}: {v!r}: not an integer"
+                    ) from None
+                n = 0
+                has_empty = True
+                present.append(0)
+            else:
+                present.append(1)
+            if column_type is Diablo2TxtColumnType.BOOL:
+                n = n != 0
+            converted.append(n)
+
+        optional = column_type is Diablo2TxtColumnType.OPTIONAL_INT and has_empty
+        return cls(column_type, converted, present if optional else None)
+
+    @overload
+    def __getitem__(self, i: int) -> Optional[int]:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[Optional[int]]:
+        ...
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Optional[int], Sequence[Optional[int]]]:
+        """
+        Returns the value in the given row, or a list of values if given
+        a slice.
+
+        Values of :py:attr:`Diablo2TxtColumnType.BOOL` columns are
+        :py:class:`bool`. Empty fields of
+        :py:attr:`Diablo2TxtColumnType.OPTIONAL_INT` columns are ``None``.
+
+        :param i: the row index or slice to fetch
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.values)))]
+        if self.present is not None and not self.present[i]:
+            return None
+        if self.column_type is Diablo2TxtColumnType.BOOL:
+            return bool(self.values[i])
+        return self.values[i]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows in the column.
+        """
+        return len(self.values)
@@ -0,0 +1,213 @@
+"""
+``d2lfg.d2core.data.txtdiff``
+=============================
+
+This module contains code for comparing two versions of a Diablo 2 .txt
+file.
+
+Rows are matched between versions by a key column, such as ``code`` in
+``Weapons.txt``, using hash maps. Matched rows are first compared by
+fingerprint (see :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.fingerprints`),
+and only rows whose fingerprints differ are compared field by field, so
+a diff takes time linear in the number of rows.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .txt import Diablo2TxtFile, Diablo2TxtRecord
+
+
+class Diablo2TxtRowChange(NamedTuple):
+    """
+    A row whose values differ between two versions of a .txt file.
+    """
+
+    #: The row in the old version.
+    old: Diablo2TxtRecord
+
+    #: The row in the new version.
+    new: Diablo2TxtRecord
+
+    #: The changed values as (old, new) pairs, keyed by
+    #: :py:meth:`~str.casefold` ed column name. Columns that only one
+    #: version has are treated as empty in the other.
+    columns: Dict[str, Tuple[str, str]]
+
+
+@dataclass
+class Diablo2TxtTableDiff:
+    """
+    The differences between two versions of a .txt file.
+
+    Each attribute is keyed by the value of the key column that rows were
+    matched by.
+    """
+
+    #: Rows that only appear in the new version.
+    added: Dict[str, Diablo2TxtRecord] = field(default_factory=dict)
+
+    #: Rows that only appear in the old version.
+    removed: Dict[str, Diablo2TxtRecord] = field(default_factory=dict)
+
+    #: Rows whose values differ between versions.
+    changed: Dict[str, Diablo2TxtRowChange] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        """
+        Returns ``True`` if there are any differences.
+        """
+        return bool(self.added or self.removed or self.changed)
+
+    def changed_columns(self) -> Dict[str, int]:
+        """
+        Returns the number of changed rows in which each column changed.
+        """
+        counts: Dict[str, int] = dict()
+        for change in self.changed.values():
+            for column in change.columns:
+                counts[column] = counts.get(column, 0) + 1
+        return counts
+
+
+def diff_txt_files(
+    old: Diablo2TxtFile, new: Diablo2TxtFile, key: str
+) -> Diablo2TxtTableDiff:
+    """
+    Compares two versions of a .txt file.
+
+    If a key appears more than once in a version, the last row with that
+    key is used.
+
+    :param old: the old version of the file
+    :param new: the new version of the file
+    :param key: the name of the column to match rows by; case insensitive
+    """
+    if old.fields == new.fields:
+        # Fingerprints are cached by each file, so comparing a file
+        # against several others only fingerprints it once.
+        columns = _names_by_index(new)
+        old_view = _Aligned(old, None, old.fingerprints())
+        new_view = _Aligned(new, None, new.fingerprints())
+    else:
+        columns = list(old.fields)
+        columns.extend(c for c in new.fields if c not in old.fields)
+        old_view = _Aligned.build(old, columns)
+        new_view = _Aligned.build(new, columns)
+
+    old_rows = _ordinals_by_key(old, key)
+    new_rows = _ordinals_by_key(new, key)
+    old_records = old.records
+    new_records = new.records
+
+    diff = Diablo2TxtTableDiff()
+    for k, j in new_rows.items():
+        i = old_rows.get(k)
+        if i is None:
+            diff.added[k] = new_records[j]
+        elif old_view.fingerprints[i] != new_view.fingerprints[j]:
+            cells = _changed_cells(old_view.values(i), new_view.values(j), columns)
+            if cells:
+                diff.changed[k] = Diablo2TxtRowChange(
+                    old_records[i], new_records[j], cells
+                )
+
+    for k, i in old_rows.items():
+        if k not in new_rows:
+            diff.removed[k] = old_records[i]
+
+    return diff
+
+
+class _Aligned(NamedTuple):
+    """
+    The rows of a file laid out in a given column order, with a
+    fingerprint of each row.
+    """
+
+    #: The file.
+    txt_file: Diablo2TxtFile
+
+    #: For each column, its index in the file's rows, or ``-1`` if the
+    #: file does not have it; ``None`` if the rows are already in order.
+    remap: Optional[Sequence[int]]
+
+    #: The fingerprint of each aligned row.
+    fingerprints: Sequence[int]
+
+    @classmethod
+    def build(cls, txt_file: Diablo2TxtFile, columns: Sequence[str]) -> "_Aligned":
+        """
+        Aligns a file's rows to the given columns.
+
+        :param txt_file: the file
+        :param columns: the :py:meth:`~str.casefold` ed names of the columns
+        """
+        remap = [txt_file.fields.get(c, -1) for c in columns]
+        aligned = cls(txt_file, remap, [])
+        fingerprints = [
+            hash(tuple(aligned.values(i))) for i in range(len(txt_file.records))
+        ]
+        return aligned._replace(fingerprints=fingerprints)
+
+    def values(self, i: int) -> Sequence[str]:
+        """
+        Returns the values of a row in column order.
+
+        :param i: the index of the row
+        """
+        data = self.txt_file.records[i].data
+        if self.remap is None:
+            return data
+        n = len(data)
+        return [data[j] if 0 <= j < n else "" for j in self.remap]
+
+
+def _names_by_index(txt_file: Diablo2TxtFile) -> List[str]:
+    """
+    Returns the :py:meth:`~str.casefold` ed name of each column of a file,
+    by index. Unlike the file's fields, this includes columns whose names
+    are repeated later in the header.
+
+    :param txt_file: the file
+    """
+    names = [h.casefold() for h in txt_file.header]
+    for name, i in txt_file.fields.items():
+        if i >= len(names):
+            names.extend([""] * (i + 1 - len(names)))
+        names[i] = name
+    return names
+
+
+def _changed_cells(
+    old: Sequence[str], new: Sequence[str], columns: Sequence[str]
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns the values that differ between two aligned rows, keyed by
+    column name.
+
+    :param old: the old row's values
+    :param new: the new row's values
+    :param columns: the name of each column
+    """
+    cells: Dict[str, Tuple[str, str]] = dict()
+    n_old = len(old)
+    n_new = len(new)
+    for i, column in enumerate(columns):
+        o = old[i] if i < n_old else ""
+        v = new[i] if i < n_new else ""
+        if o != v:
+            cells[column] = (o, v)
+    return cells
+
+
+def _ordinals_by_key(txt_file: Diablo2TxtFile, key: str) -> Dict[str, int]:
+    """
+    Returns the index of each row of a file, keyed by the value of a
+    column.
+
+    :param txt_file: the file
+    :param key: the name of the column; case insensitive
+    """
+    keys: List[str] = list(txt_file.column(key))
+    return {k: i for i, k in enumerate(keys)}
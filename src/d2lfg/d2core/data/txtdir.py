@@ -0,0 +1,169 @@
+"""
+``d2lfg.d2core.data.txtdir``
+============================
+
+This module contains code for loading a directory of Diablo 2 .txt files.
+
+A full game data directory contains dozens of .txt files.
+:py:func:`load_txt_directory` parses them in parallel and returns them
+by table name, e.g. ``"Weapons"`` for ``Weapons.txt``. It also loads
+zip and tar archives of .txt files, see
+:py:mod:`~d2lfg.d2core.data.txtarchive`.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from ...error import DataLookupError
+from .txt import Diablo2TxtFile, Diablo2TxtParser
+from .txtarchive import is_txt_archive, load_txt_archive
+
+
+def find_txt_tables(directory: Union[Path, str]) -> Dict[str, Path]:
+    """
+    Returns the .txt files in a directory, keyed by table name.
+
+    The table name of a file is its name without the ``.txt`` suffix.
+    Tables are returned in order of their case folded names.
+
+    :param directory: the directory to search; subdirectories are not searched
+    """
+    paths = [
+        p
+        for p in Path(directory).iterdir()
+        if p.suffix.casefold() == ".txt" and p.is_file()
+    ]
+    return {p.stem: p for p in sorted(paths, key=lambda p: p.stem.casefold())}
+
+
+def select_txt_tables(
+    available: Mapping[str, Path], tables: Optional[Iterable[str]]
+) -> Dict[str, Path]:
+    """
+    Selects tables by name.
+
+    :param available: all available tables; see :py:func:`find_txt_tables`
+    :param tables: the names of the tables to select, case insensitive; \
+        if ``None``, all tables are selected
+    :raises DataLookupError: if a selected table is not available
+    """
+    if tables is None:
+        return dict(available)
+
+    by_name = {name.casefold(): name for name in available}
+    selected: Dict[str, Path] = dict()
+    for table in tables:
+        name = by_name.get(table.casefold())
+        if name is None:
+            raise DataLookupError(f"{table}: no such txt table")
+        selected[name] = available[name]
+    return selected
+
+
+def load_txt_directory(
+    directory: Union[Path, str],
+    parser: Optional[Diablo2TxtParser] = None,
+    tables: Optional[Iterable[str]] = None,
+    max_workers: Optional[int] = None,
+    use_processes: bool = True,
+) -> Dict[str, Diablo2TxtFile]:
+    """
+    Parses the .txt files in a directory in parallel.
+
+    The result is the same as parsing each file with ``parser`` in turn.
+
+    If ``directory`` is a zip or tar archive, its .txt files are parsed one
+    at a time as they are read from it, see
+    :py:func:`~d2lfg.d2core.data.txtarchive.load_txt_archive`.
+
+    :param directory: the directory containing the .txt files, or an \
+        archive of them
+    :param parser: the parser to parse files with; it must be picklable \
+        if ``use_processes`` is ``True``
+    :param tables: the names of the tables to load, case insensitive; if \
+        ``None``, all .txt files in the directory are loaded
+    :param max_workers: the maximum number of files to parse at once; \
+        defaults to the number of CPUs. If ``1``, files are parsed in the \
+        calling thread.
+    :param use_processes: if ``True``, files are parsed in a process pool; \
+        otherwise, a thread pool is used
+    :raises DataLookupError: if a requested table does not exist
+    """
+    if parser is None:
+        parser = Diablo2TxtParser()
+    if is_txt_archive(directory):
+        return load_txt_archive(directory, parser, tables)
+    paths = select_txt_tables(find_txt_tables(directory), tables)
+
+    if max_workers == 1 or len(paths) <= 1:
+        return {name: parser.parse(path) for name, path in paths.items()}
+
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers)
+
+    with executor:
+        if use_processes:
+            # Records cannot be pickled efficiently, so worker processes
+            # send back plain rows that are turned back into records here.
+            states = {
+                name: executor.submit(_parse_state, parser, path)
+                for name, path in paths.items()
+            }
+            return {
+                name: _from_state(parser, paths[name], state.result())
+                for name, state in states.items()
+            }
+
+        files = {
+            name: executor.submit(parser.parse, path) for name, path in paths.items()
+        }
+        return {name: f.result() for name, f in files.items()}
+
+
+#: A parsed .txt file as plain data: its fields, header, line ending and
+#: the data of each record.
+_TxtFileState = Tuple[Dict[str, int], List[str], str, List[List[str]]]
+
+
+def _parse_state(parser: Diablo2TxtParser, path: Path) -> _TxtFileState:
+    """
+    Parses a file and returns it as plain data that can be pickled.
+
+    Identical values share a single string object, so each distinct value
+    is only pickled once.
+
+    :param parser: the parser to parse the file with
+    :param path: the path of the file
+    """
+    txt_file = parser.parse(path)
+    values: Dict[str, str] = dict()
+    rows = [[values.setdefault(v, v) for v in r.data] for r in txt_file.records]
+    return dict(txt_file.fields), list(txt_file.header), txt_file.newline, rows
+
+
+def _from_state(
+    parser: Diablo2TxtParser, path: Path, state: _TxtFileState
+) -> Diablo2TxtFile:
+    """
+    Turns the plain data returned by :py:func:`_parse_state` back into
+    a :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtFile`.
+
+    :param parser: the parser that parsed the file
+    :param path: the path of the file
+    :param state: the parsed file as plain data
+    """
+    fields = MappingProxyType(state[0])
+    header, newline = state[1], state[2]
+    record_type = parser.record_type
+    rows = state[3]
+    if parser.string_pool is not None:
+        # Strings interned in the worker process are not shared with
+        # this one.
+        rows = [parser.string_pool.intern_all(r) for r in rows]
+    records = [record_type(fields, r) for r in rows]
+    return Diablo2TxtFile(path, records, fields, header, newline)
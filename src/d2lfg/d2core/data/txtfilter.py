@@ -0,0 +1,297 @@
+"""
+``d2lfg.d2core.data.txtfilter``
+===============================
+
+This module contains row filters for :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`.
+
+Row filters are declarative: they describe which rows to keep, and the
+parser compiles them against each file's header. Compiled filters are
+evaluated on each raw line before any record is created, so rows that
+are filtered out cost little more than reading them.
+"""
+
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ...error import DataLookupError
+
+#: A compiled row filter. It is called with a line of a .txt file, without
+#: its line ending, and the fields of the line. Lines and fields are either
+#: both :py:class:`str` or both :py:class:`bytes`. It returns ``True`` if
+#: the row should be kept.
+#:
+#: Fields after the last column named by the filter's
+#: :py:meth:`~Diablo2TxtRowFilter.columns` may not be split apart.
+CompiledRowFilter = Callable[[Any, Sequence[Any]], bool]
+
+
+class Diablo2TxtRowFilter(metaclass=ABCMeta):
+    """
+    Base class for row filters.
+    """
+
+    @abstractmethod
+    def columns(self) -> Iterable[str]:
+        """
+        Returns the names of the columns that this filter reads.
+        """
+        raise NotImplementedError("subclasses must implement columns")
+
+    @abstractmethod
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        """
+        Compiles this filter for a file.
+
+        :param fields: a mapping of :py:meth:`~str.casefold` ed column name \
+            to its index in each line
+        :param encoding: if lines are :py:class:`bytes`, their encoding; \
+            ``None`` if lines are :py:class:`str`
+        :raises DataLookupError: if the file does not have a column the \
+            filter needs
+        """
+        raise NotImplementedError("subclasses must implement compile")
+
+    @abstractmethod
+    def cache_key(self) -> str:
+        """
+        Returns a string identifying this filter, suitable for use in
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.cache_key`.
+        """
+        raise NotImplementedError("subclasses must implement cache_key")
+
+
+@dataclass(frozen=True)
+class Diablo2TxtColumnEquals(Diablo2TxtRowFilter):
+    """
+    Keeps rows where a column has the given value.
+
+    Rows that end before the column have an empty value in it, as in
+    :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.column`.
+    """
+
+    #: The name of the column; case insensitive.
+    column: str
+
+    #: The value the column must have.
+    value: str
+
+    def columns(self) -> Iterable[str]:
+        return (self.column,)
+
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        i = _index(fields, self.column)
+        v = _encode(self.value, encoding)
+        if v:
+            return lambda line, row: len(row) > i and row[i] == v
+        return lambda line, row: len(row) <= i or not row[i]
+
+    def cache_key(self) -> str:
+        return f"eq({self.column.casefold()!r},{self.value!r})"
+
+
+@dataclass(frozen=True)
+class Diablo2TxtColumnIn(Diablo2TxtRowFilter):
+    """
+    Keeps rows where a column has one of the given values.
+
+    Rows that end before the column have an empty value in it, as in
+    :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.column`.
+    """
+
+    #: The name of the column; case insensitive.
+    column: str
+
+    #: The values the column may have.
+    values: FrozenSet[str]
+
+    def __init__(self, column: str, values: Iterable[str]) -> None:
+        # The dataclass is frozen, so fields must be set through object.
+        object.__setattr__(self, "column", column)
+        object.__setattr__(self, "values", frozenset(values))
+
+    def columns(self) -> Iterable[str]:
+        return (self.column,)
+
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        i = _index(fields, self.column)
+        vs = frozenset(_encode(v, encoding) for v in self.values)
+        empty = _encode("", encoding)
+        return lambda line, row: (row[i] if len(row) > i else empty) in vs
+
+    def cache_key(self) -> str:
+        return f"in({self.column.casefold()!r},{sorted(self.values)!r})"
+
+
+@dataclass(frozen=True)
+class Diablo2TxtColumnRange(Diablo2TxtRowFilter):
+    """
+    Keeps rows where an integer column is within a range.
+
+    Empty fields, and the fields of rows that end before the column, are
+    treated as ``0``. Rows where the column is not an integer are not
+    kept.
+    """
+
+    #: The name of the column; case insensitive.
+    column: str
+
+    #: The smallest value to keep; if ``None``, there is no lower bound.
+    low: Optional[int] = None
+
+    #: The largest value to keep; if ``None``, there is no upper bound.
+    high: Optional[int] = None
+
+    def columns(self) -> Iterable[str]:
+        return (self.column,)
+
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        i = _index(fields, self.column)
+        low = self.low
+        high = self.high
+
+        def in_range(line: Union[str, bytes], row: Sequence[Union[str, bytes]]) -> bool:
+            if len(row) <= i:
+                return (low is None or low <= 0) and (high is None or high >= 0)
+            v = row[i]
+            try:
+                # int() accepts both str and bytes.
+                n = int(v) if v.strip() else 0
+            except ValueError:
+                return False
+            return (low is None or n >= low) and (high is None or n <= high)
+
+        return in_range
+
+    def cache_key(self) -> str:
+        return f"range({self.column.casefold()!r},{self.low!r},{self.high!r})"
+
+
+@dataclass(frozen=True)
+class Diablo2TxtNotCommentRow(Diablo2TxtRowFilter):
+    """
+    Keeps rows that have a non-empty field after the first.
+
+    Sometimes the first field of a row is used by itself as a comment.
+    When that happens, the rest of the row is empty.
+    """
+
+    def columns(self) -> Iterable[str]:
+        return ()
+
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        if encoding is not None:
+            return _bytes_not_comment(encoding)
+
+        def not_comment(line: str, row: Sequence[str]) -> bool:
+            # Usually the second field settles it.
+            if len(row) > 1 and row[1] and not row[1].isspace():
+                return True
+            first_tab = line.find("\t")
+            # Everything after the first field is tabs and whitespace
+            # if the row is a comment. strip() removes both.
+            return first_tab >= 0 and bool(line[first_tab + 1 :].strip())
+
+        return not_comment
+
+    def cache_key(self) -> str:
+        return "not_comment()"
+
+
+@dataclass(frozen=True)
+class Diablo2TxtCompleteRow(Diablo2TxtRowFilter):
+    """
+    Keeps rows that have at least as many fields as the file has
+    (distinctly named) columns.
+    """
+
+    def columns(self) -> Iterable[str]:
+        return ()
+
+    def compile(
+        self, fields: Mapping[str, int], encoding: Optional[str]
+    ) -> CompiledRowFilter:
+        tab = _encode("\t", encoding)
+        n = len(fields)
+        # The row may not be split into all of its fields, so fall back
+        # to counting separators if it looks short.
+        return lambda line, row: len(row) >= n or line.count(tab) >= n - 1
+
+    def cache_key(self) -> str:
+        return "complete()"
+
+
+#: Row filters that keep exactly the rows that
+#: :py:func:`~d2lfg.d2core.data.txt.skip_record` does not skip.
+DEFAULT_ROW_FILTERS: Tuple[Diablo2TxtRowFilter, ...] = (
+    Diablo2TxtCompleteRow(),
+    Diablo2TxtNotCommentRow(),
+)
+
+
+def _index(fields: Mapping[str, int], column: str) -> int:
+    """
+    Returns the index of a column.
+
+    :param fields: the fields of the file
+    :param column: the name of the column; case insensitive
+    :raises DataLookupError: if the column does not exist
+    """
+    try:
+        return fields[column.casefold()]
+    except KeyError:
+        raise DataLookupError(f"{column}: no such column") from None
+
+
+def _bytes_not_comment(encoding: str) -> CompiledRowFilter:
+    """
+    Compiles :py:class:`Diablo2TxtNotCommentRow` for lines of
+    :py:class:`bytes`.
+
+    :param encoding: the encoding of the lines
+    """
+
+    def not_comment(line: bytes, row: Sequence[bytes]) -> bool:
+        # A second field starting with a printable ASCII character settles
+        # it. Otherwise, the rest of the line is decoded, since bytes
+        # methods only know ASCII whitespace, and e.g. a no-break space
+        # must count as whitespace as it does for str.
+        if len(row) > 1 and row[1] and 0x20 < row[1][0] < 0x7F:
+            return True
+        first_tab = line.find(b"\t")
+        if first_tab < 0:
+            return False
+        return bool(line[first_tab + 1 :].decode(encoding, "replace").strip())
+
+    return not_comment
+
+
+def _encode(value: str, encoding: Optional[str]) -> Union[str, bytes]:
+    """
+    Encodes a value for comparison with the fields of a line.
+
+    :param value: the value to encode
+    :param encoding: the encoding of the lines, or ``None`` if lines are \
+        :py:class:`str`
+    """
+    return value if encoding is None else value.encode(encoding)
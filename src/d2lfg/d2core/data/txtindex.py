@@ -0,0 +1,280 @@
+"""
+``d2lfg.d2core.data.txtindex``
+==============================
+
+This module contains indexes over the columns of Diablo 2 .txt files.
+
+Indexes are usually created with
+:py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.index`, which builds them
+on first use and discards them when the file's records change.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from ...error import DuplicateKeyError
+
+#: The type of row an index refers to.
+R = TypeVar("R")
+
+
+class Diablo2TxtHashIndex(Generic[R]):
+    """
+    A hash index mapping each value of a column to the rows that have it.
+
+    :param rows: the indexed rows
+    :param positions: for each value, the indices in ``rows`` of the rows \
+        that have it
+    """
+
+    def __init__(self, rows: Sequence[R], positions: Dict[str, List[int]]) -> None:
+        self.rows = rows
+        self.positions = positions
+
+    @classmethod
+    def build(
+        cls, rows: Sequence[R], values: Iterable[str]
+    ) -> "Diablo2TxtHashIndex[R]":
+        """
+        Builds an index.
+
+        :param rows: the rows to index
+        :param values: the value of the indexed column in each row
+        """
+        positions: Dict[str, List[int]] = dict()
+        for i, v in enumerate(values):
+            p = positions.get(v)
+            if p is None:
+                positions[v] = [i]
+            else:
+                p.append(i)
+        return cls(rows, positions)
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Returns ``True`` if any row has the given value.
+
+        :param key: the value to look for
+        """
+        return key in self.positions
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterates over the distinct values in the indexed column.
+        """
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of distinct values in the indexed column.
+        """
+        return len(self.positions)
+
+    def ordinals(self, key: str) -> Sequence[int]:
+        """
+        Returns the indices of the rows that have the given value.
+
+        :param key: the value to look up
+        """
+        return self.positions.get(key, [])
+
+    def lookup(self, key: str) -> List[R]:
+        """
+        Returns the rows that have the given value, in row order.
+
+        :param key: the value to look up
+        """
+        rows = self.rows
+        return [rows[i] for i in self.positions.get(key, [])]
+
+
+class Diablo2TxtUniqueIndex(Diablo2TxtHashIndex[R]):
+    """
+    A hash index over a column whose values are unique, like ``code`` in
+    ``Weapons.txt``.
+
+    :param rows: see :py:class:`Diablo2TxtHashIndex`
+    :param positions: see :py:class:`Diablo2TxtHashIndex`; each value has \
+        exactly one position
+    """
+
+    @classmethod
+    def build(
+        cls, rows: Sequence[R], values: Iterable[str]
+    ) -> "Diablo2TxtUniqueIndex[R]":
+        """
+        Builds an index.
+
+        :param rows: the rows to index
+        :param values: the value of the indexed column in each row
+        :raises DuplicateKeyError: if a value appears more than once
+        """
+        positions: Dict[str, List[int]] = dict()
+        for i, v in enumerate(values):
+            if v in positions:
+                raise DuplicateKeyError(f"{v!r}: in rows {positions[v][0]} and {i}")
+            positions[v] = [i]
+        return cls(rows, positions)
+
+    def __getitem__(self, key: str) -> R:
+        """
+        Returns the row with the given value.
+
+        :param key: the value to look up
+        :raises KeyError: if no row has the value
+        """
+        return self.rows[self.positions[key][0]]
+
+    def get(self, key: str) -> Optional[R]:
+        """
+        Returns the row with the given value, or ``None`` if there is none.
+
+        :param key: the value to look up
+        """
+        p = self.positions.get(key)
+        return None if p is None else self.rows[p[0]]
+
+
+class Diablo2TxtRangeIndex(Generic[R]):
+    """
+    A sorted index over an integer column, for range and top-k queries.
+
+    Queries take O(log n + k) time for k results. Rows with no value
+    in the column are not indexed. Rows with equal values are kept in
+    row order.
+
+    :param rows: the indexed rows
+    :param keys: the indexed values, in ascending order
+    :param ordinals: for each value in ``keys``, the index in ``rows`` \
+        of its row
+    """
+
+    def __init__(
+        self, rows: Sequence[R], keys: Sequence[int], ordinals: Sequence[int]
+    ) -> None:
+        self.rows = rows
+        self.keys = keys
+        self.ordinals = ordinals
+
+    @classmethod
+    def build(
+        cls, rows: Sequence[R], values: Sequence[Optional[int]]
+    ) -> "Diablo2TxtRangeIndex[R]":
+        """
+        Builds an index.
+
+        :param rows: the rows to index
+        :param values: the value of the indexed column in each row, e.g. a \
+            :py:class:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtTypedColumn`
+        """
+        present = [(v, i) for i, v in enumerate(values) if v is not None]
+        present.sort(key=lambda p: p[0])
+        keys = array("q", (v for v, _ in present))
+        ordinals = array("q", (i for _, i in present))
+        return cls(rows, keys, ordinals)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of indexed rows.
+        """
+        return len(self.keys)
+
+    def ordinal_range(
+        self, low: Optional[int] = None, high: Optional[int] = None
+    ) -> Sequence[int]:
+        """
+        Returns the indices of the rows whose value is between ``low`` and
+        ``high``, inclusive, in ascending order of value.
+
+        :param low: the smallest value; if ``None``, there is no lower bound
+        :param high: the largest value; if ``None``, there is no upper bound
+        """
+        start, end = self._bounds(low, high)
+        return self.ordinals[start:end]
+
+    def range(self, low: Optional[int] = None, high: Optional[int] = None) -> List[R]:
+        """
+        Returns the rows whose value is between ``low`` and ``high``,
+        inclusive, in ascending order of value.
+
+        :param low: the smallest value; if ``None``, there is no lower bound
+        :param high: the largest value; if ``None``, there is no upper bound
+        """
+        rows = self.rows
+        return [rows[i] for i in self.ordinal_range(low, high)]
+
+    def count(self, low: Optional[int] = None, high: Optional[int] = None) -> int:
+        """
+        Returns the number of rows whose value is between ``low`` and
+        ``high``, inclusive.
+
+        :param low: the smallest value; if ``None``, there is no lower bound
+        :param high: the largest value; if ``None``, there is no upper bound
+        """
+        start, end = self._bounds(low, high)
+        return max(end - start, 0)
+
+    def descending_ordinals(
+        self, low: Optional[int] = None, high: Optional[int] = None
+    ) -> Iterator[int]:
+        """
+        Yields the indices of the rows whose value is between ``low`` and
+        ``high``, inclusive, in descending order of value. Rows with equal
+        values are yielded in row order.
+
+        :param low: the smallest value; if ``None``, there is no lower bound
+        :param high: the largest value; if ``None``, there is no upper bound
+        """
+        keys = self.keys
+        ordinals = self.ordinals
+        start, end = self._bounds(low, high)
+        while end > start:
+            # Find the run of equal values ending at end.
+            run = end - 1
+            value = keys[run]
+            while run > start and keys[run - 1] == value:
+                run -= 1
+            yield from ordinals[run:end]
+            end = run
+
+    def top(self, k: int) -> List[R]:
+        """
+        Returns the ``k`` rows with the largest values, largest first. Rows
+        with equal values are in row order.
+
+        :param k: the number of rows to return
+        """
+        rows = self.rows
+        return [rows[i] for i in islice(self.descending_ordinals(), max(k, 0))]
+
+    def bottom(self, k: int) -> List[R]:
+        """
+        Returns the ``k`` rows with the smallest values, smallest first.
+
+        :param k: the number of rows to return
+        """
+        rows = self.rows
+        return [rows[i] for i in self.ordinals[: max(k, 0)]]
+
+    def _bounds(self, low: Optional[int], high: Optional[int]) -> Tuple[int, int]:
+        """
+        Returns the slice of :py:attr:`keys` between ``low`` and ``high``.
+
+        :param low: the smallest value; if ``None``, there is no lower bound
+        :param high: the largest value; if ``None``, there is no upper bound
+        """
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return start, max(start, end)
@@ -0,0 +1,125 @@
+"""
+``d2lfg.d2core.data.txtintern``
+===============================
+
+This module contains :py:class:`Diablo2TxtStringPool`, which lets parsed
+Diablo 2 .txt files share a single copy of each distinct field value.
+
+The same short values (``0``, ``1``, item type codes, body locations and
+so on) appear many times in every table. Each field is normally its own
+:py:class:`str` object; passing a pool to
+:py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser` replaces repeated
+values with one shared object. One pool may be shared by any number of
+parsers, files and mod versions.
+"""
+
+import sys
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+
+class Diablo2TxtStringPoolStats(NamedTuple):
+    """
+    Statistics about a :py:class:`Diablo2TxtStringPool`.
+    """
+
+    #: The number of distinct strings in the pool.
+    strings: int
+
+    #: The number of strings passed through the pool.
+    lookups: int
+
+    #: The approximate number of bytes used by the copies of strings
+    #: that were replaced by a pooled string; ``0`` unless the pool
+    #: tracks savings.
+    bytes_saved: int
+
+
+class Diablo2TxtStringPool:
+    """
+    A pool of strings that replaces equal strings with a single shared
+    object.
+
+    Unlike :py:func:`sys.intern`, the pool is only used by the parsers it
+    is given to, and it is freed with them.
+
+    Pools are pickled empty, so that a parser sent to a worker process
+    does not carry a copy of every string.
+
+    :param track_savings: if ``True``, :py:meth:`stats` reports the memory \
+        saved, at the cost of checking every interned string
+    """
+
+    def __init__(self, track_savings: bool = False) -> None:
+        self.track_savings = track_savings
+        self._strings: Dict[str, str] = dict()
+        self._lookups = 0
+        self._bytes_saved = 0
+
+    def intern(self, value: str) -> str:
+        """
+        Returns the pooled string equal to ``value``, adding ``value`` to
+        the pool if there is none.
+
+        :param value: the string to intern
+        """
+        return self.intern_all((value,))[0]
+
+    def intern_all(self, values: Sequence[str]) -> List[str]:
+        """
+        Interns each of the given strings.
+
+        This is faster than calling :py:meth:`intern` for each string.
+
+        :param values: the strings to intern, e.g. a row of fields
+        """
+        setdefault = self._strings.setdefault
+        pooled = [setdefault(v, v) for v in values]
+        self._lookups += len(pooled)
+        if self.track_savings:
+            # A string replaced by a different, equal object is a copy
+            # that can be freed. CPython already shares empty and single
+            # character strings, so those are never replaced.
+            self._bytes_saved += sum(
+                sys.getsizeof(v) for v, p in zip(values, pooled) if v is not p
+            )
+        return pooled
+
+    def stats(self) -> Diablo2TxtStringPoolStats:
+        """
+        Returns statistics about the strings interned since the pool was
+        created or last cleared.
+
+        The memory saved is an estimate: it counts every replaced string,
+        whether or not the records holding its pooled copy are still alive.
+        """
+        return Diablo2TxtStringPoolStats(
+            len(self._strings), self._lookups, self._bytes_saved
+        )
+
+    def clear(self) -> None:
+        """
+        Empties the pool and resets its statistics.
+
+        Strings already handed out stay shared with each other, but will
+        not be shared with strings interned afterwards.
+        """
+        self._strings.clear()
+        self._lookups = 0
+        self._bytes_saved = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of distinct strings in the pool.
+        """
+        return len(self._strings)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Returns the state to pickle, which is that of an empty pool.
+        """
+        return {
+            "track_savings": self.track_savings,
+            "_strings": dict(),
+            "_lookups": 0,
+            "_bytes_saved": 0,
+        }
@@ -0,0 +1,272 @@
+"""
+``d2lfg.d2core.data.txtjoin``
+=============================
+
+This module contains hash joins between Diablo 2 .txt files.
+
+Many columns refer to rows of another table (or of the same table), like
+``Weapons.txt``'s ``type`` to ``ItemTypes.txt``'s ``Code``, or
+``ItemTypes.txt``'s ``Equiv1`` to its own ``Code``. A
+:py:class:`Diablo2TxtJoin` pairs up the rows on both ends of such a
+reference. For example, the name of each weapon's item type::
+
+    for weapon, item_type in join(weapons, item_types, "type", "code"):
+        print(weapon["name"], item_type["ItemType"])
+
+A join builds a hash table over the key column of one table and probes
+it with each row of the other, so it takes time proportional to the
+sizes of the two tables rather than their product. An index that has
+already been built over either key column (see
+:py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.index`) is used as the
+hash table; otherwise, the smaller table is indexed.
+:py:meth:`Diablo2TxtJoin.explain` describes how a join will be run.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ...error import DataLookupError
+from .txt import Diablo2TxtFile, Diablo2TxtRecord
+from .txtindex import Diablo2TxtHashIndex
+
+
+class Diablo2TxtJoinType(Enum):
+    """
+    Which rows a :py:class:`Diablo2TxtJoin` produces.
+    """
+
+    #: Only pairs of matching rows.
+    INNER = "inner"
+
+    #: Pairs of matching rows, and each left row that matches no right
+    #: row, paired with ``None``.
+    LEFT = "left"
+
+
+class Diablo2TxtJoinedRow(NamedTuple):
+    """
+    A row of a :py:class:`Diablo2TxtJoin`: a left row and the right row it
+    matches. The rows are not copied.
+    """
+
+    #: The row of the left table.
+    left: Diablo2TxtRecord
+
+    #: The matching row of the right table, or ``None`` if a left join
+    #: found no match.
+    right: Optional[Diablo2TxtRecord]
+
+    def field(self, name: str) -> str:
+        """
+        Returns a field by column name, from the left row if it has the
+        column, and from the right row otherwise. Fields of a missing
+        right row, and of rows that end before the column, are empty.
+
+        :param name: the name of the column; case insensitive
+        :raises KeyError: if neither row has the column, and there is a \
+            right row
+        """
+        folded = name.casefold()
+        row = self.left
+        i = row.fields.get(folded)
+        if i is None:
+            if self.right is None:
+                return ""
+            row = self.right
+            i = row.fields[folded]
+        data = row.data
+        return data[i] if i < len(data) else ""
+
+
+@dataclass(frozen=True)
+class Diablo2TxtJoin:
+    """
+    A hash join of two .txt files on a key column of each. Usually created
+    with :py:func:`join`.
+
+    Joined rows are produced lazily, in order of the left rows; a left row
+    that matches several right rows produces one joined row for each, in
+    order of the right rows. Empty keys never match, since an empty field
+    usually means the row refers to nothing.
+
+    :param left: the left table
+    :param right: the right table; may be the same file as ``left``
+    :param left_on: the name of the key column in ``left``; case insensitive
+    :param right_on: the name of the key column in ``right``; case \
+        insensitive
+    :param join_type: which rows to produce
+    :param build_indexes: if ``True``, the hash table is built with \
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.index`, so later \
+        joins and queries on the same column reuse it; otherwise, only \
+        already built indexes are reused, and other hash tables are \
+        discarded after the join
+    """
+
+    left: Diablo2TxtFile
+    right: Diablo2TxtFile
+    left_on: str
+    right_on: str
+    join_type: Diablo2TxtJoinType = Diablo2TxtJoinType.INNER
+    build_indexes: bool = True
+
+    def __iter__(self) -> Iterator[Diablo2TxtJoinedRow]:
+        """
+        Runs the join, yielding each joined row.
+
+        :raises DataLookupError: if a key column does not exist
+        """
+        build_left, index = self._choose()
+        if index is None:
+            index = self._build(build_left)
+        if build_left:
+            return self._probe_right(index)
+        return self._probe_left(index)
+
+    def count(self) -> int:
+        """
+        Runs the join, returning the number of joined rows.
+
+        :raises DataLookupError: if a key column does not exist
+        """
+        return sum(1 for _ in self)
+
+    def explain(self) -> Tuple[str, ...]:
+        """
+        Returns a description of each step of the join, in order. The join
+        is not run, and no hash table is built.
+
+        :raises DataLookupError: if a key column does not exist
+        """
+        build_left, index = self._choose()
+        if index is not None:
+            how, keys = "existing", f" ({len(index)} keys)"
+        else:
+            how, keys = ("new" if self.build_indexes else "temporary"), ""
+        left_rows, right_rows = len(self.left.records), len(self.right.records)
+        if build_left:
+            return (
+                f"{how} hash index on left {self.left_on!r}{keys}",
+                f"probe with {right_rows} right rows on {self.right_on!r}",
+                f"{self.join_type.value} join in left row order",
+            )
+        return (
+            f"{how} hash index on right {self.right_on!r}{keys}",
+            f"probe with {left_rows} left rows on {self.left_on!r}",
+            f"{self.join_type.value} join in left row order",
+        )
+
+    def _choose(
+        self,
+    ) -> Tuple[bool, Optional[Diablo2TxtHashIndex[Diablo2TxtRecord]]]:
+        """
+        Chooses which table to build the hash table over.
+
+        Returns whether the hash table is over the left table, and the hash
+        table if it has already been built.
+        """
+        for table, column in ((self.left, self.left_on), (self.right, self.right_on)):
+            if column.casefold() not in table.fields:
+                raise DataLookupError(f"{column}: no such column")
+
+        index = self.right.cached_index(self.right_on)
+        if index is not None:
+            return False, index
+        index = self.left.cached_index(self.left_on)
+        if index is not None:
+            return True, index
+        return len(self.left.records) < len(self.right.records), None
+
+    def _build(self, build_left: bool) -> Diablo2TxtHashIndex[Diablo2TxtRecord]:
+        """
+        Builds the hash table.
+
+        :param build_left: whether to build it over the left table
+        """
+        table, column = (
+            (self.left, self.left_on) if build_left else (self.right, self.right_on)
+        )
+        if self.build_indexes:
+            return table.index(column)
+        return Diablo2TxtHashIndex.build(table.records, table.column(column))
+
+    def _probe_left(
+        self, index: Diablo2TxtHashIndex[Diablo2TxtRecord]
+    ) -> Iterator[Diablo2TxtJoinedRow]:
+        """
+        Yields the joined rows, probing a hash table over the right table
+        with each left row.
+
+        :param index: the hash table over the right table's key column
+        """
+        rows, positions = index.rows, index.positions
+        keep_unmatched = self.join_type is Diablo2TxtJoinType.LEFT
+        for record, key in zip(self.left.records, self.left.column(self.left_on)):
+            matches = positions.get(key) if key else None
+            if matches:
+                for i in matches:
+                    yield Diablo2TxtJoinedRow(record, rows[i])
+            elif keep_unmatched:
+                yield Diablo2TxtJoinedRow(record, None)
+
+    def _probe_right(
+        self, index: Diablo2TxtHashIndex[Diablo2TxtRecord]
+    ) -> Iterator[Diablo2TxtJoinedRow]:
+        """
+        Yields the joined rows, probing a hash table over the left table
+        with each right row.
+
+        Every right row is probed before the first joined row is yielded,
+        so that joined rows come in left row order like those of
+        :py:meth:`_probe_left`.
+
+        :param index: the hash table over the left table's key column
+        """
+        positions = index.positions
+        matches: Dict[int, List[Diablo2TxtRecord]] = dict()
+        for record, key in zip(self.right.records, self.right.column(self.right_on)):
+            if key:
+                for i in positions.get(key, ()):
+                    m = matches.get(i)
+                    if m is None:
+                        matches[i] = [record]
+                    else:
+                        m.append(record)
+
+        keep_unmatched = self.join_type is Diablo2TxtJoinType.LEFT
+        for i, record in enumerate(self.left.records):
+            m = matches.get(i)
+            if m is not None:
+                for match in m:
+                    yield Diablo2TxtJoinedRow(record, match)
+            elif keep_unmatched:
+                yield Diablo2TxtJoinedRow(record, None)
+
+
+def join(
+    left: Diablo2TxtFile,
+    right: Diablo2TxtFile,
+    left_on: str,
+    right_on: Optional[str] = None,
+    join_type: Diablo2TxtJoinType = Diablo2TxtJoinType.INNER,
+    build_indexes: bool = True,
+) -> Diablo2TxtJoin:
+    """
+    Returns a hash join of two .txt files. See :py:class:`Diablo2TxtJoin`.
+
+    :param left: the left table
+    :param right: the right table; may be the same file as ``left``
+    :param left_on: the name of the key column in ``left``; case insensitive
+    :param right_on: the name of the key column in ``right``; defaults to \
+        ``left_on``
+    :param join_type: which rows to produce
+    :param build_indexes: see :py:class:`Diablo2TxtJoin`
+    """
+    return Diablo2TxtJoin(
+        left,
+        right,
+        left_on,
+        left_on if right_on is None else right_on,
+        join_type,
+        build_indexes,
+    )
@@ -0,0 +1,321 @@
+"""
+``d2lfg.d2core.data.txtlineindex``
+==================================
+
+This module contains :py:class:`Diablo2TxtLineIndex`, which records
+where each row of a Diablo 2 .txt file starts, so that single rows can
+be read without parsing the whole file.
+
+An index is built in one pass over the file and can be saved next to
+it (as ``<file>.lineidx``). It also records the file's header, line
+ending and row count, and optionally the rows with each value of some
+key columns. Reading a row seeks to it and splits just that line.
+"""
+
+from array import array
+import marshal
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from types import MappingProxyType
+from typing import (
+    Dict,
+    IO,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .txt import DEFAULT_ENCODING, DEFAULT_NEWLINE, Diablo2TxtRecord
+from .txtfilter import DEFAULT_ROW_FILTERS, Diablo2TxtRowFilter
+
+#: Version of the saved index format. Changing it invalidates all saved
+#: indexes.
+LINE_INDEX_FORMAT_VERSION = 1
+
+#: The suffix added to a .txt file's name to get the path of its index.
+LINE_INDEX_SUFFIX = ".lineidx"
+
+
+class Diablo2TxtLineIndex:
+    """
+    The positions of the rows of a .txt file.
+
+    Use :py:meth:`build`, :py:meth:`load` or :py:meth:`open` to create
+    one. Rows are numbered from ``0`` in file order, counting only rows
+    that pass the index's row filters; with the default filters, row
+    numbers match the records of
+    :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.parse`.
+
+    :param path: the path of the indexed file
+    :param header: the column names in the file's header
+    :param newline: the file's line ending
+    :param offsets: the byte offset in the file of each row
+    :param keys: for each key column, by :py:meth:`~str.casefold` ed name, \
+        the numbers of the rows with each value
+    :param encoding: the text encoding of the file
+    :param filters_key: identifies the row filters the index was built with
+    :param stat: the size and modification time of the file when it was \
+        indexed
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        header: Sequence[str],
+        newline: str,
+        offsets: Sequence[int],
+        keys: Mapping[str, Mapping[str, Sequence[int]]],
+        encoding: str,
+        filters_key: str,
+        stat: Tuple[int, int],
+    ) -> None:
+        self.path = Path(path)
+        self.header = header
+        self.newline = newline
+        self.offsets = offsets
+        self.keys = keys
+        self.encoding = encoding
+        self.filters_key = filters_key
+        self.stat = stat
+        self.fields: Mapping[str, int] = MappingProxyType(
+            {v.casefold(): k for k, v in enumerate(header)}
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: Union[Path, str],
+        key_columns: Iterable[str] = (),
+        encoding: str = DEFAULT_ENCODING,
+        filters: Iterable[Diablo2TxtRowFilter] = DEFAULT_ROW_FILTERS,
+    ) -> "Diablo2TxtLineIndex":
+        """
+        Indexes a file in one pass.
+
+        :param path: the path of the file
+        :param key_columns: the names of columns to index the values of, \
+            case insensitive; names not in the file's header are ignored
+        :param encoding: the text encoding of the file
+        :param filters: row filters that indexed rows must satisfy
+        """
+        filters = tuple(filters)
+        stat = _stat(path)
+        offsets = array("q")
+        keys: Dict[str, Dict[str, List[int]]] = dict()
+        with open(path, "rb") as f:
+            first = f.readline()
+            text = first.decode(encoding)
+            header = text.rstrip("\r\n").split("\t") if first else []
+            newline = text[len(text.rstrip("\r\n")) :] or DEFAULT_NEWLINE
+            fields = {v.casefold(): k for k, v in enumerate(header)}
+
+            key_indices: List[Tuple[int, Dict[str, List[int]]]] = list()
+            for column in key_columns:
+                i = fields.get(column.casefold())
+                if i is not None and column.casefold() not in keys:
+                    values = keys[column.casefold()] = dict()
+                    key_indices.append((i, values))
+            compiled = [flt.compile(fields, encoding) for flt in filters]
+
+            # Lines are only split as far as the key and filter columns.
+            needed = [i for i, _ in key_indices]
+            for flt in filters:
+                needed.extend(fields[c.casefold()] for c in flt.columns())
+            maxsplit = max(needed, default=0) + 1
+
+            position = len(first)
+            for line in f:
+                start = position
+                position += len(line)
+                line = line.rstrip(b"\r\n")
+                row = line.split(b"\t", maxsplit)
+                if not all(c(line, row) for c in compiled):
+                    continue
+                ordinal = len(offsets)
+                offsets.append(start)
+                for i, values in key_indices:
+                    key = row[i].decode(encoding) if i < len(row) else ""
+                    values.setdefault(key, []).append(ordinal)
+
+        return cls(
+            path, header, newline, offsets, keys, encoding, _filters_key(filters), stat
+        )
+
+    @classmethod
+    def load(
+        cls, path: Union[Path, str], index_path: Union[None, Path, str] = None
+    ) -> Optional["Diablo2TxtLineIndex"]:
+        """
+        Loads a saved index. Returns ``None`` if there is none, it cannot
+        be read, or the file has changed since it was indexed.
+
+        :param path: the path of the indexed file
+        :param index_path: the path of the saved index; defaults to \
+            :py:func:`index_path_for` ``path``
+        """
+        if index_path is None:
+            index_path = index_path_for(path)
+        try:
+            with open(index_path, "rb") as f:
+                state = marshal.loads(f.read())
+            version, stat, encoding, filters_key, header, newline, offsets, keys = state
+            if version != LINE_INDEX_FORMAT_VERSION or tuple(stat) != _stat(path):
+                return None
+            rows = array("q")
+            rows.frombytes(offsets)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return cls(
+            path, header, newline, rows, keys, encoding, filters_key, tuple(stat)
+        )
+
+    @classmethod
+    def open(
+        cls,
+        path: Union[Path, str],
+        key_columns: Iterable[str] = (),
+        encoding: str = DEFAULT_ENCODING,
+        filters: Iterable[Diablo2TxtRowFilter] = DEFAULT_ROW_FILTERS,
+        index_path: Union[None, Path, str] = None,
+    ) -> "Diablo2TxtLineIndex":
+        """
+        Loads the saved index of a file if it is up to date and was built
+        with the same settings; otherwise builds and saves a new one.
+
+        :param path: the path of the file
+        :param key_columns: see :py:meth:`build`; a saved index is only used \
+            if it has all of these key columns
+        :param encoding: the text encoding of the file
+        :param filters: see :py:meth:`build`
+        :param index_path: see :py:meth:`load`
+        """
+        filters = tuple(filters)
+        key_columns = [c.casefold() for c in key_columns]
+        index = cls.load(path, index_path)
+        if (
+            index is None
+            or index.encoding != encoding
+            or index.filters_key != _filters_key(filters)
+            or any(c in index.fields and c not in index.keys for c in key_columns)
+        ):
+            index = cls.build(path, key_columns, encoding, filters)
+            index.save(index_path)
+        return index
+
+    def save(self, index_path: Union[None, Path, str] = None) -> None:
+        """
+        Saves the index.
+
+        The index is written to a temporary file first, so readers never
+        see a partially written index.
+
+        :param index_path: where to save the index; defaults to \
+            :py:func:`index_path_for` the indexed file
+        """
+        index_path = Path(
+            index_path_for(self.path) if index_path is None else index_path
+        )
+        offsets = array("q", self.offsets).tobytes()
+        keys = {
+            c: {k: list(v) for k, v in values.items()}
+            for c, values in self.keys.items()
+        }
+        state = (
+            LINE_INDEX_FORMAT_VERSION,
+            self.stat,
+            self.encoding,
+            self.filters_key,
+            list(self.header),
+            self.newline,
+            offsets,
+            keys,
+        )
+        with NamedTemporaryFile("wb", dir=index_path.parent, delete=False) as f:
+            try:
+                marshal.dump(state, f)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, index_path)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of indexed rows.
+        """
+        return len(self.offsets)
+
+    def record(self, ordinal: int) -> Diablo2TxtRecord:
+        """
+        Reads a single row.
+
+        :param ordinal: the number of the row
+        :raises IndexError: if there is no such row
+        """
+        return self.records([ordinal])[0]
+
+    def records(self, ordinals: Iterable[int]) -> List[Diablo2TxtRecord]:
+        """
+        Reads the given rows, opening the file once.
+
+        :param ordinals: the numbers of the rows
+        :raises IndexError: if there is no such row
+        """
+        with open(self.path, "rb") as f:
+            return [self._read(f, o) for o in ordinals]
+
+    def lookup(self, column: str, key: str) -> List[Diablo2TxtRecord]:
+        """
+        Reads the rows with the given value in a key column.
+
+        :param column: the name of the key column; case insensitive
+        :param key: the value to look up
+        :raises KeyError: if the column was not indexed
+        """
+        return self.records(self.keys[column.casefold()].get(key, ()))
+
+    def _read(self, f: IO[bytes], ordinal: int) -> Diablo2TxtRecord:
+        """
+        Reads a row from an open file.
+
+        :param f: the indexed file, opened in binary mode
+        :param ordinal: the number of the row
+        """
+        f.seek(self.offsets[ordinal])
+        line = f.readline().decode(self.encoding)
+        return Diablo2TxtRecord(self.fields, line.rstrip("\r\n").split("\t"))
+
+
+def index_path_for(path: Union[Path, str]) -> Path:
+    """
+    Returns the default path of the saved index of a file.
+
+    :param path: the path of the file
+    """
+    path = Path(path)
+    return path.with_name(path.name + LINE_INDEX_SUFFIX)
+
+
+def _stat(path: Union[Path, str]) -> Tuple[int, int]:
+    """
+    Returns the size and modification time of a file, which identify a
+    version of it.
+
+    :param path: the path of the file
+    """
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _filters_key(filters: Sequence[Diablo2TxtRowFilter]) -> str:
+    """
+    Returns a string identifying a sequence of row filters.
+
+    :param filters: the row filters
+    """
+    return ",".join(f.cache_key() for f in filters)
@@ -0,0 +1,246 @@
+"""
+``d2lfg.d2core.data.txtmerge``
+==============================
+
+This module contains :py:class:`Diablo2MergedTxtFile`, which presents
+several Diablo 2 .txt files as a single table without copying their rows.
+
+Diablo 2 treats ``Weapons.txt``, ``Armor.txt`` and ``Misc.txt`` as three
+parts of one item table: it reads them one after another and numbers
+their rows consecutively. :py:func:`merge_item_tables` builds the same
+table.
+"""
+
+from bisect import bisect_right
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, overload, Sequence, Tuple, Union
+
+from ...error import DataLookupError
+from .txt import DEFAULT_NEWLINE, Diablo2TxtFile, Diablo2TxtRecord
+
+#: The tables that make up the game's item table, in the order the game
+#: reads them.
+ITEM_TABLES = ("Weapons", "Armor", "Misc")
+
+
+class Diablo2MergedRowData(Sequence[str]):
+    """
+    A view of a row of one part of a :py:class:`Diablo2MergedTxtFile`,
+    laid out in the merged table's columns.
+
+    This is used as the ``data`` of the merged file's
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord` objects. Columns
+    that the row's part does not have are empty.
+
+    :param data: the row's data in its own part
+    :param remap: for each merged column, the index of that column in \
+        ``data``, or ``-1`` if the part does not have it
+    """
+
+    __slots__ = ("data", "remap")
+
+    def __init__(self, data: Sequence[str], remap: Sequence[int]) -> None:
+        self.data = data
+        self.remap = remap
+
+    @overload
+    def __getitem__(self, i: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, Sequence[str]]:
+        """
+        Returns the field in the given merged column, or a list of fields
+        if given a slice.
+
+        :param i: the field index or slice to fetch
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.remap)))]
+        j = self.remap[i]
+        data = self.data
+        return data[j] if 0 <= j < len(data) else ""
+
+    def __len__(self) -> int:
+        """
+        Returns the number of merged columns.
+        """
+        return len(self.remap)
+
+
+class _MergedRecords(Sequence[Diablo2TxtRecord]):
+    """
+    Sequence of record views over a :py:class:`Diablo2MergedTxtFile`.
+    """
+
+    def __init__(self, txt_file: "Diablo2MergedTxtFile") -> None:
+        self._txt_file = txt_file
+
+    @overload
+    def __getitem__(self, i: int) -> Diablo2TxtRecord:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[Diablo2TxtRecord]:
+        ...
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Diablo2TxtRecord, Sequence[Diablo2TxtRecord]]:
+        f = self._txt_file
+        if isinstance(i, slice):
+            return [f.record(j) for j in range(*i.indices(f.row_count))]
+        if i < 0:
+            i += f.row_count
+        if not 0 <= i < f.row_count:
+            raise IndexError("record index out of range")
+        return f.record(i)
+
+    def __len__(self) -> int:
+        return self._txt_file.row_count
+
+
+class Diablo2MergedTxtFile(Diablo2TxtFile):
+    """
+    A :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtFile` made of several
+    others, one after another.
+
+    The merged file has every column of every part, in order of first
+    appearance. Rows are numbered consecutively across parts, so the
+    first row of the second part comes right after the last row of the
+    first. :py:attr:`records` is a sequence of
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord` views over the
+    parts' rows; no row data is copied.
+
+    If the records of a part change, call :py:meth:`invalidate`.
+
+    :param parts: the files to merge, in order
+    :param path: the path to report for the merged file, if any
+    """
+
+    def __init__(
+        self,
+        parts: Sequence[Diablo2TxtFile],
+        path: Union[None, str, Path] = None,
+    ) -> None:
+        self.parts = tuple(parts)
+        fields: Dict[str, int] = dict()
+        for part in self.parts:
+            for name in sorted(part.fields, key=part.fields.__getitem__):
+                fields.setdefault(name, len(fields))
+        self.remaps = tuple(
+            tuple(part.fields.get(name, -1) for name in fields) for part in self.parts
+        )
+        self.offsets: Tuple[int, ...] = tuple()
+        self.row_count = 0
+        header = [self._original_name(name) for name in fields]
+        newline = self.parts[0].newline if self.parts else DEFAULT_NEWLINE
+        super().__init__(
+            path, _MergedRecords(self), MappingProxyType(fields), header, newline
+        )
+
+    def _original_name(self, name: str) -> str:
+        """
+        Returns a merged column's name as it appears in the header of the
+        first part that has it.
+
+        :param name: the :py:meth:`~str.casefold` ed name of the column
+        """
+        for part in self.parts:
+            i = part.fields.get(name)
+            if i is not None and i < len(part.header):
+                return part.header[i]
+        return name
+
+    def invalidate(self) -> None:
+        """
+        Discards everything derived from the parts' records and recounts
+        their rows.
+        """
+        offsets: List[int] = list()
+        row_count = 0
+        for part in self.parts:
+            offsets.append(row_count)
+            row_count += len(part.records)
+        self.offsets = tuple(offsets)
+        self.row_count = row_count
+        super().invalidate()
+
+    def locate(self, ordinal: int) -> Tuple[int, int]:
+        """
+        Returns the index of the part containing a row of the merged file,
+        and the index of the row within that part.
+
+        :param ordinal: the index of the row in the merged file; must not \
+            be negative
+        """
+        part = bisect_right(self.offsets, ordinal) - 1
+        return part, ordinal - self.offsets[part]
+
+    def ordinal(self, part: int, row: int) -> int:
+        """
+        Returns the index in the merged file of a row of one of its parts.
+
+        :param part: the index of the part
+        :param row: the index of the row within the part
+        """
+        return self.offsets[part] + row
+
+    def record(self, ordinal: int) -> Diablo2TxtRecord:
+        """
+        Returns a view of the record at the given row.
+
+        :param ordinal: the index of the row in the merged file; must not \
+            be negative
+        """
+        part, row = self.locate(ordinal)
+        data = self.parts[part].records[row].data
+        return Diablo2TxtRecord(
+            self.fields, Diablo2MergedRowData(data, self.remaps[part])
+        )
+
+    def column(self, name: str) -> Sequence[str]:
+        """
+        Returns every value in the given column, in merged row order.
+
+        Rows from parts that do not have the column are empty.
+
+        :param name: the name of the column; case insensitive
+        """
+        folded = name.casefold()
+        if folded not in self.fields:
+            raise KeyError(name)
+        values: List[str] = list()
+        for part in self.parts:
+            i = part.fields.get(folded)
+            if i is None:
+                values.extend([""] * len(part.records))
+            else:
+                values.extend(
+                    r.data[i] if i < len(r.data) else "" for r in part.records
+                )
+        return values
+
+
+def merge_item_tables(tables: Mapping[str, Diablo2TxtFile]) -> Diablo2MergedTxtFile:
+    """
+    Merges ``Weapons.txt``, ``Armor.txt`` and ``Misc.txt`` into the game's
+    item table.
+
+    :param tables: parsed tables keyed by table name, case insensitive, \
+        e.g. the result of \
+        :py:func:`~d2lfg.d2core.data.txtdir.load_txt_directory`
+    :raises DataLookupError: if one of the item tables is missing
+    """
+    by_name = {name.casefold(): txt_file for name, txt_file in tables.items()}
+    parts: List[Diablo2TxtFile] = list()
+    for table in ITEM_TABLES:
+        txt_file = by_name.get(table.casefold())
+        if txt_file is None:
+            raise DataLookupError(f"{table}: no such txt table")
+        parts.append(txt_file)
+    return Diablo2MergedTxtFile(parts)
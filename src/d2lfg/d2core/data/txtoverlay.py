@@ -0,0 +1,346 @@
+"""
+``d2lfg.d2core.data.txtoverlay``
+================================
+
+This module contains :py:class:`Diablo2OverlayTxtFile`, a copy-on-write
+view of a Diablo 2 .txt file.
+
+Mods like Project Diablo 2 ship as a set of changes on top of the
+vanilla tables. An overlay references its base table and stores only
+what differs from it: changed cells, added rows and columns, and which
+rows were removed. Every other lookup falls through to the base, so
+many variants of a table cost little more memory than the table itself.
+"""
+
+from array import array
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, overload, Sequence, Union
+
+from ...error import DataLookupError
+from .txt import Diablo2TxtFile, Diablo2TxtRecord
+from .txtdiff import diff_txt_files
+
+
+class Diablo2OverlayRowData(Sequence[str]):
+    """
+    A view of a row of an overlay's base, with the overlay's changes to
+    it applied.
+
+    This is used as the ``data`` of an overlay's
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord` objects.
+
+    :param data: the row's data in the base
+    :param cells: the changed fields, by column index
+    :param width: the number of columns in the overlay; fields past the \
+        end of ``data`` are empty
+    """
+
+    __slots__ = ("data", "cells", "width")
+
+    def __init__(
+        self, data: Sequence[str], cells: Mapping[int, str], width: int
+    ) -> None:
+        self.data = data
+        self.cells = cells
+        self.width = width
+
+    @overload
+    def __getitem__(self, i: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, Sequence[str]]:
+        """
+        Returns the field in the given column, or a list of fields if given
+        a slice.
+
+        :param i: the field index or slice to fetch
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("field index out of range")
+        v = self.cells.get(i)
+        if v is not None:
+            return v
+        data = self.data
+        return data[i] if i < len(data) else ""
+
+    def __len__(self) -> int:
+        """
+        Returns the number of fields in the row.
+        """
+        return max(len(self.data), self.width)
+
+
+class _OverlayRecords(Sequence[Diablo2TxtRecord]):
+    """
+    Sequence of record views over a :py:class:`Diablo2OverlayTxtFile`.
+    """
+
+    def __init__(self, txt_file: "Diablo2OverlayTxtFile") -> None:
+        self._txt_file = txt_file
+
+    @overload
+    def __getitem__(self, i: int) -> Diablo2TxtRecord:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[Diablo2TxtRecord]:
+        ...
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Diablo2TxtRecord, Sequence[Diablo2TxtRecord]]:
+        f = self._txt_file
+        n = len(f.rows)
+        if isinstance(i, slice):
+            return [f.record(j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("record index out of range")
+        return f.record(i)
+
+    def __len__(self) -> int:
+        return len(self._txt_file.rows)
+
+
+class Diablo2OverlayTxtFile(Diablo2TxtFile):
+    """
+    A :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtFile` that stores only its
+    differences from a base file.
+
+    An overlay starts out with the same rows and columns as its base.
+    Changes made through :py:meth:`set`, :py:meth:`append`,
+    :py:meth:`delete` and :py:meth:`add_column` are kept in the overlay;
+    the base is never modified. Rows without changed cells are the base's
+    own records. :py:meth:`from_variant` builds an overlay from a
+    separately parsed variant of the base.
+
+    The base's records must not change while it has overlays.
+
+    :param base: the file to overlay
+    :param path: the path to report for the overlay, if any
+    """
+
+    def __init__(
+        self, base: Diablo2TxtFile, path: Union[None, str, Path] = None
+    ) -> None:
+        self.base = base
+        #: For each row, the index of its base row, or ``-1 - k`` for the
+        #: ``k`` th appended row.
+        self.rows = array("q", range(len(base.records)))
+        self._cells: Dict[int, Dict[int, str]] = dict()
+        self._appended: List[List[str]] = list()
+        self._fields = dict(base.fields)
+        self._width = self._base_width = max(len(base.header), len(base.fields))
+        super().__init__(
+            path,
+            _OverlayRecords(self),
+            MappingProxyType(self._fields),
+            list(base.header),
+            base.newline,
+        )
+
+    @classmethod
+    def from_variant(
+        cls, base: Diablo2TxtFile, variant: Diablo2TxtFile, key: str
+    ) -> "Diablo2OverlayTxtFile":
+        """
+        Returns an overlay of ``base`` with the same content as ``variant``.
+
+        Rows are matched by a key column (see
+        :py:func:`~d2lfg.d2core.data.txtdiff.diff_txt_files`). Rows only
+        the variant has are appended in the variant's order, and columns
+        only the variant has are added, so the overlay's rows and columns
+        may be in a different order than the variant's. The variant may be
+        discarded afterwards.
+
+        :param base: the file to overlay
+        :param variant: the variant of ``base``
+        :param key: the name of the column to match rows by; case insensitive
+        :raises DuplicateKeyError: if a key appears more than once in \
+            ``base`` or in ``variant``, since its rows could not be matched
+        """
+        base_rows = base.index(key, unique=True)
+        variant.index(key, unique=True)
+        overlay = cls(base, variant.path)
+        if [h.casefold() for h in variant.header] == [
+            h.casefold() for h in base.header
+        ]:
+            remap = list(range(len(variant.header)))
+        else:
+            for name in variant.header:
+                folded = name.casefold()
+                if folded in variant.fields and folded not in overlay.fields:
+                    overlay.add_column(name)
+            remap = [-1] * max(len(variant.header), len(variant.fields))
+            for name, j in variant.fields.items():
+                remap[j] = overlay.fields[name]
+        # Columns the variant does not have are empty in its rows.
+        missing = sorted(set(range(overlay._width)).difference(remap))
+
+        def aligned(data: Sequence[str]) -> Dict[int, str]:
+            cells = {i: "" for i in missing}
+            n = len(data)
+            for j, i in enumerate(remap):
+                if i >= 0:
+                    cells[i] = data[j] if j < n else ""
+            return cells
+
+        diff = diff_txt_files(base, variant, key)
+        for k, change in diff.changed.items():
+            o = base_rows.ordinals(k)[0]
+            for i, value in aligned(change.new.data).items():
+                overlay._set_cell(o, i, value)
+        if diff.removed:
+            removed = {base_rows.ordinals(k)[0] for k in diff.removed}
+            overlay.rows = array("q", (o for o in overlay.rows if o not in removed))
+        for record in diff.added.values():
+            data = [""] * overlay._width
+            for i, value in aligned(record.data).items():
+                data[i] = value
+            overlay._appended.append(data)
+            overlay.rows.append(-len(overlay._appended))
+        overlay.invalidate()
+        return overlay
+
+    @property
+    def changed_rows(self) -> int:
+        """
+        The number of base rows with changed cells.
+        """
+        return len(self._cells)
+
+    @property
+    def appended_rows(self) -> int:
+        """
+        The number of rows that are not in the base.
+        """
+        return len(self._appended)
+
+    def record(self, row: int) -> Diablo2TxtRecord:
+        """
+        Returns the record at the given row.
+
+        :param row: the index of the row; must not be negative
+        """
+        o = self.rows[row]
+        if o < 0:
+            return Diablo2TxtRecord(self.fields, self._appended[-1 - o])
+        record = self.base.records[o]
+        cells = self._cells.get(o)
+        if cells is None and self._width == self._base_width:
+            return record
+        return Diablo2TxtRecord(
+            self.fields, Diablo2OverlayRowData(record.data, cells or {}, self._width)
+        )
+
+    def set(self, row: int, column: str, value: str) -> None:
+        """
+        Sets a field. Setting a field back to its value in the base
+        discards the change.
+
+        :param row: the index of the row
+        :param column: the name of the column; case insensitive
+        :param value: the new value
+        :raises DataLookupError: if the column does not exist
+        """
+        i = self._column(column)
+        o = self.rows[row]
+        if o < 0:
+            self._appended[-1 - o][i] = value
+        else:
+            self._set_cell(o, i, value)
+        self.invalidate()
+
+    def revert(self, row: int) -> None:
+        """
+        Discards the changed cells of a base row.
+
+        :param row: the index of the row
+        """
+        self._cells.pop(self.rows[row], None)
+        self.invalidate()
+
+    def append(self, values: Mapping[str, str]) -> int:
+        """
+        Appends a row, returning its index.
+
+        :param values: the row's fields, keyed by column name, case \
+            insensitive; missing columns are empty
+        :raises DataLookupError: if a column does not exist
+        """
+        data = [""] * self._width
+        for column, value in values.items():
+            data[self._column(column)] = value
+        self._appended.append(data)
+        self.rows.append(-len(self._appended))
+        self.invalidate()
+        return len(self.rows) - 1
+
+    def delete(self, row: int) -> None:
+        """
+        Removes a row.
+
+        :param row: the index of the row
+        """
+        o = self.rows.pop(row)
+        if o >= 0:
+            self._cells.pop(o, None)
+        self.invalidate()
+
+    def add_column(self, name: str) -> None:
+        """
+        Adds an empty column after the last one.
+
+        :param name: the name of the column
+        :raises ValueError: if the column already exists
+        """
+        if name.casefold() in self._fields:
+            raise ValueError(f"{name}: column already exists")
+        self._fields[name.casefold()] = self._width
+        self._width += 1
+        self.header = list(self.header) + [name]
+        for data in self._appended:
+            data.append("")
+        self.invalidate()
+
+    def _column(self, name: str) -> int:
+        """
+        Returns the index of a column.
+
+        :param name: the name of the column; case insensitive
+        :raises DataLookupError: if the column does not exist
+        """
+        try:
+            return self._fields[name.casefold()]
+        except KeyError:
+            raise DataLookupError(f"{name}: no such column") from None
+
+    def _set_cell(self, o: int, i: int, value: str) -> None:
+        """
+        Sets a field of a base row, storing it only if it differs from the
+        base.
+
+        :param o: the index of the row in the base
+        :param i: the index of the column
+        :param value: the new value
+        """
+        data = self.base.records[o].data
+        if value == (data[i] if i < len(data) else ""):
+            cells = self._cells.get(o)
+            if cells is not None:
+                cells.pop(i, None)
+                if not cells:
+                    del self._cells[o]
+        else:
+            self._cells.setdefault(o, dict())[i] = value
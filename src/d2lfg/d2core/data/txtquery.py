@@ -0,0 +1,544 @@
+"""
+``d2lfg.d2core.data.txtquery``
+==============================
+
+This module contains a small query API over Diablo 2 .txt files.
+
+A :py:class:`Diablo2TxtQuery` filters, sorts and limits the rows of one
+or more tables. Conditions are the row filters of
+:py:mod:`~d2lfg.d2core.data.txtfilter`, or any function of a record. For
+example, every item code with four or more max sockets::
+
+    codes = [
+        code
+        for (code,) in query(weapons, armor, misc)
+        .where(Diablo2TxtColumnRange("gemsockets", low=4))
+        .select("code")
+    ]
+
+When a query runs, it is planned: of the conditions that an index can
+answer (equality and range conditions), the one matching the fewest rows
+is answered by a hash or range index (see
+:py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.index` and
+:py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.range_index`), and only
+the rows it matches are tested against the other conditions. Results are
+produced lazily. :py:meth:`Diablo2TxtQuery.explain` describes the plan.
+"""
+
+import heapq
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ...error import DataLookupError
+from .txt import Diablo2TxtFile, Diablo2TxtRecord
+from .txtcolumntypes import Diablo2TxtColumnType
+from .txtfilter import (
+    Diablo2TxtColumnEquals,
+    Diablo2TxtColumnIn,
+    Diablo2TxtColumnRange,
+    Diablo2TxtRowFilter,
+)
+from .txtindex import Diablo2TxtRangeIndex
+from .txtmerge import Diablo2MergedTxtFile
+
+#: A query condition: a row filter, or a function that returns ``True``
+#: for the records to keep.
+Diablo2TxtCondition = Union[Diablo2TxtRowFilter, Callable[[Diablo2TxtRecord], bool]]
+
+#: Row filters that only read their columns' fields, not the whole line.
+_COLUMN_FILTERS = (Diablo2TxtColumnEquals, Diablo2TxtColumnIn, Diablo2TxtColumnRange)
+
+
+class Diablo2TxtQueryPlan(NamedTuple):
+    """
+    How a query will be run.
+    """
+
+    #: A description of each step, in order.
+    steps: Tuple[str, ...]
+
+    #: The number of rows the first step produces.
+    candidates: int
+
+    def __str__(self) -> str:
+        return "\n".join(self.steps)
+
+
+@dataclass(frozen=True)
+class Diablo2TxtQuery:
+    """
+    A query over the rows of a .txt file.
+
+    Queries are immutable: :py:meth:`where`, :py:meth:`order_by` and
+    :py:meth:`limit` return new queries. Use :py:func:`query` to create
+    one. Iterating over a query yields the matching records.
+
+    Indexes built to answer a query are cached by the queried file, so
+    later queries on the same file are answered from them.
+    """
+
+    #: The queried file.
+    table: Diablo2TxtFile
+
+    #: The conditions rows must meet.
+    conditions: Tuple[Diablo2TxtCondition, ...] = ()
+
+    #: The column to sort by, if any; case insensitive.
+    order_column: Optional[str] = None
+
+    #: Whether to sort in descending order.
+    descending: bool = False
+
+    #: The maximum number of rows to return, if any.
+    max_rows: Optional[int] = None
+
+    #: If ``True``, indexes that do not exist yet are built when they
+    #: would answer a condition; otherwise only already built indexes
+    #: are used.
+    build_indexes: bool = True
+
+    def where(
+        self, *conditions: Diablo2TxtCondition, **equals: str
+    ) -> "Diablo2TxtQuery":
+        """
+        Returns a query that also requires the given conditions.
+
+        :param conditions: conditions rows must meet
+        :param equals: values that columns must have, keyed by column name; \
+            shorthand for \
+            :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtColumnEquals`
+        """
+        added = conditions + tuple(
+            Diablo2TxtColumnEquals(c, v) for c, v in equals.items()
+        )
+        return replace(self, conditions=self.conditions + added)
+
+    def order_by(self, column: str, descending: bool = False) -> "Diablo2TxtQuery":
+        """
+        Returns a query whose rows are sorted by a column.
+
+        Integer columns are sorted numerically, with empty fields as ``0``;
+        other columns are sorted as strings. Rows with equal values keep
+        their order in the file.
+
+        :param column: the name of the column; case insensitive
+        :param descending: if ``True``, sort largest first
+        """
+        return replace(self, order_column=column, descending=descending)
+
+    def limit(self, n: int) -> "Diablo2TxtQuery":
+        """
+        Returns a query that produces at most ``n`` rows.
+
+        :param n: the maximum number of rows
+        """
+        return replace(self, max_rows=max(n, 0))
+
+    def __iter__(self) -> Iterator[Diablo2TxtRecord]:
+        """
+        Yields the matching records.
+        """
+        return self.records()
+
+    def records(self) -> Iterator[Diablo2TxtRecord]:
+        """
+        Yields the matching records.
+
+        :raises DataLookupError: if a condition or the sort column names a \
+            column the table does not have
+        """
+        records = self.table.records
+        return (records[i] for i in self.ordinals())
+
+    def select(self, *columns: str) -> Iterator[Tuple[str, ...]]:
+        """
+        Yields the values of the given columns in each matching row.
+
+        :param columns: the names of the columns; case insensitive
+        :raises DataLookupError: if a column does not exist
+        """
+        indices = [_column(self.table, c) for c in columns]
+        for record in self.records():
+            data = record.data
+            n = len(data)
+            yield tuple(data[i] if i < n else "" for i in indices)
+
+    def count(self) -> int:
+        """
+        Returns the number of matching rows.
+        """
+        return sum(1 for _ in self.ordinals())
+
+    def ordinals(self) -> Iterator[int]:
+        """
+        Yields the indices of the matching rows in the table.
+
+        :raises DataLookupError: if a condition or the sort column names a \
+            column the table does not have
+        """
+        return self._plan().run()
+
+    def explain(self) -> Diablo2TxtQueryPlan:
+        """
+        Plans the query without running it, and returns the plan.
+
+        This builds any indexes the plan uses.
+        """
+        plan = self._plan()
+        return Diablo2TxtQueryPlan(tuple(plan.steps), plan.candidates)
+
+    def _plan(self) -> "_Plan":
+        """
+        Chooses how to run the query.
+        """
+        table = self.table
+        plan = _Plan(table, self.max_rows)
+
+        # The condition that an index answers with the fewest rows drives
+        # the query.
+        driving: Optional[int] = None
+        best: Optional[_Access] = None
+        for i, condition in enumerate(self.conditions):
+            access = self._access(condition)
+            if access is not None and (best is None or access.rows < best.rows):
+                driving, best = i, access
+
+        order_index: Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]] = None
+        if self.order_column is not None:
+            _column(table, self.order_column)
+            order_index = self._range_index(self.order_column, 0, 0)
+
+        if best is not None:
+            plan.access(best)
+            sorted_by_access = (
+                best.range_index is not None and best.range_index is order_index
+            )
+        elif order_index is not None and self.max_rows is not None:
+            # Walking the sort column's index finds the first rows in
+            # order without sorting the whole table.
+            plan.access(_Access.walk(order_index, self.order_column or ""))
+            sorted_by_access = True
+        else:
+            plan.scan()
+            sorted_by_access = False
+
+        for i, condition in enumerate(self.conditions):
+            if i != driving:
+                plan.filter(condition)
+
+        if self.order_column is not None:
+            if sorted_by_access and order_index is not None:
+                plan.ordered(order_index, self.order_column, self.descending)
+            else:
+                plan.sort(self.order_column, self.descending)
+        elif best is not None:
+            plan.in_row_order()
+        if self.max_rows is not None:
+            plan.steps.append(f"limit {self.max_rows}")
+        return plan
+
+    def _access(self, condition: Diablo2TxtCondition) -> Optional["_Access"]:
+        """
+        Returns how an index would answer a condition, or ``None`` if no
+        index can.
+
+        :param condition: the condition
+        """
+        table = self.table
+        if isinstance(condition, (Diablo2TxtColumnEquals, Diablo2TxtColumnIn)):
+            _column(table, condition.column)
+            index = table.cached_index(condition.column)
+            if index is None and self.build_indexes:
+                index = table.index(condition.column)
+            if index is None:
+                return None
+            if isinstance(condition, Diablo2TxtColumnEquals):
+                values: Iterable[str] = (condition.value,)
+            else:
+                values = sorted(condition.values)
+            groups = [index.ordinals(v) for v in values]
+            return _Access(
+                f"hash index on {condition.column!r}: {condition.cache_key()}",
+                sum(len(g) for g in groups),
+                groups,
+                None,
+            )
+        if isinstance(condition, Diablo2TxtColumnRange):
+            _column(table, condition.column)
+            low, high = condition.low, condition.high
+            range_index = self._range_index(condition.column, low, high)
+            if range_index is None:
+                return None
+            return _Access(
+                f"range index on {condition.column!r}: {condition.cache_key()}",
+                range_index.count(low, high),
+                [range_index.ordinal_range(low, high)],
+                range_index,
+                low,
+                high,
+            )
+        return None
+
+    def _range_index(
+        self, column: str, low: Optional[int], high: Optional[int]
+    ) -> Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]]:
+        """
+        Returns a range index that treats empty fields as ``0`` for the
+        rows between ``low`` and ``high``, or ``None`` if there is none or
+        the column is not an integer column.
+
+        :param column: the name of the column
+        :param low: the smallest value that will be looked up
+        :param high: the largest value that will be looked up
+        """
+        table = self.table
+        index = table.cached_range_index(column)
+        if index is not None:
+            # Optional integer columns do not index empty fields, which
+            # conditions and sorting treat as 0.
+            complete = len(index) == len(table.records)
+            if (
+                complete
+                or (low is not None and low > 0)
+                or (high is not None and high < 0)
+            ):
+                return index
+        if not self.build_indexes or table.column_type(column) is None:
+            return None
+        return table.range_index(column, Diablo2TxtColumnType.INT)
+
+
+def query(*tables: Diablo2TxtFile, build_indexes: bool = True) -> Diablo2TxtQuery:
+    """
+    Returns a query over all rows of the given tables.
+
+    Several tables are queried as a single
+    :py:class:`~d2lfg.d2core.data.txtmerge.Diablo2MergedTxtFile`, whose
+    rows are those of each table in turn. Indexes are cached by the
+    merged file, so to reuse them across queries, merge the tables once
+    and query the merged file.
+
+    :param tables: the tables to query
+    :param build_indexes: see :py:attr:`Diablo2TxtQuery.build_indexes`
+    :raises ValueError: if no table is given
+    """
+    if not tables:
+        raise ValueError("no tables to query")
+    table = tables[0] if len(tables) == 1 else Diablo2MergedTxtFile(tables)
+    return Diablo2TxtQuery(table, build_indexes=build_indexes)
+
+
+class _Access(NamedTuple):
+    """
+    Rows found by an index.
+    """
+
+    #: A description of the lookup.
+    description: str
+
+    #: The number of rows found.
+    rows: int
+
+    #: The indices of the rows found, in groups. Each group is in row
+    #: order, except for range lookups, which are in value order.
+    groups: Sequence[Sequence[int]]
+
+    #: The range index the rows were found with, if any.
+    range_index: Optional[Diablo2TxtRangeIndex[Diablo2TxtRecord]]
+
+    #: The smallest value looked up in the range index.
+    low: Optional[int] = None
+
+    #: The largest value looked up in the range index.
+    high: Optional[int] = None
+
+    @classmethod
+    def walk(
+        cls, index: Diablo2TxtRangeIndex[Diablo2TxtRecord], column: str
+    ) -> "_Access":
+        """
+        Returns every row of a range index, in value order.
+
+        :param index: the range index
+        :param column: the name of the indexed column
+        """
+        return cls(
+            f"range index on {column!r}: all rows", len(index), [index.ordinals], index
+        )
+
+
+class _Plan:
+    """
+    The steps of a query, as functions of the rows before them.
+
+    :param table: the queried table
+    :param max_rows: the maximum number of rows to produce, if any
+    """
+
+    def __init__(self, table: Diablo2TxtFile, max_rows: Optional[int]) -> None:
+        self.table = table
+        self.max_rows = max_rows
+        self.steps: List[str] = list()
+        self.candidates = len(table.records)
+        self._source: Callable[[], Iterable[int]] = lambda: range(len(table.records))
+        self._filters: List[Callable[[int], bool]] = list()
+        self._order: Optional[Callable[[Iterable[int]], Iterable[int]]] = None
+        self._access: Optional[_Access] = None
+
+    def scan(self) -> None:
+        """
+        Reads every row.
+        """
+        self.steps.append(f"scan {self.candidates} rows")
+
+    def access(self, access: _Access) -> None:
+        """
+        Reads the rows found by an index.
+
+        :param access: the rows found
+        """
+        self._access = access
+        self.candidates = access.rows
+        self.steps.append(f"{access.description} ({access.rows} rows)")
+        groups = access.groups
+        if len(groups) == 1:
+            self._source = lambda: groups[0]
+        else:
+            # Each group is in row order, so merging them keeps it.
+            self._source = lambda: heapq.merge(*groups)
+
+    def in_row_order(self) -> None:
+        """
+        Puts rows found by a range index back into row order.
+        """
+        if not self._row_ordered():
+            self.steps.append("sort by row")
+            self._order = sorted
+
+    def filter(self, condition: Diablo2TxtCondition) -> None:
+        """
+        Drops rows that do not meet a condition.
+
+        :param condition: the condition
+        """
+        records = self.table.records
+        if isinstance(condition, Diablo2TxtRowFilter):
+            compiled = condition.compile(self.table.fields, None)
+            self.steps.append(f"filter {condition.cache_key()}")
+            if isinstance(condition, _COLUMN_FILTERS):
+                self._filters.append(lambda i: compiled("", records[i].data))
+            else:
+                self._filters.append(
+                    lambda i: compiled("\t".join(records[i].data), records[i].data)
+                )
+        else:
+            name = getattr(condition, "__qualname__", repr(condition))
+            self.steps.append(f"filter {name}")
+            self._filters.append(lambda i: condition(records[i]))
+
+    def ordered(
+        self,
+        index: Diablo2TxtRangeIndex[Diablo2TxtRecord],
+        column: str,
+        descending: bool,
+    ) -> None:
+        """
+        Produces rows in the order the index found them.
+
+        :param index: the range index that found the rows
+        :param column: the name of the indexed column
+        :param descending: if ``True``, reverse the order, keeping rows with \
+            equal values in row order
+        """
+        order = "descending" if descending else "ascending"
+        self.steps.append(f"already ordered by {column!r} {order}")
+        if descending:
+            access = self._access
+            assert access is not None
+            low, high = access.low, access.high
+            self._source = lambda: index.descending_ordinals(low, high)
+
+    def sort(self, column: str, descending: bool) -> None:
+        """
+        Sorts rows by a column.
+
+        :param column: the name of the column
+        :param descending: if ``True``, sort largest first
+        """
+        key = _sort_key(self.table, column)
+        order = "descending" if descending else "ascending"
+        # Sorting is stable, so rows with equal values stay in the order
+        # they arrive in, which must be row order.
+        first: Callable[[Iterable[int]], Iterable[int]] = (
+            iter if self._row_ordered() else sorted
+        )
+        n = self.max_rows
+        if n is None:
+            self.steps.append(f"sort by {column!r} {order}")
+            self._order = lambda rows: sorted(first(rows), key=key, reverse=descending)
+        else:
+            self.steps.append(f"top {n} by {column!r} {order}")
+            select = heapq.nlargest if descending else heapq.nsmallest
+            self._order = lambda rows: select(n, first(rows), key=key)
+
+    def _row_ordered(self) -> bool:
+        """
+        Returns ``True`` if rows are read in row order.
+        """
+        return self._access is None or self._access.range_index is None
+
+    def run(self) -> Iterator[int]:
+        """
+        Yields the indices of the rows the query produces.
+        """
+        rows: Iterable[int] = self._source()
+        for f in self._filters:
+            rows = filter(f, rows)
+        if self._order is not None:
+            rows = self._order(rows)
+        if self.max_rows is not None:
+            rows = islice(rows, self.max_rows)
+        return iter(rows)
+
+
+def _sort_key(table: Diablo2TxtFile, column: str) -> Callable[[int], Any]:
+    """
+    Returns a sort key for the rows of a table, by row index.
+
+    :param table: the table
+    :param column: the name of the column to sort by
+    """
+    # The column's type is inferred once per table, so text columns do not
+    # fail an integer conversion on every query.
+    values: Sequence[Any]
+    if table.column_type(column) is None:
+        values = table.column(column)
+    else:
+        values = table.typed_column(column, Diablo2TxtColumnType.INT)
+    return values.__getitem__
+
+
+def _column(table: Diablo2TxtFile, column: str) -> int:
+    """
+    Returns the index of a column.
+
+    :param table: the table
+    :param column: the name of the column; case insensitive
+    :raises DataLookupError: if the table does not have the column
+    """
+    try:
+        return table.fields[column.casefold()]
+    except KeyError:
+        raise DataLookupError(f"{column}: no such column") from None
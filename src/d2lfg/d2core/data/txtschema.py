@@ -0,0 +1,573 @@
+"""
+``d2lfg.d2core.data.txtschema``
+===============================
+
+This module contains schemas that convert Diablo 2 .txt file records
+into model objects, such as
+:py:class:`~d2lfg.d2core.d2types.item.Diablo2ItemType` and
+:py:class:`~d2lfg.d2core.d2types.item.Diablo2Item`.
+
+A :py:class:`Diablo2TxtSchema` describes which column each attribute of
+a model comes from and what type it has. For each distinct header it
+generates a converter function that reads every field by a precomputed
+index, converts it inline and calls the model's constructor once, so
+converting a table costs little more than creating its objects.
+
+Schemas for the known tables are kept in a
+:py:class:`Diablo2TxtSchemaRegistry`; see :py:data:`DEFAULT_SCHEMAS`.
+"""
+
+from dataclasses import dataclass, fields as dataclass_fields
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from ...error import DataConversionError, DataLookupError
+from ..d2types.bodyloc import Diablo2BodyLoc, Diablo2BodyLocs
+from ..d2types.item import Diablo2Item, Diablo2ItemType
+from ..d2types.playerclass import Diablo2PlayerClass, Diablo2PlayerClasses
+from .txt import Diablo2TxtFile
+
+T = TypeVar("T")
+
+#: A function that converts the data of a record into a model object.
+Diablo2TxtConverter = Callable[[Sequence[str]], T]
+
+
+class Diablo2TxtFieldType(Enum):
+    """
+    :py:class:`~enum.Enum` describing how a .txt file field is converted
+    to an attribute value.
+    """
+
+    #: A string.
+    STR = "str"
+
+    #: A string; empty fields are ``None``.
+    OPTIONAL_STR = "optional_str"
+
+    #: An integer; empty fields are ``0``.
+    INT = "int"
+
+    #: An integer; empty fields are ``None``.
+    OPTIONAL_INT = "optional_int"
+
+    #: A boolean; empty fields and ``0`` are ``False``, other integers
+    #: are ``True``.
+    BOOL = "bool"
+
+    #: A boolean; empty fields are ``None``.
+    OPTIONAL_BOOL = "optional_bool"
+
+    #: The code of an item type.
+    ITEM_TYPE = "item_type"
+
+    #: The code of an item type; empty fields are ``None``.
+    OPTIONAL_ITEM_TYPE = "optional_item_type"
+
+    #: The code of a body location; empty fields are ``None``.
+    OPTIONAL_BODY_LOC = "optional_body_loc"
+
+    #: The code of a player class; empty fields are ``None``.
+    OPTIONAL_PLAYER_CLASS = "optional_player_class"
+
+
+#: For each field type: an expression converting a non-empty field ``{v}``,
+#: and the value of an empty field.
+_CONVERSIONS: Dict[Diablo2TxtFieldType, Tuple[str, Any]] = {
+    Diablo2TxtFieldType.STR: ("{v}", ""),
+    Diablo2TxtFieldType.OPTIONAL_STR: ("{v}", None),
+    Diablo2TxtFieldType.INT: ("int({v})", 0),
+    Diablo2TxtFieldType.OPTIONAL_INT: ("int({v})", None),
+    Diablo2TxtFieldType.BOOL: ("int({v}) != 0", False),
+    Diablo2TxtFieldType.OPTIONAL_BOOL: ("int({v}) != 0", None),
+    Diablo2TxtFieldType.ITEM_TYPE: ("_item_type({v})", None),
+    Diablo2TxtFieldType.OPTIONAL_ITEM_TYPE: ("_item_type({v})", None),
+    Diablo2TxtFieldType.OPTIONAL_BODY_LOC: ("_body_loc({v})", None),
+    Diablo2TxtFieldType.OPTIONAL_PLAYER_CLASS: ("_player_class({v})", None),
+}
+
+#: Field types whose empty value is an error.
+_REQUIRED = frozenset([Diablo2TxtFieldType.ITEM_TYPE])
+
+
+@dataclass(frozen=True)
+class Diablo2TxtFieldSpec:
+    """
+    Describes where an attribute of a model comes from.
+    """
+
+    #: The name of the attribute.
+    attribute: str
+
+    #: The name of the column; case insensitive.
+    column: str
+
+    #: How the field is converted.
+    field_type: Diablo2TxtFieldType
+
+    #: If ``True``, the column must be in the file. Otherwise, a missing
+    #: column is treated as empty in every row.
+    required: bool = False
+
+
+class Diablo2TxtConversionContext:
+    """
+    Resolves the codes that records use to refer to other objects.
+
+    :param item_types: item types by code, or a function that returns \
+        the item type with a code; if ``None``, records cannot refer to \
+        item types
+    """
+
+    def __init__(
+        self,
+        item_types: Union[
+            Mapping[str, Diablo2ItemType], Callable[[str], Diablo2ItemType], None
+        ] = None,
+    ) -> None:
+        if item_types is None:
+            item_types = dict()
+        if callable(item_types):
+            self.item_type: Callable[[str], Diablo2ItemType] = item_types
+        else:
+            self.item_type = _lookup(item_types, "item type")
+        self.body_loc: Callable[[str], Diablo2BodyLoc] = _lookup(
+            {b.code: b for b in Diablo2BodyLocs.all()}, "body location"
+        )
+        self.player_class: Callable[[str], Diablo2PlayerClass] = _lookup(
+            {c.code: c for c in Diablo2PlayerClasses.all()}, "player class"
+        )
+
+
+class Diablo2TxtSchema(Generic[T]):
+    """
+    Converts the records of a .txt file into objects of a dataclass.
+
+    :param name: the name of the table, e.g. ``ItemTypes``
+    :param target: the dataclass to create
+    :param specs: where each of the dataclass's attributes comes from; \
+        every attribute set by its constructor must have a spec
+    :param key: the name of the column that identifies records
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target: Type[T],
+        specs: Sequence[Diablo2TxtFieldSpec],
+        key: str = "code",
+    ) -> None:
+        by_attribute = {s.attribute: s for s in specs}
+        attributes = [f.name for f in dataclass_fields(target) if f.init]  # type: ignore[arg-type]
+        missing = [a for a in attributes if a not in by_attribute]
+        if missing:
+            raise ValueError(f"{name}: no spec for {', '.join(missing)}")
+        self.name = name
+        self.target = target
+        # Specs are kept in constructor order, so that converters can
+        # pass arguments by position.
+        self.specs = tuple(by_attribute[a] for a in attributes)
+        self.key = key
+        self._factories: Dict[Tuple[Tuple[str, int], ...], Callable[..., Any]] = dict()
+
+    def converter(
+        self,
+        fields: Mapping[str, int],
+        context: Optional[Diablo2TxtConversionContext] = None,
+    ) -> Diablo2TxtConverter[T]:
+        """
+        Returns a function that converts the data of a record with the
+        given fields.
+
+        The converter's code is generated the first time a header is
+        seen and reused for files with the same header. Converting a
+        field that is not valid for its type raises :py:class:`ValueError`
+        or :py:class:`~d2lfg.error.DataLookupError`; use :py:meth:`convert`
+        for error messages that name the offending column.
+
+        :param fields: the fields of the records to convert
+        :param context: resolves references to other objects
+        :raises DataLookupError: if a required column is missing
+        """
+        if context is None:
+            context = Diablo2TxtConversionContext()
+        header = tuple(sorted(fields.items(), key=lambda f: f[1]))
+        factory = self._factories.get(header)
+        if factory is None:
+            factory = self._factories[header] = self._generate(fields)
+        converter: Diablo2TxtConverter[T] = factory(
+            self.target, context.item_type, context.body_loc, context.player_class
+        )
+        return converter
+
+    def source(self, fields: Mapping[str, int]) -> str:
+        """
+        Returns the source code of the converter for records with the
+        given fields. This is useful for debugging.
+
+        :param fields: the fields of the records to convert
+        :raises DataLookupError: if a required column is missing
+        """
+        lines = [
+            "def make(_target, _item_type, _body_loc, _player_class):",
+            "    def convert(data):",
+        ]
+        width = 0
+        args: List[str] = list()
+        for spec in self.specs:
+            template, empty = _CONVERSIONS[spec.field_type]
+            i = fields.get(spec.column.casefold())
+            if i is None:
+                if spec.required:
+                    raise DataLookupError(f"{self.name}: no column {spec.column!r}")
+                args.append(repr(empty))
+                continue
+            width = max(width, i + 1)
+            v = f"data[{i}]"
+            if spec.field_type in _REQUIRED:
+                # An empty code fails to resolve, and is reported by the
+                # slow path.
+                expression = template.format(v=v)
+            elif template == "{v}":
+                expression = v if empty == "" else f"({v} or None)"
+            else:
+                expression = f"({template.format(v=v)} if {v} else {empty!r})"
+            args.append(expression)
+
+        # Short rows are padded, so that their missing fields are empty.
+        lines.append(f"        if len(data) < {width}:")
+        lines.append(f"            data = list(data) + [''] * ({width} - len(data))")
+        lines.append("        return _target(")
+        lines.extend(f"            {a}," for a in args)
+        lines.append("        )")
+        lines.append("    return convert")
+        return "\n".join(lines) + "\n"
+
+    def convert(
+        self,
+        txt_file: Diablo2TxtFile,
+        context: Optional[Diablo2TxtConversionContext] = None,
+    ) -> List[T]:
+        """
+        Converts every record of a file.
+
+        :param txt_file: the file to convert
+        :param context: resolves references to other objects
+        :raises DataLookupError: if a required column is missing, or a \
+            record refers to an object that does not exist
+        :raises DataConversionError: if a field cannot be converted
+        """
+        if context is None:
+            context = Diablo2TxtConversionContext()
+        convert = self.converter(txt_file.fields, context)
+        objects: List[T] = list()
+        append = objects.append
+        for row, record in enumerate(txt_file.records):
+            try:
+                append(convert(record.data))
+            except (ValueError, DataLookupError):
+                append(self._convert_slowly(txt_file, row, context))
+        return objects
+
+    def _generate(self, fields: Mapping[str, int]) -> Callable[..., Any]:
+        """
+        Compiles the converter factory for records with the given fields.
+
+        :param fields: the fields of the records to convert
+        """
+        namespace: Dict[str, Any] = dict()
+        code = compile(self.source(fields), f"<{self.name} converter>", "exec")
+        exec(code, namespace)
+        factory: Callable[..., Any] = namespace["make"]
+        return factory
+
+    def _convert_slowly(
+        self, txt_file: Diablo2TxtFile, row: int, context: Diablo2TxtConversionContext
+    ) -> T:
+        """
+        Converts a record one field at a time, raising an error that names
+        the field if it cannot be converted: a
+        :py:class:`~d2lfg.error.DataLookupError` if it refers to an object
+        that does not exist, and a :py:class:`~d2lfg.error.DataConversionError`
+        otherwise.
+
+        The generated converter treats only empty fields as empty; this
+        also treats whitespace as empty, as the game does.
+
+        :param txt_file: the file containing the record
+        :param row: the index of the record
+        :param context: resolves references to other objects
+        """
+        record = txt_file.records[row]
+        args: List[Any] = list()
+        for spec in self.specs:
+            i = txt_file.fields.get(spec.column.casefold())
+            v = record.data[i].strip() if i is not None and i < len(record) else ""
+            try:
+                args.append(_convert_field(spec.field_type, v, context))
+            except DataLookupError as e:
+                raise DataLookupError(
+                    f"{self.name} row {row}, column {spec.column!r}: {e}"
+                ) from None
+            except (ValueError, DataConversionError) as e:
+                raise DataConversionError(
+                    f"{self.name} row {row}, column {spec.column!r}: {e}"
+                ) from None
+        return self.target(*args)
+
+
+class Diablo2TxtSchemaRegistry:
+    """
+    Schemas for .txt tables, by table name.
+    """
+
+    def __init__(self) -> None:
+        self._schemas: Dict[str, Diablo2TxtSchema[Any]] = dict()
+
+    def register(self, schema: Diablo2TxtSchema[Any], *tables: str) -> None:
+        """
+        Registers a schema.
+
+        :param schema: the schema to register
+        :param tables: the names of the tables the schema applies to, case \
+            insensitive; defaults to the schema's name
+        """
+        for table in tables or (schema.name,):
+            self._schemas[table.casefold()] = schema
+
+    def get(self, table: str) -> Diablo2TxtSchema[Any]:
+        """
+        Returns the schema for a table.
+
+        :param table: the name of the table; case insensitive
+        :raises DataLookupError: if there is no schema for the table
+        """
+        try:
+            return self._schemas[table.casefold()]
+        except KeyError:
+            raise DataLookupError(f"{table}: no schema for txt table") from None
+
+    def __contains__(self, table: object) -> bool:
+        """
+        Returns ``True`` if there is a schema for the given table.
+        """
+        return isinstance(table, str) and table.casefold() in self._schemas
+
+
+def _spec(
+    attribute: str,
+    field_type: Diablo2TxtFieldType,
+    column: Optional[str] = None,
+    required: bool = False,
+) -> Diablo2TxtFieldSpec:
+    """
+    Returns a spec whose column is named like its attribute, unless
+    another column name is given.
+    """
+    return Diablo2TxtFieldSpec(attribute, column or attribute, field_type, required)
+
+
+_F = Diablo2TxtFieldType
+
+#: The schema of ``ItemTypes.txt``.
+ITEM_TYPE_SCHEMA: Diablo2TxtSchema[Diablo2ItemType] = Diablo2TxtSchema(
+    "ItemTypes",
+    Diablo2ItemType,
+    [
+        _spec("name", _F.STR, "ItemType", required=True),
+        _spec("code", _F.STR, "Code", required=True),
+        _spec("equiv1", _F.OPTIONAL_ITEM_TYPE, "Equiv1"),
+        _spec("equiv2", _F.OPTIONAL_ITEM_TYPE, "Equiv2"),
+        _spec("body", _F.BOOL, "Body"),
+        _spec("bodyloc1", _F.OPTIONAL_BODY_LOC, "BodyLoc1"),
+        _spec("bodyloc2", _F.OPTIONAL_BODY_LOC, "BodyLoc2"),
+        _spec("shoots", _F.OPTIONAL_ITEM_TYPE, "Shoots"),
+        _spec("quiver", _F.OPTIONAL_ITEM_TYPE, "Quiver"),
+        _spec("throwable", _F.BOOL, "Throwable"),
+        _spec("reload", _F.BOOL, "Reload"),
+        _spec("reequip", _F.BOOL, "ReEquip"),
+        _spec("autostack", _F.BOOL, "AutoStack"),
+        _spec("gem", _F.BOOL, "Gem"),
+        _spec("beltable", _F.BOOL, "Beltable"),
+        _spec("maxsock1", _F.INT, "MaxSock1"),
+        _spec("maxsock25", _F.INT, "MaxSock25"),
+        _spec("maxsock40", _F.INT, "MaxSock40"),
+        _spec("staffmods", _F.OPTIONAL_PLAYER_CLASS, "StaffMods"),
+        _spec("class_", _F.OPTIONAL_PLAYER_CLASS, "Class"),
+        _spec("storepage", _F.OPTIONAL_STR, "StorePage"),
+    ],
+)
+
+#: The schema of ``Weapons.txt``, ``Armor.txt`` and ``Misc.txt``.
+ITEM_SCHEMA: Diablo2TxtSchema[Diablo2Item] = Diablo2TxtSchema(
+    "Items",
+    Diablo2Item,
+    [
+        _spec("code", _F.STR, required=True),
+        _spec("name", _F.STR, required=True),
+        _spec("type", _F.ITEM_TYPE, required=True),
+        _spec("type2", _F.OPTIONAL_ITEM_TYPE),
+        _spec("mindam", _F.OPTIONAL_INT),
+        _spec("maxdam", _F.OPTIONAL_INT),
+        _spec("f1or2handed", _F.OPTIONAL_BOOL, "1or2handed"),
+        _spec("f2handed", _F.OPTIONAL_BOOL, "2handed"),
+        _spec("f2handmindam", _F.OPTIONAL_INT, "2handmindam"),
+        _spec("f2handmaxdam", _F.OPTIONAL_INT, "2handmaxdam"),
+        _spec("rangeadder", _F.OPTIONAL_INT),
+        _spec("speed", _F.OPTIONAL_INT),
+        _spec("strbonus", _F.OPTIONAL_INT, "StrBonus"),
+        _spec("dexbonus", _F.OPTIONAL_INT, "DexBonus"),
+        _spec("reqstr", _F.INT),
+        _spec("reqdex", _F.INT),
+        _spec("durability", _F.INT),
+        _spec("nodurability", _F.BOOL),
+        _spec("level", _F.INT),
+        _spec("levelreq", _F.INT),
+        _spec("cost", _F.INT),
+        _spec("normcode", _F.OPTIONAL_STR),
+        _spec("ubercode", _F.OPTIONAL_STR),
+        _spec("ultracode", _F.OPTIONAL_STR),
+        _spec("invwidth", _F.INT),
+        _spec("invheight", _F.INT),
+        _spec("stackable", _F.BOOL),
+        _spec("gemsockets", _F.INT),
+    ],
+)
+
+#: Schemas for the tables :py:mod:`d2lfg` knows how to convert.
+DEFAULT_SCHEMAS = Diablo2TxtSchemaRegistry()
+DEFAULT_SCHEMAS.register(ITEM_TYPE_SCHEMA)
+DEFAULT_SCHEMAS.register(ITEM_SCHEMA, "Weapons", "Armor", "Misc")
+
+
+def load_item_types(
+    txt_file: Diablo2TxtFile,
+    schema: Diablo2TxtSchema[Diablo2ItemType] = ITEM_TYPE_SCHEMA,
+) -> Dict[str, Diablo2ItemType]:
+    """
+    Converts ``ItemTypes.txt`` into item types, by code.
+
+    Item types refer to each other (e.g. through ``Equiv1``), so each item
+    type is converted after the item types it refers to, wherever they
+    appear in the file.
+
+    :param txt_file: the parsed ``ItemTypes.txt``
+    :param schema: the schema to convert with
+    :raises DataLookupError: if an item type refers to one that does not \
+        exist
+    :raises DataConversionError: if a field cannot be converted, or item \
+        types refer to each other in a cycle
+    """
+    rows = {code: row for row, code in enumerate(txt_file.column(schema.key))}
+    item_types: Dict[str, Diablo2ItemType] = dict()
+    converting: List[str] = list()
+
+    def item_type(code: str) -> Diablo2ItemType:
+        t = item_types.get(code)
+        if t is not None:
+            return t
+        row = rows.get(code)
+        if row is None:
+            raise DataLookupError(f"{code}: no such item type")
+        if code in converting:
+            cycle = " -> ".join(converting[converting.index(code) :] + [code])
+            raise DataConversionError(f"item types refer to each other: {cycle}")
+        converting.append(code)
+        try:
+            data = txt_file.records[row].data
+            try:
+                t = convert(data)
+            except (ValueError, DataLookupError):
+                t = schema._convert_slowly(txt_file, row, context)
+        finally:
+            converting.pop()
+        item_types[code] = t
+        return t
+
+    context = Diablo2TxtConversionContext(item_type)
+    convert = schema.converter(txt_file.fields, context)
+    for code in rows:
+        item_type(code)
+    return item_types
+
+
+def load_items(
+    txt_files: Sequence[Diablo2TxtFile],
+    item_types: Mapping[str, Diablo2ItemType],
+    schema: Diablo2TxtSchema[Diablo2Item] = ITEM_SCHEMA,
+) -> Dict[str, Diablo2Item]:
+    """
+    Converts item tables (``Weapons.txt``, ``Armor.txt`` and ``Misc.txt``)
+    into items, by code.
+
+    :param txt_files: the parsed item tables, or a merged item table (see \
+        :py:func:`~d2lfg.d2core.data.txtmerge.merge_item_tables`)
+    :param item_types: item types by code; see :py:func:`load_item_types`
+    :param schema: the schema to convert with
+    :raises DataLookupError: if an item refers to an item type that does \
+        not exist
+    :raises DataConversionError: if a field cannot be converted
+    """
+    context = Diablo2TxtConversionContext(item_types)
+    items: Dict[str, Diablo2Item] = dict()
+    for txt_file in txt_files:
+        for item in schema.convert(txt_file, context):
+            items[item.code] = item
+    return items
+
+
+def _lookup(objects: Mapping[str, T], kind: str) -> Callable[[str], T]:
+    """
+    Returns a function that looks up objects by code.
+
+    :param objects: the objects, by code
+    :param kind: what the objects are, for error messages
+    """
+
+    def lookup(code: str) -> T:
+        try:
+            return objects[code]
+        except KeyError:
+            raise DataLookupError(f"{code}: no such {kind}") from None
+
+    return lookup
+
+
+def _convert_field(
+    field_type: Diablo2TxtFieldType, v: str, context: Diablo2TxtConversionContext
+) -> Any:
+    """
+    Converts a single field.
+
+    :param field_type: how to convert the field
+    :param v: the field, with surrounding whitespace removed
+    :param context: resolves references to other objects
+    """
+    if not v:
+        if field_type in _REQUIRED:
+            raise DataConversionError("empty value")
+        return _CONVERSIONS[field_type][1]
+    if field_type in (_F.STR, _F.OPTIONAL_STR):
+        return v
+    if field_type in (_F.INT, _F.OPTIONAL_INT):
+        return int(v)
+    if field_type in (_F.BOOL, _F.OPTIONAL_BOOL):
+        return int(v) != 0
+    if field_type in (_F.ITEM_TYPE, _F.OPTIONAL_ITEM_TYPE):
+        return context.item_type(v)
+    if field_type == _F.OPTIONAL_BODY_LOC:
+        return context.body_loc(v)
+    return context.player_class(v)
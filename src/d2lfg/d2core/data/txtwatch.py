@@ -0,0 +1,123 @@
+"""
+``d2lfg.d2core.data.txtwatch``
+==============================
+
+This module contains :py:class:`Diablo2TxtTableHandle`, which reloads
+a Diablo 2 .txt file when it changes and reports which rows changed.
+"""
+
+import os
+from pathlib import Path
+from threading import Event, Lock
+from typing import Callable, List, Optional, Tuple, Union
+
+from .txt import Diablo2TxtFile, Diablo2TxtParser
+from .txtdiff import diff_txt_files, Diablo2TxtTableDiff
+
+#: A function called with the differences when a watched table changes.
+Diablo2TxtChangeCallback = Callable[[Diablo2TxtTableDiff], None]
+
+
+class Diablo2TxtTableHandle:
+    """
+    A handle to a .txt file that is parsed again when the file changes.
+
+    The file is parsed when the handle is created. Call :py:meth:`poll`
+    (or :py:meth:`watch`) to check for changes. A file is considered
+    changed if its size or modification time changes.
+
+    :param path: path to the .txt file
+    :param key: the name of the column that identifies rows across \
+        versions, e.g. ``code``; case insensitive
+    :param parser: the parser to parse the file with
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        key: str,
+        parser: Optional[Diablo2TxtParser] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.key = key
+        self.parser = Diablo2TxtParser() if parser is None else parser
+        self._callbacks: List[Diablo2TxtChangeCallback] = list()
+        self._lock = Lock()
+        self._stat = self._current_stat()
+        self.table = self.parser.parse(self.path)
+
+    def subscribe(self, callback: Diablo2TxtChangeCallback) -> Callable[[], None]:
+        """
+        Registers a function to be called with the differences whenever
+        the table changes.
+
+        Returns a function that unregisters the callback. Calling it
+        again does nothing.
+
+        :param callback: the function to call
+        """
+        self._callbacks.append(callback)
+        subscribed = True
+
+        def unsubscribe() -> None:
+            nonlocal subscribed
+            if subscribed:
+                subscribed = False
+                self._callbacks.remove(callback)
+
+        return unsubscribe
+
+    def poll(self) -> Optional[Diablo2TxtTableDiff]:
+        """
+        Checks whether the file has changed, reloading it if it has.
+
+        Returns the differences if any rows changed, ``None`` otherwise.
+        If reloading fails (e.g. because the file is still being written),
+        the error is raised and the next poll tries again.
+        """
+        with self._lock:
+            if self._current_stat() == self._stat:
+                return None
+        return self.reload()
+
+    def reload(self) -> Optional[Diablo2TxtTableDiff]:
+        """
+        Parses the file again, whether or not it appears to have changed.
+
+        If any rows changed, subscribed callbacks are called and the
+        differences are returned. Otherwise, ``None`` is returned.
+        """
+        with self._lock:
+            # The file is checked before it is parsed, so that changes made
+            # while parsing are picked up by the next poll. The check is
+            # only recorded once the file has been parsed.
+            stat = self._current_stat()
+            old = self.table
+            new: Diablo2TxtFile = self.parser.parse(self.path)
+            diff = diff_txt_files(old, new, self.key)
+            self.table = new
+            self._stat = stat
+        if not diff:
+            return None
+        for callback in list(self._callbacks):
+            callback(diff)
+        return diff
+
+    def watch(self, interval: float, stop: Event) -> None:
+        """
+        Polls the file every ``interval`` seconds until ``stop`` is set.
+
+        This blocks, so it is usually run in its own thread.
+
+        :param interval: the number of seconds between polls
+        :param stop: an event that ends watching when set
+        """
+        while not stop.wait(interval):
+            self.poll()
+
+    def _current_stat(self) -> Tuple[int, int]:
+        """
+        Returns the size and modification time of the file.
+        """
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
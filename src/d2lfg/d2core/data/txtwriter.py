@@ -0,0 +1,135 @@
+"""
+``d2lfg.d2core.data.txtwriter``
+===============================
+
+This module contains :py:class:`Diablo2TxtWriter`, which writes
+Diablo 2 .txt files.
+
+A file parsed with :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`
+and written back is byte-identical to the original, as long as the
+parser kept every row and column (i.e. ``skip_record=None`` with no
+filters or column projection) and the file ends with a line ending.
+"""
+
+from io import TextIOBase
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, TextIO, Union
+
+from .txt import (
+    DEFAULT_ENCODING,
+    DEFAULT_NEWLINE,
+    Diablo2TxtFile,
+    Diablo2TxtLazyFields,
+    Diablo2TxtRecord,
+)
+
+
+class Diablo2TxtWriter:
+    """
+    Writes Diablo 2 .txt files.
+
+    Lines are joined in batches and each batch is written with a single
+    call, so writing a large table makes few calls into the IO layer.
+
+    :param encoding: the text encoding of written files
+    :param batch_size: the number of records joined into each write
+    """
+
+    def __init__(
+        self, encoding: str = DEFAULT_ENCODING, batch_size: int = 1024
+    ) -> None:
+        self.encoding = encoding
+        self.batch_size = batch_size
+
+    def write(
+        self, txt_file: Diablo2TxtFile, file: Union[Path, str, TextIOBase]
+    ) -> int:
+        """
+        Writes a :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtFile`, using
+        its header and line ending.
+
+        Returns the number of records written.
+
+        :param txt_file: the file to write
+        :param file: a file path or text IO object to write to
+        """
+        return self.write_records(
+            txt_file.records, file, txt_file.header, txt_file.newline
+        )
+
+    def write_records(
+        self,
+        records: Iterable[Diablo2TxtRecord],
+        file: Union[Path, str, TextIOBase],
+        header: Optional[Sequence[str]] = None,
+        newline: str = DEFAULT_NEWLINE,
+    ) -> int:
+        """
+        Writes records as a .txt file.
+
+        ``records`` is consumed one batch at a time, so it may be
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`.
+        Each record's data is written as is, in order.
+
+        Returns the number of records written.
+
+        :param records: the records to write
+        :param file: a file path or text IO object to write to
+        :param header: the column names to write in the header; if not \
+            given, they are taken from the fields of the first record
+        :param newline: the line ending to write after each line
+        """
+        it = iter(records)
+        if header is None:
+            first = next(it, None)
+            if first is not None:
+                header = sorted(first.fields, key=first.fields.__getitem__)
+                it = chain((first,), it)
+
+        if isinstance(file, TextIOBase):
+            return self._write(it, file, header, newline)
+        with open(file, "w", encoding=self.encoding, newline="") as f:
+            return self._write(it, f, header, newline)
+
+    def _write(
+        self,
+        records: Iterable[Diablo2TxtRecord],
+        f: Union[TextIO, TextIOBase],
+        header: Optional[Sequence[str]],
+        newline: str,
+    ) -> int:
+        """
+        Writes the header and records to an open file.
+
+        :param records: the records to write
+        :param f: the file to write to
+        :param header: the column names to write in the header, or ``None`` \
+            to write nothing if there are no records
+        :param newline: the line ending to write after each line
+        """
+        if header:
+            f.write("\t".join(header) + newline)
+        count = 0
+        it = iter(records)
+        while True:
+            lines = [self._line(r.data) for r in islice(it, self.batch_size)]
+            if not lines:
+                return count
+            count += len(lines)
+            # The empty last element ends the last line.
+            lines.append("")
+            f.write(newline.join(lines))
+
+    @staticmethod
+    def _line(data: Sequence[str]) -> str:
+        """
+        Returns a record's data as a line, without a line ending.
+
+        :param data: the record's data
+        """
+        if isinstance(data, Diablo2TxtLazyFields) and data.keep is None:
+            # Decoding the line as it is in the file saves splitting it
+            # into fields and joining them again.
+            return data.line().decode(data.encoding)
+        return "\t".join(data)
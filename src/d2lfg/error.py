@@ -21,6 +21,18 @@ class DataLookupError(D2LfgError):
     """
 
 
+class DuplicateKeyError(D2LfgError):
+    """
+    Error raised when a key that must be unique appears more than once.
+    """
+
+
+class DataConversionError(D2LfgError):
+    """
+    Error raised when game data cannot be converted to the requested type.
+    """
+
+
 class BHFilterExpressionError(D2LfgError):
     """
     Error raised when there is an error related to BH filter expressions.
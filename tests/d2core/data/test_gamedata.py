@@ -0,0 +1,191 @@
+"""
+``tests.d2core.data.test_gamedata``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.gamedata`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tarfile
+from typing import List
+import zipfile
+
+import pytest
+
+from d2lfg.d2core.data.gamedata import Diablo2GameData
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser, Diablo2TxtSource
+from d2lfg.d2core.data.txtcache import Diablo2TxtParseCache
+from d2lfg.error import DataLookupError
+from tests.testhelper.txtgen import write_txt_tables
+
+
+class CountingParser(Diablo2TxtParser):
+    """
+    A parser that remembers the files it parses.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parsed: List[str] = list()
+
+    def parse(self, file: Diablo2TxtSource) -> Diablo2TxtFile:
+        self.parsed.append(Path(str(file)).stem)
+        return super().parse(file)
+
+
+@pytest.fixture
+def data_directory(tmp_path: Path) -> Path:
+    """
+    A directory of generated .txt files.
+    """
+    write_txt_tables(tmp_path, tables=("Weapons", "Armor", "ItemTypes"))
+    return tmp_path
+
+
+@pytest.fixture(params=["zip", "tar.gz"])
+def data_archive(
+    request: pytest.FixtureRequest,
+    data_directory: Path,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Path:
+    """
+    A zip or compressed tar archive of :py:func:`data_directory`.
+    """
+    kind: str = request.param
+    path = tmp_path_factory.mktemp("archive") / f"data.{kind}"
+    files = sorted(data_directory.iterdir())
+    if kind == "zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+            for f in files:
+                z.write(f, f"data/global/excel/{f.name}")
+    else:
+        with tarfile.open(path, "w:gz") as t:
+            for f in files:
+                t.add(f, f"data/global/excel/{f.name}")
+    return path
+
+
+class TestDiablo2GameData:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.gamedata.Diablo2GameData`.
+    """
+
+    def test_parses_on_first_use(
+        self, data_directory: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that tables are only parsed when looked up, and only once.
+        """
+        parser = CountingParser()
+        game_data = Diablo2GameData(data_directory, parser)
+        assert list(game_data) == ["Armor", "ItemTypes", "Weapons"]
+        assert "weapons" in game_data
+        assert "Skills" not in game_data
+        assert parser.parsed == []
+
+        weapons = game_data["weapons"]
+        assert game_data["Weapons"] is weapons
+        assert parser.parsed == ["Weapons"]
+        assert list(game_data.loaded) == ["Weapons"]
+        expected = txt_parser.parse(data_directory / "Weapons.txt")
+        assert [r.data for r in weapons.records] == [r.data for r in expected.records]
+
+    def test_missing_table(self, data_directory: Path) -> None:
+        """
+        Verifies that looking up a missing table raises
+        :py:class:`~d2lfg.error.DataLookupError`, unless a default is given.
+        """
+        game_data = Diablo2GameData(data_directory)
+        with pytest.raises(DataLookupError):
+            game_data["Skills"]
+        assert game_data.get("Skills") is None
+        assert game_data.get("armor") is game_data["Armor"]
+
+    def test_concurrent_lookups_parse_once(self, data_directory: Path) -> None:
+        """
+        Verifies that a table looked up from several threads at once is
+        parsed once.
+        """
+        parser = CountingParser()
+        game_data = Diablo2GameData(data_directory, parser)
+        with ThreadPoolExecutor(8) as executor:
+            tables = list(executor.map(game_data.__getitem__, ["Weapons"] * 16))
+        assert all(t is tables[0] for t in tables)
+        assert parser.parsed == ["Weapons"]
+
+    def test_invalidate(self, data_directory: Path) -> None:
+        """
+        Verifies that invalidated tables are parsed again, and that
+        invalidating everything lists the directory again.
+        """
+        parser = CountingParser()
+        game_data = Diablo2GameData(data_directory, parser)
+        game_data["Armor"]
+        game_data.invalidate("armor")
+        game_data["Armor"]
+        assert parser.parsed == ["Armor", "Armor"]
+
+        write_txt_tables(data_directory, tables=("Misc",))
+        assert "Misc" not in game_data
+        game_data.invalidate()
+        assert "Misc" in game_data
+        assert game_data.loaded == {}
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_preload(self, data_directory: Path, max_workers: int) -> None:
+        """
+        Verifies that preloading parses the requested tables that have not
+        been parsed yet.
+        """
+        game_data = Diablo2GameData(data_directory)
+        armor = game_data["Armor"]
+        game_data.preload(["weapons", "Armor", "ItemTypes"], max_workers)
+        assert set(game_data.loaded) == {"Armor", "ItemTypes", "Weapons"}
+        assert game_data["Armor"] is armor
+        with pytest.raises(DataLookupError):
+            game_data.preload(["Skills"])
+
+    def test_cache(self, data_directory: Path, tmp_path: Path) -> None:
+        """
+        Verifies that tables are parsed through a cache if one is given.
+        """
+        cache = Diablo2TxtParseCache(tmp_path / "cache")
+        game_data = Diablo2GameData(data_directory, cache=cache)
+        game_data["Weapons"]
+        assert any((tmp_path / "cache").iterdir())
+
+    def test_archive(self, data_archive: Path, data_directory: Path) -> None:
+        """
+        Verifies that the tables of an archive are listed and parsed like
+        those of a directory.
+        """
+        game_data = Diablo2GameData(data_archive)
+        expected = Diablo2GameData(data_directory)
+        assert list(game_data) == list(expected)
+        assert str(game_data.paths["Weapons"]) == "data/global/excel/Weapons.txt"
+        assert game_data.loaded == {}
+
+        weapons = game_data["weapons"]
+        assert game_data["Weapons"] is weapons
+        assert [r.data for r in weapons.records] == [
+            r.data for r in expected["Weapons"].records
+        ]
+        assert list(game_data.loaded) == ["Weapons"]
+
+    def test_archive_preload(self, data_archive: Path) -> None:
+        """
+        Verifies that preloading an archive parses the requested tables
+        that have not been parsed yet.
+        """
+        game_data = Diablo2GameData(data_archive)
+        armor = game_data["Armor"]
+        game_data.preload()
+        assert set(game_data.loaded) == {"Armor", "ItemTypes", "Weapons"}
+        assert game_data["Armor"] is armor
+
+        # Nothing is missing, so the archive is not read again.
+        data_archive.write_bytes(b"")
+        game_data.preload()
+        with pytest.raises(DataLookupError):
+            game_data.preload(["Skills"])
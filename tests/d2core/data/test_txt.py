@@ -7,10 +7,20 @@ This module contains tests for Diablo 2 .txt processing code.
 
 from io import StringIO
 from pathlib import Path
+from typing import List, Optional
 
 import pytest
 
-from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser, Diablo2TxtRecord
+from d2lfg.d2core.data.txt import (
+    Diablo2CompactTxtRecord,
+    Diablo2TxtColumnAccessor,
+    Diablo2TxtFile,
+    Diablo2TxtLazyFields,
+    Diablo2TxtParser,
+    Diablo2TxtRecord,
+)
+from d2lfg.d2core.data.txtcolumntypes import Diablo2TxtColumnType
+from d2lfg.error import DataConversionError
 
 
 @pytest.fixture
@@ -192,6 +202,146 @@ class TestDiablo2TxtRecord:
         """
         assert isinstance(repr(axe_txt_record), str)
 
+    def test_record_has_no_instance_dict(
+        self, axe_txt_record: Diablo2TxtRecord
+    ) -> None:
+        """
+        Verifies that :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtRecord`
+        objects do not carry a ``__dict__``.
+        """
+        assert not hasattr(axe_txt_record, "__dict__")
+
+
+class TestDiablo2CompactTxtRecord:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txt.Diablo2CompactTxtRecord`.
+    """
+
+    def test_data_is_tuple(self) -> None:
+        """
+        Verifies that a compact record stores its data as a tuple.
+        """
+        record = Diablo2CompactTxtRecord({"f1": 0}, ["f1val"])
+
+        assert record.data == ("f1val",)
+        assert not hasattr(record, "__dict__")
+
+    def test_equivalent_records_hash_equal(self) -> None:
+        """
+        Verifies that equivalent compact records compare and hash equal.
+        """
+        fields = {"f1": 0, "f2": 1}
+        r1 = Diablo2CompactTxtRecord(fields, ["f1val", "f2val"])
+        r2 = Diablo2CompactTxtRecord(fields, ("f1val", "f2val"))
+
+        assert r1 == r2
+        assert r1 == Diablo2TxtRecord(fields, ["f1val", "f2val"])
+        assert len({r1, r2}) == 1
+
+
+class TestDiablo2TxtColumnAccessor:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtColumnAccessor`.
+    """
+
+    def test_accessor_returns_column_value(
+        self, axe_txt_record: Diablo2TxtRecord
+    ) -> None:
+        """
+        Verifies that an accessor resolves its column once and returns
+        the record's value in that column.
+        """
+        accessor = Diablo2TxtColumnAccessor(axe_txt_record.fields, "UberCode")
+
+        assert accessor.index == 27
+        assert accessor(axe_txt_record) == "9ax"
+
+    def test_unknown_column_raises_key_error(
+        self, axe_txt_record: Diablo2TxtRecord
+    ) -> None:
+        """
+        Verifies that resolving an accessor for a column that does not
+        exist raises :py:class:`KeyError`.
+        """
+        with pytest.raises(KeyError):
+            Diablo2TxtColumnAccessor(axe_txt_record.fields, "nosuchcolumn")
+
+
+class SkipName:
+    """
+    Skips records with a given name.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def skip(self, record: Diablo2TxtRecord) -> bool:
+        """
+        Returns ``True`` if the record has the name.
+        """
+        return record["name"] == self.name
+
+    @classmethod
+    def skip_nothing(cls, record: Diablo2TxtRecord) -> bool:
+        """
+        Returns ``False``.
+        """
+        return False
+
+
+class TestDiablo2TxtLazyFields:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtLazyFields`.
+    """
+
+    def test_fields_are_decoded_on_access(self) -> None:
+        """
+        Verifies that :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtLazyFields`
+        only decodes the fields that are read.
+        """
+        fields = Diablo2TxtLazyFields(b"Axe\tM\xe4gic")
+
+        assert len(fields) == 2
+        assert fields._decoded is None
+        assert fields[1] == "M\u00e4gic"
+        assert fields._decoded == ["Axe", "M\u00e4gic"]
+
+    def test_slice_returns_decoded_fields(self) -> None:
+        """
+        Verifies that slicing a
+        :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtLazyFields` returns
+        decoded fields.
+        """
+        fields = Diablo2TxtLazyFields(b"a\tb\tc")
+
+        assert fields[1:] == ["b", "c"]
+        assert len(fields) == 3
+
+    def test_only_the_line_is_read(self) -> None:
+        """
+        Verifies that a
+        :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtLazyFields` only reads
+        its own line of the buffer, and only the fields it keeps.
+        """
+        buffer = b"a\tb\r\nc\td\te\r\nf\r\n"
+
+        assert list(Diablo2TxtLazyFields(buffer, 5, 10)) == ["c", "d", "e"]
+        assert list(Diablo2TxtLazyFields(buffer, 5, 10, keep=[0, 2])) == ["c", "e"]
+        assert list(Diablo2TxtLazyFields(buffer, 12, 13, keep=[0, 2])) == ["f"]
+
+    def test_record_with_lazy_fields_compares_equal(self) -> None:
+        """
+        Verifies that a record backed by
+        :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtLazyFields` compares
+        equal to an equivalent list-backed record.
+        """
+        fields = {"f1": 0, "f2": 1}
+        lazy = Diablo2TxtLazyFields(b"f1val\tf2val")
+
+        assert Diablo2TxtRecord(fields, lazy) == Diablo2TxtRecord(
+            fields, ["f1val", "f2val"]
+        )
+
 
 class TestDiablo2TxtFile:
     """
@@ -218,6 +368,184 @@ class TestDiablo2TxtFile:
 
         assert txt_file.path == path
 
+    def test_column_returns_column_values(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.column`
+        returns the values of a column in record order.
+        """
+        assert weapons_txt_file.column("Code") == ["hax", "axe"]
+
+    def test_column_pads_short_records(self) -> None:
+        """
+        Verifies that records that end before a column have an empty value
+        in it, so that indexes and typed columns can be built over them.
+        """
+        parser = Diablo2TxtParser(skip_record=None)
+        txt_file = parser.parse(
+            StringIO("name\tcode\tlevelreq\r\nAxe\taxe\t5\r\nHand Axe\thax\r\n")
+        )
+
+        assert txt_file.column("levelreq") == ["5", ""]
+        assert txt_file.index("levelreq").lookup("")[0]["code"] == "hax"
+        assert list(txt_file.typed_column("levelreq", Diablo2TxtColumnType.INT)) == [
+            5,
+            0,
+        ]
+        assert [r["code"] for r in txt_file.range_index("levelreq").top(1)] == ["axe"]
+
+    def test_accessor_reads_file_records(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.accessor`
+        returns an accessor for the file's records.
+        """
+        code = weapons_txt_file.accessor("code")
+
+        assert [code(r) for r in weapons_txt_file.records] == ["hax", "axe"]
+
+    def test_column_type_is_inferred(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.column_type`
+        infers numeric column types, and ``None`` for text columns.
+        """
+        assert weapons_txt_file.column_type("level") is Diablo2TxtColumnType.INT
+        assert weapons_txt_file.column_type("name") is None
+
+    def test_typed_column_is_cached(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.typed_column`
+        converts a column once and caches it.
+        """
+        level = weapons_txt_file.typed_column("level")
+
+        assert level.column_type == Diablo2TxtColumnType.INT
+        assert list(level) == [3, 7]
+        assert weapons_txt_file.typed_column("Level") is level
+
+    def test_typed_column_declared_type(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.typed_column`
+        converts a column to a declared type.
+        """
+        column = weapons_txt_file.typed_column(
+            "reqstr", Diablo2TxtColumnType.OPTIONAL_INT
+        )
+
+        assert list(column) == [None, 32]
+
+    def test_typed_column_invalidated_by_new_records(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that assigning new records discards cached typed columns.
+        """
+        gemsockets = weapons_txt_file.typed_column("gemsockets")
+        weapons_txt_file.records = weapons_txt_file.records[:1]
+
+        assert weapons_txt_file.typed_column("gemsockets") is not gemsockets
+        assert len(weapons_txt_file.typed_column("gemsockets")) == 1
+
+    def test_typed_column_non_numeric_raises(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that converting a non-numeric column raises
+        :py:class:`~d2lfg.error.DataConversionError`.
+        """
+        with pytest.raises(DataConversionError):
+            weapons_txt_file.typed_column("code")
+
+    def test_index_is_built_once(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.index`
+        builds an index on first use and caches it.
+        """
+        assert weapons_txt_file.cached_index("code") is None
+
+        index = weapons_txt_file.index("code", unique=True)
+
+        assert index["axe"] is weapons_txt_file.records[1]
+        assert weapons_txt_file.index("CODE", unique=True) is index
+        assert weapons_txt_file.cached_index("code") is index
+
+    def test_index_invalidated_by_new_records(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that assigning new records discards cached indexes.
+        """
+        index = weapons_txt_file.index("type")
+        weapons_txt_file.records = weapons_txt_file.records[1:]
+
+        assert weapons_txt_file.cached_index("type") is None
+        assert weapons_txt_file.index("type") is not index
+        assert len(weapons_txt_file.index("type").lookup("axe")) == 1
+
+    def test_range_index_is_built_once(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.range_index` builds
+        a sorted index on first use and caches it.
+        """
+        assert weapons_txt_file.cached_range_index("level") is None
+
+        index = weapons_txt_file.range_index("level")
+
+        assert index.range(5, 10) == [weapons_txt_file.records[1]]
+        assert index.top(1) == [weapons_txt_file.records[1]]
+        assert weapons_txt_file.range_index("LEVEL") is index
+        assert weapons_txt_file.cached_range_index("level") is index
+
+    def test_cached_range_index_is_an_integer_index(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.cached_range_index`
+        only returns an index built with another type if asked for it.
+        """
+        index = weapons_txt_file.range_index("level", Diablo2TxtColumnType.BOOL)
+
+        assert weapons_txt_file.cached_range_index("level") is None
+        assert (
+            weapons_txt_file.cached_range_index("level", Diablo2TxtColumnType.BOOL)
+            is index
+        )
+
+    def test_range_index_skips_missing_values(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that rows with an empty value are not in a range index.
+        """
+        index = weapons_txt_file.range_index("reqstr")
+
+        assert index.range() == [weapons_txt_file.records[1]]
+
+    def test_range_index_invalidated_by_new_records(
+        self, weapons_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that assigning new records discards cached range indexes.
+        """
+        weapons_txt_file.range_index("level")
+        weapons_txt_file.records = weapons_txt_file.records[1:]
+
+        assert weapons_txt_file.cached_range_index("level") is None
+        assert len(weapons_txt_file.range_index("level")) == 1
+
+    def test_empty_file_has_header_fields(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that a parsed file with no records still has the fields
+        from its header.
+        """
+        txt_file = txt_parser.parse(StringIO("name\tcode\r\n"))
+
+        assert dict(txt_file.fields) == {"name": 0, "code": 1}
+
 
 class TestDiablo2TxtParser:
     """
@@ -301,3 +629,229 @@ class TestDiablo2TxtParser:
         assert hand_axe["name"] == "Hand Axe"
         assert hand_axe["code"] == "hax"
         assert hand_axe["gemsockets"] == "2"
+
+    def test_parse_mmap_matches_text_parse(
+        self, txt_parser: Diablo2TxtParser, weapons_txt_snippet_path: Path
+    ) -> None:
+        """
+        Verifies that parsing with ``use_mmap`` produces the same records
+        as the default text-mode parse, without decoding them.
+        """
+        mmap_parser = Diablo2TxtParser(use_mmap=True)
+
+        expected = txt_parser.parse(weapons_txt_snippet_path)
+        actual = mmap_parser.parse(weapons_txt_snippet_path)
+
+        lazy = [r.data for r in actual.records]
+        assert all(
+            isinstance(d, Diablo2TxtLazyFields) and d._decoded is None for d in lazy
+        )
+        assert actual.path == expected.path
+        assert list(actual.records) == list(expected.records)
+
+    @pytest.mark.parametrize("columns", [None, ["name"]])
+    def test_parse_mmap_keeps_same_rows(
+        self, tmp_path: Path, columns: Optional[List[str]]
+    ) -> None:
+        """
+        Verifies that parsing with ``use_mmap`` keeps the same rows as the
+        text-mode parse, including rows of non-ASCII whitespace.
+        """
+        path = tmp_path / "Weapons.txt"
+        path.write_bytes(
+            b"name\tcode\tlevel\r\n"
+            b"Expansion\t\xa0\t\xa0\r\n"
+            b"Comment\t \t\t\r\n"
+            b"Broken\tbrk\r\n"
+            b"Hand Axe\t\xa0hax\t3\r\n"
+            b"M\xe4gic\t\xa0\t5\r\n"
+        )
+
+        expected = Diablo2TxtParser(columns=columns).parse(path)
+        actual = Diablo2TxtParser(columns=columns, use_mmap=True).parse(path)
+
+        assert [list(r.data) for r in actual.records] == [
+            list(r.data) for r in expected.records
+        ]
+        assert len(actual.records) == 2
+
+    def test_parse_mmap_decodes_windows_1252(self, tmp_path: Path) -> None:
+        """
+        Verifies that parsing with ``use_mmap`` decodes fields as
+        windows-1252.
+        """
+        path = tmp_path / "test.txt"
+        path.write_bytes(b"name\tcode\r\nM\xe4gic\tmag\r\n")
+
+        txt_file = Diablo2TxtParser(use_mmap=True).parse(path)
+
+        assert txt_file.records[0]["name"] == "M\u00e4gic"
+
+    def test_parse_mmap_empty_file(self, tmp_path: Path) -> None:
+        """
+        Verifies that parsing an empty file with ``use_mmap`` produces
+        no records.
+        """
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+
+        txt_file = Diablo2TxtParser(use_mmap=True).parse(path)
+
+        assert len(txt_file.records) == 0
+
+    def test_iter_records_matches_parse(
+        self, txt_parser: Diablo2TxtParser, weapons_txt_snippet_path: Path
+    ) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`
+        yields the same records as
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.parse`.
+        """
+        txt_file = txt_parser.parse(weapons_txt_snippet_path)
+        records = txt_parser.iter_records(weapons_txt_snippet_path)
+
+        assert list(records) == list(txt_file.records)
+
+    def test_iter_records_streams_text_io(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`
+        yields records from a text IO object as they are read and skips
+        records according to ``skip_record``.
+        """
+        io = StringIO("name\tcode\r\nAxe\taxe\r\nExpansion\t\r\nHand Axe\thax\r\n")
+
+        records = txt_parser.iter_records(io)
+        first = next(records)
+
+        assert first["code"] == "axe"
+        assert io.tell() < len(io.getvalue())
+        assert [r["code"] for r in records] == ["hax"]
+
+    def test_iter_records_empty_file(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`
+        yields nothing for an empty file.
+        """
+        assert list(txt_parser.iter_records(StringIO())) == []
+
+    def test_reader_reads_in_pieces(
+        self, txt_parser: Diablo2TxtParser, weapons_txt_snippet_path: Path
+    ) -> None:
+        """
+        Verifies that a :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtReader`
+        reads records a few at a time and builds the same file as
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.parse`.
+        """
+        expected = txt_parser.parse(weapons_txt_snippet_path)
+
+        with txt_parser.reader(weapons_txt_snippet_path) as reader:
+            first = reader.read(1)
+            rest = reader.read()
+            assert reader.read(1) == []
+            txt_file = reader.txt_file(first + rest)
+
+        assert len(first) == 1
+        assert list(txt_file.records) == list(expected.records)
+        assert txt_file.header == expected.header
+        assert txt_file.path == weapons_txt_snippet_path
+
+    def test_parse_with_record_type(self, weapons_txt_snippet_path: Path) -> None:
+        """
+        Verifies that :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`
+        creates records of its ``record_type``.
+        """
+        parser = Diablo2TxtParser(record_type=Diablo2CompactTxtRecord)
+
+        txt_file = parser.parse(weapons_txt_snippet_path)
+
+        assert all(isinstance(r, Diablo2CompactTxtRecord) for r in txt_file.records)
+        assert txt_file.records[0]["code"] == "hax"
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_parse_selected_columns(
+        self, weapons_txt_snippet_path: Path, use_mmap: bool
+    ) -> None:
+        """
+        Verifies that :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`
+        only keeps the requested columns, in file order.
+        """
+        parser = Diablo2TxtParser(
+            columns=["GemSockets", "code", "name", "nosuchcolumn"], use_mmap=use_mmap
+        )
+
+        txt_file = parser.parse(weapons_txt_snippet_path)
+        hand_axe = txt_file.records[0]
+
+        assert dict(txt_file.fields) == {"name": 0, "code": 1, "gemsockets": 2}
+        assert list(hand_axe.data) == ["Hand Axe", "hax", "2"]
+        assert hand_axe["gemsockets"] == "2"
+
+    def test_parse_selected_columns_incomplete_record(self) -> None:
+        """
+        Verifies that a line missing selected columns produces an
+        incomplete record, which is skipped by default.
+        """
+        parser = Diablo2TxtParser(columns=["name", "ubercode"])
+        io = StringIO("name\tcode\tubercode\r\nAxe\taxe\t9ax\r\nHand Axe\thax\r\n")
+
+        txt_file = parser.parse(io)
+
+        assert [list(r.data) for r in txt_file.records] == [["Axe", "9ax"]]
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    @pytest.mark.parametrize("columns", [["code"], ["name", "type2"]])
+    def test_parse_selected_columns_keeps_same_rows(
+        self, weapons_txt_snippet_path: Path, use_mmap: bool, columns: List[str]
+    ) -> None:
+        """
+        Verifies that selecting columns does not change which rows the
+        default ``skip_record`` keeps.
+        """
+        expected = Diablo2TxtParser(use_mmap=use_mmap).parse(weapons_txt_snippet_path)
+        parser = Diablo2TxtParser(columns=columns, use_mmap=use_mmap)
+
+        txt_file = parser.parse(weapons_txt_snippet_path)
+
+        assert len(txt_file.records) == len(expected.records)
+        assert [r[columns[0]] for r in txt_file.records] == [
+            r[columns[0]] for r in expected.records
+        ]
+
+    def test_parse_selected_columns_judges_whole_rows(self) -> None:
+        """
+        Verifies that comment and incomplete rows are recognized by all of
+        their fields, not just the selected ones.
+        """
+        parser = Diablo2TxtParser(columns=["code"])
+        io = StringIO(
+            "name\tcode\tlevel\r\n"
+            "Expansion\t\t\r\n"
+            "Club\t\t5\r\n"
+            "Axe\taxe\r\n"
+            "Wand\twnd\t2\r\n"
+        )
+
+        txt_file = parser.parse(io)
+
+        assert [list(r.data) for r in txt_file.records] == [[""], ["wnd"]]
+
+    def test_bound_method_is_not_cache_key(self) -> None:
+        """
+        Verifies that a parser whose ``skip_record`` is a method bound to
+        an object has no cache key, since the object's state is unknown,
+        while one bound to a class has one.
+        """
+        assert Diablo2TxtParser(SkipName("Axe").skip).cache_key() is None
+        assert Diablo2TxtParser(SkipName.skip_nothing).cache_key() is not None
+
+    def test_selected_columns_are_part_of_cache_key(self) -> None:
+        """
+        Verifies that parsers selecting different columns have different
+        cache keys.
+        """
+        assert Diablo2TxtParser(columns=["a"]).cache_key() != (
+            Diablo2TxtParser().cache_key()
+        )
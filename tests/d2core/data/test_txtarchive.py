@@ -0,0 +1,157 @@
+"""
+``tests.d2core.data.test_txtarchive``
+=====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtarchive`.
+"""
+
+import asyncio
+from io import BytesIO
+from pathlib import Path
+import tarfile
+from typing import Dict, List, Tuple
+import zipfile
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtarchive import (
+    is_txt_archive,
+    iter_txt_archive,
+    load_txt_archive,
+)
+from d2lfg.d2core.data.txtasync import load_txt_directory_async
+from d2lfg.d2core.data.txtdir import load_txt_directory
+from d2lfg.error import DataLookupError, DuplicateKeyError
+from tests.testhelper.txtgen import write_txt_tables
+
+TABLES = ("Weapons", "ItemTypes", "Misc")
+
+
+@pytest.fixture
+def txt_directory(tmp_path: Path) -> Path:
+    """
+    A directory of generated .txt files.
+    """
+    directory = tmp_path / "data"
+    directory.mkdir()
+    write_txt_tables(directory, tables=TABLES)
+    (directory / "notes.md").write_text("not a table")
+    return directory
+
+
+@pytest.fixture(params=["zip", "tar.gz"])
+def txt_archive(request: pytest.FixtureRequest, txt_directory: Path) -> Path:
+    """
+    A zip or compressed tar archive of :py:func:`txt_directory`, with the
+    files in a subdirectory of the archive.
+    """
+    kind: str = request.param
+    path = txt_directory.parent / f"data.{kind}"
+    files = sorted(txt_directory.iterdir())
+    if kind == "zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+            for f in files:
+                z.write(f, f"season/{f.name}")
+    else:
+        with tarfile.open(path, "w:gz") as t:
+            for f in files:
+                t.add(f, f"season/{f.name}")
+    return path
+
+
+def _rows(txt_files: Dict[str, Diablo2TxtFile]) -> Dict[str, List[Tuple[str, ...]]]:
+    """
+    Returns the data of each record of each file.
+    """
+    return {name: [tuple(r.data) for r in f.records] for name, f in txt_files.items()}
+
+
+class TestParseBinaryIO:
+    """
+    Tests parsing binary IO objects with
+    :py:class:`~d2lfg.d2core.data.txt.Diablo2TxtParser`.
+    """
+
+    def test_matches_path(
+        self, weapons_txt_snippet_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that parsing a binary IO object produces the same file as
+        parsing its path, and leaves the IO object open.
+        """
+        expected = txt_parser.parse(weapons_txt_snippet_path)
+        f = BytesIO(weapons_txt_snippet_path.read_bytes())
+        txt_file = txt_parser.parse(f)
+        assert txt_file.path is None
+        assert txt_file.header == expected.header
+        assert txt_file.newline == expected.newline
+        assert [r.data for r in txt_file.records] == [r.data for r in expected.records]
+        assert not f.closed
+
+
+class TestTxtArchive:
+    """
+    Tests :py:mod:`d2lfg.d2core.data.txtarchive`.
+    """
+
+    def test_is_txt_archive(self, txt_archive: Path, txt_directory: Path) -> None:
+        """
+        Verifies that archives are told apart from directories and other
+        files.
+        """
+        assert is_txt_archive(txt_archive)
+        assert not is_txt_archive(txt_directory)
+        assert not is_txt_archive(txt_directory / "Weapons.txt")
+
+    def test_load_matches_directory(
+        self, txt_archive: Path, txt_directory: Path
+    ) -> None:
+        """
+        Verifies that loading an archive produces the same tables as
+        loading the directory it was made from.
+        """
+        expected = load_txt_directory(txt_directory, max_workers=1)
+        loaded = load_txt_archive(txt_archive)
+        assert list(loaded) == ["ItemTypes", "Misc", "Weapons"]
+        assert _rows(loaded) == _rows(expected)
+        assert all(f.path is None for f in loaded.values())
+
+    def test_select_tables(self, txt_archive: Path) -> None:
+        """
+        Verifies that selected tables are loaded in the requested order.
+        """
+        loaded = load_txt_archive(txt_archive, tables=["weapons", "ITEMTYPES"])
+        assert list(loaded) == ["Weapons", "ItemTypes"]
+        with pytest.raises(DataLookupError):
+            load_txt_archive(txt_archive, tables=["Armor"])
+
+    def test_directory_loaders_read_archives(
+        self, txt_archive: Path, txt_directory: Path
+    ) -> None:
+        """
+        Verifies that the directory loaders accept archives.
+        """
+        expected = _rows(load_txt_directory(txt_directory, max_workers=1))
+        assert _rows(load_txt_directory(txt_archive)) == expected
+        loaded = asyncio.run(load_txt_directory_async(txt_archive, tables=TABLES))
+        assert _rows(loaded) == expected
+
+    def test_iter_in_stored_order(self, txt_archive: Path) -> None:
+        """
+        Verifies that members are yielded in the order they are stored.
+        """
+        names = [name for name, _ in iter_txt_archive(txt_archive)]
+        assert names == ["ItemTypes", "Misc", "Weapons"]
+
+    def test_duplicate_table_raises(self, tmp_path: Path) -> None:
+        """
+        Verifies that two members with the same table name raise
+        :py:class:`~d2lfg.error.DuplicateKeyError`.
+        """
+        path = tmp_path / "data.zip"
+        with zipfile.ZipFile(path, "w") as z:
+            z.writestr("a/Misc.txt", "name\tcode\r\n")
+            z.writestr("b/misc.TXT", "name\tcode\r\n")
+        with pytest.raises(DuplicateKeyError):
+            load_txt_archive(path)
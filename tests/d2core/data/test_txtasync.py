@@ -0,0 +1,150 @@
+"""
+``tests.d2core.data.test_txtasync``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtasync`.
+"""
+
+import asyncio
+from pathlib import Path
+import shutil
+from typing import List
+
+import pytest
+
+from d2lfg.d2core.data.txt import (
+    Diablo2TxtParser,
+    Diablo2TxtReader,
+    Diablo2TxtSource,
+)
+from d2lfg.d2core.data.txtasync import (
+    iter_records_async,
+    load_txt_directory_async,
+    load_txt_files_async,
+    parse_txt_file_async,
+)
+from tests.testhelper.txtgen import write_txt_table
+
+
+class SpyParser(Diablo2TxtParser):
+    """
+    A parser that remembers the readers it creates.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.readers: List[Diablo2TxtReader] = list()
+        self.closed = 0
+
+    def reader(self, file: Diablo2TxtSource) -> Diablo2TxtReader:
+        reader = super().reader(file)
+        self.readers.append(reader)
+        close = reader.close
+
+        def counting_close() -> None:
+            self.closed += 1
+            close()
+
+        reader.close = counting_close  # type: ignore[method-assign]
+        return reader
+
+
+class TestParseTxtFileAsync:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtasync.parse_txt_file_async`.
+    """
+
+    def test_matches_parse(self, weapons_txt_snippet_path: Path) -> None:
+        """
+        Verifies that parsing asynchronously produces the same file as
+        parsing synchronously.
+        """
+        parser = SpyParser()
+        expected = parser.parse(weapons_txt_snippet_path)
+
+        txt_file = asyncio.run(
+            parse_txt_file_async(weapons_txt_snippet_path, parser, chunk_size=1)
+        )
+
+        assert list(txt_file.records) == list(expected.records)
+        assert txt_file.header == expected.header
+        assert txt_file.path == weapons_txt_snippet_path
+        assert parser.closed == 1
+
+    def test_cancel_stops_parsing(self, tmp_path: Path) -> None:
+        """
+        Verifies that a cancelled parse stops and closes its reader.
+        """
+        path = write_txt_table(tmp_path, "Weapons", scale=10).path
+        parser = SpyParser()
+
+        async def cancel_after_first_chunk() -> None:
+            task = asyncio.ensure_future(
+                parse_txt_file_async(path, parser, chunk_size=1)
+            )
+            while not parser.readers:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_after_first_chunk())
+
+        assert parser.closed == 1
+        assert next(parser.readers[0], None) is None
+
+
+class TestIterRecordsAsync:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtasync.iter_records_async`.
+    """
+
+    def test_yields_chunks(self, weapons_txt_snippet_path: Path) -> None:
+        """
+        Verifies that records are yielded in chunks of the given size.
+        """
+
+        async def chunk_sizes() -> List[int]:
+            return [
+                len(chunk)
+                async for chunk in iter_records_async(
+                    weapons_txt_snippet_path, chunk_size=1
+                )
+            ]
+
+        assert asyncio.run(chunk_sizes()) == [1, 1]
+
+
+class TestLoadTxtFilesAsync:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtasync.load_txt_files_async` and
+    :py:func:`~d2lfg.d2core.data.txtasync.load_txt_directory_async`.
+    """
+
+    def test_loads_directory(
+        self, tmp_path: Path, weapons_txt_snippet_path: Path
+    ) -> None:
+        """
+        Verifies that every table in a directory is loaded.
+        """
+        shutil.copy(weapons_txt_snippet_path, tmp_path / "Weapons.txt")
+        write_txt_table(tmp_path, "Armor")
+
+        tables = asyncio.run(load_txt_directory_async(tmp_path))
+
+        assert list(tables) == ["Armor", "Weapons"]
+        assert tables["Weapons"].column("code") == ["hax", "axe"]
+
+    def test_failure_cancels_other_files(self, tmp_path: Path) -> None:
+        """
+        Verifies that if one file fails to load, the error is raised and
+        the other files stop loading.
+        """
+        path = write_txt_table(tmp_path, "Weapons", scale=10).path
+        parser = SpyParser()
+        files = {"Weapons": path, "Missing": tmp_path / "Missing.txt"}
+
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(load_txt_files_async(files, parser, chunk_size=1))
+
+        assert parser.closed == len(parser.readers)
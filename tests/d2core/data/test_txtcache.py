@@ -0,0 +1,196 @@
+"""
+``tests.d2core.data.test_txtcache``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtcache`.
+"""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from d2lfg.d2core.data.txt import (
+    Diablo2TxtFile,
+    Diablo2TxtParser,
+    Diablo2TxtRecord,
+    Diablo2TxtSource,
+)
+from d2lfg.d2core.data.txtcache import Diablo2TxtParseCache
+from tests.testhelper.txtgen import write_txt_table
+
+
+@pytest.fixture
+def weapons_txt_copy(tmp_path: Path, weapons_txt_snippet_path: Path) -> Path:
+    """
+    A copy of the Weapons.txt snippet that tests may modify.
+    """
+    path = tmp_path / "Weapons.txt"
+    shutil.copy(weapons_txt_snippet_path, path)
+    return path
+
+
+@pytest.fixture
+def parse_cache(tmp_path: Path) -> Diablo2TxtParseCache:
+    """
+    A :py:class:`~d2lfg.d2core.data.txtcache.Diablo2TxtParseCache` using
+    an empty directory.
+    """
+    return Diablo2TxtParseCache(tmp_path / "cache")
+
+
+def fail_parse(*args: object) -> Diablo2TxtFile:
+    """
+    Stands in for :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.parse`
+    when a test expects a file to be loaded from the cache.
+    """
+    raise AssertionError("file was parsed")
+
+
+class CountingParser(Diablo2TxtParser):
+    """
+    A parser that counts the files it parses.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def parse(self, file: Diablo2TxtSource) -> Diablo2TxtFile:
+        self.calls += 1
+        return super().parse(file)
+
+
+def keep_all(record: Diablo2TxtRecord) -> bool:
+    """
+    A ``skip_record`` function that does not skip any records.
+    """
+    return False
+
+
+class SkipName:
+    """
+    Skips records with a given name.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def skip(self, record: Diablo2TxtRecord) -> bool:
+        """
+        Returns ``True`` if the record has the name.
+        """
+        return record["name"] == self.name
+
+
+class TestDiablo2TxtParseCache:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtcache.Diablo2TxtParseCache`.
+    """
+
+    def test_warm_parse_loads_from_cache(
+        self,
+        parse_cache: Diablo2TxtParseCache,
+        weapons_txt_copy: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        Verifies that parsing an unchanged file a second time loads the
+        same records from the cache.
+        """
+        cold = parse_cache.parse(weapons_txt_copy)
+        monkeypatch.setattr(parse_cache.parser, "parse", fail_parse)
+        warm = parse_cache.parse(weapons_txt_copy)
+
+        assert list(warm.records) == list(cold.records)
+        assert warm.fields == cold.fields
+        assert warm.header == cold.header
+        assert warm.newline == cold.newline
+        assert warm.path == weapons_txt_copy
+        assert len(list(parse_cache.directory.iterdir())) == 1
+
+    def test_hits_do_not_parse(self, tmp_path: Path) -> None:
+        """
+        Verifies that a generated table is parsed once, however many times
+        it is loaded through the cache.
+        """
+        path = write_txt_table(tmp_path, "Weapons").path
+        parser = CountingParser()
+        parse_cache = Diablo2TxtParseCache(tmp_path / "cache", parser)
+
+        cold = parse_cache.parse(path)
+        warm = [parse_cache.parse(path) for _ in range(3)]
+
+        assert parser.calls == 1
+        assert all(list(w.records) == list(cold.records) for w in warm)
+
+    def test_changed_file_is_parsed(
+        self, parse_cache: Diablo2TxtParseCache, weapons_txt_copy: Path
+    ) -> None:
+        """
+        Verifies that a cache entry is not used once the file changes.
+        """
+        parse_cache.parse(weapons_txt_copy)
+        weapons_txt_copy.write_text("name\tcode\r\nHand Axe\thax\r\n")
+
+        txt_file = parse_cache.parse(weapons_txt_copy)
+
+        assert txt_file.column("code") == ["hax"]
+        assert len(list(parse_cache.directory.iterdir())) == 2
+
+    def test_parser_settings_are_part_of_key(
+        self, tmp_path: Path, weapons_txt_copy: Path
+    ) -> None:
+        """
+        Verifies that parsers with different settings do not share
+        cache entries.
+        """
+        weapons_txt_copy.write_text("name\tcode\r\nAxe\taxe\r\nExpansion\t\r\n")
+        cache_dir = tmp_path / "cache"
+        default = Diablo2TxtParseCache(cache_dir).parse(weapons_txt_copy)
+        keeping = Diablo2TxtParseCache(cache_dir, Diablo2TxtParser(keep_all))
+
+        assert len(keeping.parse(weapons_txt_copy).records) > len(default.records)
+
+    def test_unidentifiable_parser_is_not_cached(
+        self, tmp_path: Path, weapons_txt_copy: Path
+    ) -> None:
+        """
+        Verifies that files are always parsed if the parser's
+        ``skip_record`` cannot be identified.
+        """
+        parser = Diablo2TxtParser(lambda r: False)
+        cache = Diablo2TxtParseCache(tmp_path / "cache", parser)
+
+        assert parser.cache_key() is None
+        assert len(cache.parse(weapons_txt_copy).records) > 0
+        assert not cache.directory.exists()
+
+    def test_bound_method_is_not_cached(
+        self, tmp_path: Path, weapons_txt_copy: Path
+    ) -> None:
+        """
+        Verifies that parsers whose ``skip_record`` methods are bound to
+        different objects do not share cache entries.
+        """
+        weapons_txt_copy.write_text("name\tcode\r\nAxe\taxe\r\nWand\twnd\r\n")
+        cache_dir = tmp_path / "cache"
+
+        for name, kept in (("Axe", "wnd"), ("Wand", "axe")):
+            parser = Diablo2TxtParser(SkipName(name).skip)
+            txt_file = Diablo2TxtParseCache(cache_dir, parser).parse(weapons_txt_copy)
+            assert txt_file.column("code") == [kept]
+
+    def test_corrupt_entry_is_replaced(
+        self, parse_cache: Diablo2TxtParseCache, weapons_txt_copy: Path
+    ) -> None:
+        """
+        Verifies that a corrupt cache entry falls back to parsing the file.
+        """
+        expected = parse_cache.parse(weapons_txt_copy)
+        (entry,) = parse_cache.directory.iterdir()
+        entry.write_bytes(b"\x00garbage")
+
+        assert list(parse_cache.parse(weapons_txt_copy).records) == list(
+            expected.records
+        )
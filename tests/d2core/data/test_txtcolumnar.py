@@ -0,0 +1,106 @@
+"""
+``tests.d2core.data.test_txtcolumnar``
+======================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtcolumnar`.
+"""
+
+from io import StringIO
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtcolumnar import Diablo2ColumnarTxtFile, Diablo2TxtDictColumn
+
+
+@pytest.fixture
+def columnar_txt_file(txt_parser: Diablo2TxtParser) -> Diablo2ColumnarTxtFile:
+    """
+    A :py:class:`~d2lfg.d2core.data.txtcolumnar.Diablo2ColumnarTxtFile`
+    with one high-cardinality and one low-cardinality column.
+    """
+    io = StringIO(
+        "code\ttype\r\n" "hax\taxe\r\n" "axe\taxe\r\n" "2ax\taxe\r\n" "wnd\twand\r\n"
+    )
+    return Diablo2ColumnarTxtFile.from_records(None, txt_parser.iter_records(io))
+
+
+class TestDiablo2ColumnarTxtFile:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtcolumnar.Diablo2ColumnarTxtFile`.
+    """
+
+    def test_records_match_row_file(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that a columnar file has the same records as the file
+        it was built from.
+        """
+        columnar = Diablo2ColumnarTxtFile.from_txt_file(weapons_txt_file)
+
+        assert list(columnar.records) == list(weapons_txt_file.records)
+        assert columnar.records[-1] == weapons_txt_file.records[-1]
+        assert columnar.path == weapons_txt_file.path
+
+    def test_low_cardinality_column_is_dictionary_encoded(
+        self, columnar_txt_file: Diablo2ColumnarTxtFile
+    ) -> None:
+        """
+        Verifies that a column with few distinct values is
+        dictionary-encoded, and a column with many is not.
+        """
+        type_column = columnar_txt_file.column("TYPE")
+
+        assert isinstance(type_column, Diablo2TxtDictColumn)
+        assert list(type_column.values) == ["axe", "wand"]
+        assert list(type_column) == ["axe", "axe", "axe", "wand"]
+        assert list(columnar_txt_file.column("code")) == ["hax", "axe", "2ax", "wnd"]
+
+    def test_where_returns_matching_rows(
+        self, columnar_txt_file: Diablo2ColumnarTxtFile
+    ) -> None:
+        """
+        Verifies that
+        :py:meth:`~d2lfg.d2core.data.txtcolumnar.Diablo2ColumnarTxtFile.where`
+        yields the indices of matching rows for both kinds of column.
+        """
+        assert list(columnar_txt_file.where("type", lambda v: v == "axe")) == [0, 1, 2]
+        assert list(columnar_txt_file.where("code", lambda v: "ax" in v)) == [0, 1, 2]
+
+    def test_record_index_out_of_range(
+        self, columnar_txt_file: Diablo2ColumnarTxtFile
+    ) -> None:
+        """
+        Verifies that indexing past the last record raises
+        :py:class:`IndexError`.
+        """
+        with pytest.raises(IndexError):
+            columnar_txt_file.records[4]
+
+    def test_from_empty_records(self) -> None:
+        """
+        Verifies that a columnar file can be built with no records.
+        """
+        columnar = Diablo2ColumnarTxtFile.from_records(None, [])
+
+        assert len(columnar.records) == 0
+
+    def test_assigned_records_are_stored_by_column(
+        self, txt_parser: Diablo2TxtParser, columnar_txt_file: Diablo2ColumnarTxtFile
+    ) -> None:
+        """
+        Verifies that assigning new records replaces the columns that
+        :py:meth:`~d2lfg.d2core.data.txtcolumnar.Diablo2ColumnarTxtFile.column`
+        and :py:meth:`~d2lfg.d2core.data.txtcolumnar.Diablo2ColumnarTxtFile.where`
+        read.
+        """
+        columnar_txt_file.index("code")
+        records = list(
+            txt_parser.iter_records(StringIO("code\ttype\r\nbow\tbow\r\nwnd\twand\r\n"))
+        )
+
+        columnar_txt_file.records = records
+
+        assert list(columnar_txt_file.records) == records
+        assert list(columnar_txt_file.column("code")) == ["bow", "wnd"]
+        assert list(columnar_txt_file.where("type", lambda v: v == "wand")) == [1]
+        assert list(columnar_txt_file.index("code")) == ["bow", "wnd"]
@@ -0,0 +1,93 @@
+"""
+``tests.d2core.data.test_txtcolumntypes``
+=========================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtcolumntypes`.
+"""
+
+from typing import List
+
+import pytest
+
+from d2lfg.d2core.data.txtcolumntypes import (
+    Diablo2TxtColumnType,
+    Diablo2TxtTypedColumn,
+)
+from d2lfg.error import DataConversionError
+
+
+class TestDiablo2TxtColumnType:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtColumnType`.
+    """
+
+    @pytest.mark.parametrize(
+        "values, expected_type",
+        [
+            (["1", "-2", "30"], Diablo2TxtColumnType.INT),
+            (["1", "", "30"], Diablo2TxtColumnType.OPTIONAL_INT),
+            (["0", "1", "1"], Diablo2TxtColumnType.INT),
+        ],
+    )
+    def test_infer(
+        self, values: List[str], expected_type: Diablo2TxtColumnType
+    ) -> None:
+        """
+        Verifies that the type of a numeric column is inferred correctly.
+        """
+        assert Diablo2TxtColumnType.infer(values) == expected_type
+
+    def test_infer_non_numeric_raises(self) -> None:
+        """
+        Verifies that inferring the type of a non-numeric column raises
+        :py:class:`~d2lfg.error.DataConversionError`.
+        """
+        with pytest.raises(DataConversionError):
+            Diablo2TxtColumnType.infer(["1", "axe"])
+
+
+class TestDiablo2TxtTypedColumn:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtcolumntypes.Diablo2TxtTypedColumn`.
+    """
+
+    def test_int_column(self) -> None:
+        """
+        Verifies that empty fields in an integer column are ``0``.
+        """
+        column = Diablo2TxtTypedColumn.from_strings(
+            ["4", "", " 11"], Diablo2TxtColumnType.INT
+        )
+
+        assert list(column) == [4, 0, 11]
+        assert column.present is None
+
+    def test_optional_int_column(self) -> None:
+        """
+        Verifies that empty fields in an optional integer column are ``None``.
+        """
+        column = Diablo2TxtTypedColumn.from_strings(
+            ["4", "", "11"], Diablo2TxtColumnType.OPTIONAL_INT
+        )
+
+        assert list(column) == [4, None, 11]
+        assert column[1:] == [None, 11]
+
+    def test_bool_column(self) -> None:
+        """
+        Verifies that boolean columns contain :py:class:`bool` values.
+        """
+        column = Diablo2TxtTypedColumn.from_strings(
+            ["1", "", "0", "2"], Diablo2TxtColumnType.BOOL
+        )
+
+        assert list(column) == [True, False, False, True]
+        assert all(isinstance(v, bool) for v in column)
+
+    def test_invalid_value_raises(self) -> None:
+        """
+        Verifies that converting a non-numeric value raises
+        :py:class:`~d2lfg.error.DataConversionError`.
+        """
+        with pytest.raises(DataConversionError):
+            Diablo2TxtTypedColumn.from_strings(["1", "x"], Diablo2TxtColumnType.INT)
@@ -0,0 +1,123 @@
+"""
+``tests.d2core.data.test_txtdiff``
+==================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtdiff`.
+"""
+
+from io import StringIO
+from pathlib import Path
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtdiff import diff_txt_files
+from tests.testhelper.txtgen import write_txt_table
+
+
+def parse(text: str) -> Diablo2TxtFile:
+    """
+    Parses .txt file content given as a string.
+    """
+    return Diablo2TxtParser().parse(StringIO(text))
+
+
+class TestDiffTxtFiles:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtdiff.diff_txt_files`.
+    """
+
+    def test_identical_files_have_no_differences(self) -> None:
+        """
+        Verifies that comparing a file with itself finds no differences.
+        """
+        txt_file = parse("code\tlevel\r\naxe\t7\r\nhax\t3\r\n")
+
+        assert not diff_txt_files(txt_file, txt_file, "code")
+
+    def test_added_removed_and_changed_rows(self) -> None:
+        """
+        Verifies that added, removed and changed rows are reported by key.
+        """
+        old = parse("code\tlevel\r\naxe\t7\r\nhax\t3\r\n2ax\t10\r\n")
+        new = parse("code\tlevel\r\nhax\t4\r\naxe\t7\r\nwnd\t2\r\n")
+
+        diff = diff_txt_files(old, new, "Code")
+
+        assert list(diff.added) == ["wnd"]
+        assert list(diff.removed) == ["2ax"]
+        assert list(diff.changed) == ["hax"]
+        assert diff.changed["hax"].new["level"] == "4"
+        assert diff.changed["hax"].columns == {"level": ("3", "4")}
+
+    def test_rows_compared_by_column_name(self) -> None:
+        """
+        Verifies that rows are compared by column name when the columns
+        differ between versions, with missing columns treated as empty.
+        """
+        old = parse("code\tlevel\r\naxe\t7\r\nhax\t3\r\n")
+        new = parse("level\tcode\tspawnable\r\n7\taxe\t\r\n3\thax\t1\r\n")
+
+        diff = diff_txt_files(old, new, "code")
+
+        assert list(diff.changed) == ["hax"]
+        assert diff.changed["hax"].columns == {"spawnable": ("", "1")}
+
+    def test_missing_trailing_fields_are_empty(self) -> None:
+        """
+        Verifies that a row missing trailing fields matches a row whose
+        trailing fields are empty.
+        """
+        old = Diablo2TxtParser(skip_record=None).parse(
+            StringIO("code\tlevel\tspawnable\r\naxe\t7\r\n")
+        )
+        new = parse("code\tlevel\tspawnable\r\naxe\t7\t\r\n")
+
+        assert not diff_txt_files(old, new, "code")
+
+    def test_changed_columns(self) -> None:
+        """
+        Verifies that the number of changed rows per column is reported.
+        """
+        old = parse("code\tlevel\tcost\r\naxe\t7\t10\r\nhax\t3\t5\r\n")
+        new = parse("code\tlevel\tcost\r\naxe\t8\t10\r\nhax\t4\t6\r\n")
+
+        diff = diff_txt_files(old, new, "code")
+
+        assert diff.changed_columns() == {"level": 2, "cost": 1}
+
+    def test_large_table(self, tmp_path: Path) -> None:
+        """
+        Verifies the diff of a generated table against a copy with one
+        changed cell.
+        """
+        path = write_txt_table(tmp_path, "Weapons", scale=10).path
+        old = Diablo2TxtParser().parse(path)
+        new = Diablo2TxtParser().parse(path)
+        record = new.records[1234]
+        record.data[record.fields["level"]] = "999"  # type: ignore[index]
+        new.invalidate()
+
+        diff = diff_txt_files(old, new, "code")
+
+        assert list(diff.changed) == [record["code"]]
+        assert diff.changed[record["code"]].columns["level"][1] == "999"
+        assert not diff.added and not diff.removed
+
+
+class TestFingerprints:
+    """
+    Tests :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtFile.fingerprints`.
+    """
+
+    def test_fingerprints_cached_until_records_change(self) -> None:
+        """
+        Verifies that fingerprints are computed once and discarded when
+        the records change.
+        """
+        txt_file = parse("code\tlevel\r\naxe\t7\r\nhax\t3\r\n")
+
+        fingerprints = txt_file.fingerprints()
+
+        assert txt_file.fingerprints() is fingerprints
+        assert fingerprints[0] != fingerprints[1]
+        txt_file.records = txt_file.records[1:]
+        assert txt_file.fingerprints() == [fingerprints[1]]
@@ -0,0 +1,87 @@
+"""
+``tests.d2core.data.test_txtdir``
+=================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtdir`.
+"""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser
+from d2lfg.d2core.data.txtdir import find_txt_tables, load_txt_directory
+from d2lfg.error import DataLookupError
+
+
+@pytest.fixture
+def txt_directory(tmp_path: Path, weapons_txt_snippet_path: Path) -> Path:
+    """
+    A directory containing several .txt files.
+    """
+    shutil.copy(weapons_txt_snippet_path, tmp_path / "Weapons.txt")
+    (tmp_path / "ItemTypes.txt").write_text("ItemType\tCode\r\nAxe\taxe\r\n")
+    (tmp_path / "Misc.txt").write_text("name\tcode\r\nElixir\telx\r\n")
+    (tmp_path / "notes.md").write_text("not a table")
+    return tmp_path
+
+
+class TestFindTxtTables:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtdir.find_txt_tables`.
+    """
+
+    def test_finds_txt_files_by_table_name(self, txt_directory: Path) -> None:
+        """
+        Verifies that .txt files are found and keyed by table name.
+        """
+        tables = find_txt_tables(txt_directory)
+
+        assert list(tables) == ["ItemTypes", "Misc", "Weapons"]
+        assert tables["Misc"] == txt_directory / "Misc.txt"
+
+
+class TestLoadTxtDirectory:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtdir.load_txt_directory`.
+    """
+
+    @pytest.mark.parametrize("use_processes", [True, False])
+    def test_parallel_load_matches_sequential(
+        self, txt_directory: Path, use_processes: bool
+    ) -> None:
+        """
+        Verifies that loading in parallel produces the same tables as
+        loading sequentially.
+        """
+        sequential = load_txt_directory(txt_directory, max_workers=1)
+        parallel = load_txt_directory(
+            txt_directory, max_workers=2, use_processes=use_processes
+        )
+
+        assert list(parallel) == list(sequential)
+        for name, txt_file in parallel.items():
+            assert txt_file.path == sequential[name].path
+            assert txt_file.fields == sequential[name].fields
+            assert list(txt_file.records) == list(sequential[name].records)
+
+    def test_load_selected_tables(self, txt_directory: Path) -> None:
+        """
+        Verifies that only the requested tables are loaded, and that table
+        names are case insensitive.
+        """
+        tables = load_txt_directory(
+            txt_directory, Diablo2TxtParser(), tables=["weapons", "MISC"]
+        )
+
+        assert list(tables) == ["Weapons", "Misc"]
+        assert tables["Misc"].column("code") == ["elx"]
+
+    def test_load_missing_table_raises(self, txt_directory: Path) -> None:
+        """
+        Verifies that requesting a table that does not exist raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        with pytest.raises(DataLookupError):
+            load_txt_directory(txt_directory, tables=["Armor"])
@@ -0,0 +1,158 @@
+"""
+``tests.d2core.data.test_txtfilter``
+====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtfilter`.
+"""
+
+from io import StringIO
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser
+from d2lfg.d2core.data.txtfilter import (
+    DEFAULT_ROW_FILTERS,
+    Diablo2TxtColumnEquals,
+    Diablo2TxtColumnIn,
+    Diablo2TxtColumnRange,
+    Diablo2TxtNotCommentRow,
+    Diablo2TxtRowFilter,
+)
+from d2lfg.error import DataLookupError
+
+TXT = (
+    "name\ttype\tspawnable\tlevelreq\r\n"
+    "Hand Axe\taxe\t1\t\r\n"
+    "Axe\taxe\t0\t5\r\n"
+    "Expansion\t\t\t\r\n"
+    "Wand\twand\t1\t12\r\n"
+    "Broken\taxe\r\n"
+)
+
+
+@pytest.fixture
+def txt_path(tmp_path: Path) -> Path:
+    """
+    Path to a small .txt file with comment and incomplete rows.
+    """
+    path = tmp_path / "test.txt"
+    path.write_bytes(TXT.encode())
+    return path
+
+
+def names(txt_path: Path, filters: List[Diablo2TxtRowFilter], mmap: bool) -> List[str]:
+    """
+    Parses ``txt_path`` with the given filters and no ``skip_record``,
+    returning the names of the kept rows.
+    """
+    parser = Diablo2TxtParser(None, filters=filters, use_mmap=mmap)
+    return list(parser.parse(txt_path).column("name"))
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+class TestDiablo2TxtRowFilters:
+    """
+    Tests the row filters in :py:mod:`d2lfg.d2core.data.txtfilter`, reading
+    both :py:class:`str` and :py:class:`bytes` lines.
+    """
+
+    def test_default_filters_match_skip_record(
+        self, txt_path: Path, mmap: bool
+    ) -> None:
+        """
+        Verifies that
+        :py:data:`~d2lfg.d2core.data.txtfilter.DEFAULT_ROW_FILTERS` keep
+        the same rows as the default ``skip_record``.
+        """
+        expected = Diablo2TxtParser().parse(txt_path).column("name")
+
+        assert names(txt_path, list(DEFAULT_ROW_FILTERS), mmap) == expected
+
+    def test_non_ascii_whitespace_is_a_comment(
+        self, tmp_path: Path, mmap: bool
+    ) -> None:
+        """
+        Verifies that
+        :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtNotCommentRow`
+        treats fields of windows-1252 no-break spaces as empty, like the
+        default ``skip_record``.
+        """
+        path = tmp_path / "nbsp.txt"
+        path.write_bytes(b"name\ta\tb\r\nx\t\xa0\t\xa0\r\ny\t\xa0\tz\r\n")
+        filters: List[Diablo2TxtRowFilter] = [Diablo2TxtNotCommentRow()]
+
+        assert names(path, filters, mmap) == ["y"]
+
+    def test_column_equals(self, txt_path: Path, mmap: bool) -> None:
+        """
+        Verifies that
+        :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtColumnEquals`
+        keeps rows where the column has the value.
+        """
+        filters: List[Diablo2TxtRowFilter] = [Diablo2TxtColumnEquals("Spawnable", "1")]
+
+        assert names(txt_path, filters, mmap) == ["Hand Axe", "Wand"]
+
+    def test_column_in(self, txt_path: Path, mmap: bool) -> None:
+        """
+        Verifies that :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtColumnIn`
+        keeps rows where the column has one of the values.
+        """
+        filters: List[Diablo2TxtRowFilter] = [Diablo2TxtColumnIn("type", ["wand"])]
+
+        assert names(txt_path, filters, mmap) == ["Wand"]
+
+    def test_column_range(self, txt_path: Path, mmap: bool) -> None:
+        """
+        Verifies that
+        :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtColumnRange` keeps
+        rows within the range, treating empty fields as ``0``.
+        """
+        filters: List[Diablo2TxtRowFilter] = [
+            *DEFAULT_ROW_FILTERS,
+            Diablo2TxtColumnRange("levelreq", high=5),
+        ]
+
+        assert names(txt_path, filters, mmap) == ["Hand Axe", "Axe"]
+
+    def test_filters_with_selected_columns(self, txt_path: Path, mmap: bool) -> None:
+        """
+        Verifies that filters may read columns that are not kept.
+        """
+        parser = Diablo2TxtParser(
+            None,
+            use_mmap=mmap,
+            columns=["name"],
+            filters=[Diablo2TxtColumnRange("levelreq", low=1)],
+        )
+
+        assert parser.parse(txt_path).column("name") == ["Axe", "Wand"]
+
+
+def test_unknown_column_raises() -> None:
+    """
+    Verifies that filtering on a column that does not exist raises
+    :py:class:`~d2lfg.error.DataLookupError`.
+    """
+    parser = Diablo2TxtParser(filters=[Diablo2TxtColumnEquals("nosuch", "1")])
+
+    with pytest.raises(DataLookupError):
+        parser.parse(StringIO(TXT))
+
+
+def test_filters_are_part_of_cache_key() -> None:
+    """
+    Verifies that parsers with different filters have different cache keys.
+    """
+    k1 = Diablo2TxtParser(filters=[Diablo2TxtColumnIn("type", ["axe", "wand"])])
+    k2 = Diablo2TxtParser(filters=[Diablo2TxtColumnIn("type", ["axe"])])
+
+    assert k1.cache_key() != k2.cache_key()
+    assert (
+        k1.cache_key()
+        == Diablo2TxtParser(
+            filters=[Diablo2TxtColumnIn("type", ["wand", "axe"])]
+        ).cache_key()
+    )
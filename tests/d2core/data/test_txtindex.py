@@ -0,0 +1,136 @@
+"""
+``tests.d2core.data.test_txtindex``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtindex`.
+"""
+
+import pytest
+
+from d2lfg.d2core.data.txtindex import (
+    Diablo2TxtHashIndex,
+    Diablo2TxtRangeIndex,
+    Diablo2TxtUniqueIndex,
+)
+from d2lfg.error import DuplicateKeyError
+
+ROWS = ["hand axe", "axe", "wand", "double axe"]
+TYPES = ["axe", "axe", "wand", "axe"]
+LEVELS = [3, 7, None, 13]
+
+
+class TestDiablo2TxtHashIndex:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtindex.Diablo2TxtHashIndex`.
+    """
+
+    def test_lookup_returns_rows_in_order(self) -> None:
+        """
+        Verifies that a lookup returns every row with the value, in order.
+        """
+        index = Diablo2TxtHashIndex.build(ROWS, TYPES)
+
+        assert index.lookup("axe") == ["hand axe", "axe", "double axe"]
+        assert index.ordinals("wand") == [2]
+        assert index.lookup("bow") == []
+
+    def test_keys(self) -> None:
+        """
+        Verifies that the index contains each distinct value once.
+        """
+        index = Diablo2TxtHashIndex.build(ROWS, TYPES)
+
+        assert list(index) == ["axe", "wand"]
+        assert len(index) == 2
+        assert "wand" in index
+        assert "bow" not in index
+
+
+class TestDiablo2TxtUniqueIndex:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtindex.Diablo2TxtUniqueIndex`.
+    """
+
+    def test_getitem_returns_row(self) -> None:
+        """
+        Verifies that looking up a value returns its row.
+        """
+        index = Diablo2TxtUniqueIndex.build(ROWS, ["hax", "axe", "wnd", "2ax"])
+
+        assert index["wnd"] == "wand"
+        assert index.get("2ax") == "double axe"
+        assert index.get("bow") is None
+        with pytest.raises(KeyError):
+            index["bow"]
+
+    def test_duplicate_value_raises(self) -> None:
+        """
+        Verifies that building a unique index over duplicate values raises
+        :py:class:`~d2lfg.error.DuplicateKeyError`.
+        """
+        with pytest.raises(DuplicateKeyError):
+            Diablo2TxtUniqueIndex.build(ROWS, TYPES)
+
+
+class TestDiablo2TxtRangeIndex:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtindex.Diablo2TxtRangeIndex`.
+    """
+
+    def test_range_is_inclusive(self) -> None:
+        """
+        Verifies that a range query returns rows within both bounds, in
+        ascending order of value.
+        """
+        index = Diablo2TxtRangeIndex.build(ROWS, LEVELS)
+
+        assert index.range(3, 7) == ["hand axe", "axe"]
+        assert index.range(4, 13) == ["axe", "double axe"]
+        assert index.range(8, 12) == []
+        assert index.range(13, 3) == []
+
+    def test_open_bounds(self) -> None:
+        """
+        Verifies that a missing bound does not limit the range.
+        """
+        index = Diablo2TxtRangeIndex.build(ROWS, LEVELS)
+
+        assert index.range(high=7) == ["hand axe", "axe"]
+        assert index.range(low=7) == ["axe", "double axe"]
+        assert index.range() == ["hand axe", "axe", "double axe"]
+
+    def test_rows_without_value_are_not_indexed(self) -> None:
+        """
+        Verifies that rows with no value are left out of the index.
+        """
+        index = Diablo2TxtRangeIndex.build(ROWS, LEVELS)
+
+        assert len(index) == 3
+        assert index.count() == 3
+        assert index.count(4, 100) == 2
+
+    def test_top_and_bottom(self) -> None:
+        """
+        Verifies that top-k and bottom-k queries return the rows with the
+        largest and smallest values.
+        """
+        index = Diablo2TxtRangeIndex.build(ROWS, LEVELS)
+
+        assert index.top(2) == ["double axe", "axe"]
+        assert index.bottom(2) == ["hand axe", "axe"]
+        assert index.top(10) == ["double axe", "axe", "hand axe"]
+        assert index.top(0) == []
+        assert index.bottom(0) == []
+
+    def test_equal_values_keep_row_order(self) -> None:
+        """
+        Verifies that rows with equal values are returned in row order.
+        """
+        index = Diablo2TxtRangeIndex.build(ROWS, [5, 1, 5, 5])
+
+        assert index.range(5, 5) == ["hand axe", "wand", "double axe"]
+        assert list(index.ordinal_range(5, 5)) == [0, 2, 3]
+        assert index.top(2) == ["hand axe", "wand"]
+        assert index.bottom(2) == ["axe", "hand axe"]
+        assert list(index.descending_ordinals()) == [0, 2, 3, 1]
+        assert list(index.descending_ordinals(high=4)) == [1]
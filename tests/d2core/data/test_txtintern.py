@@ -0,0 +1,139 @@
+"""
+``tests.d2core.data.test_txtintern``
+====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtintern`.
+"""
+
+from io import StringIO
+from pathlib import Path
+import pickle
+import sys
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser
+from d2lfg.d2core.data.txtintern import Diablo2TxtStringPool
+
+
+def fresh(s: str) -> str:
+    """
+    Returns a new string object equal to ``s``.
+    """
+    return "".join(list(s))
+
+
+class TestDiablo2TxtStringPool:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtintern.Diablo2TxtStringPool`.
+    """
+
+    def test_equal_strings_share_an_object(self) -> None:
+        """
+        Verifies that interning equal strings returns the same object.
+        """
+        pool = Diablo2TxtStringPool()
+        first = pool.intern(fresh("axe"))
+        second, third = pool.intern_all([fresh("axe"), fresh("wand")])
+
+        assert second is first
+        assert third == "wand"
+        assert len(pool) == 2
+
+    def test_stats(self) -> None:
+        """
+        Verifies that a pool tracking savings reports the memory its
+        repeated strings would otherwise have used, and one that does not
+        only counts lookups.
+        """
+        untracked = Diablo2TxtStringPool()
+        untracked.intern_all([fresh("axe"), fresh("axe")])
+        assert untracked.stats() == (1, 2, 0)
+
+        pool = Diablo2TxtStringPool(track_savings=True)
+        pool.intern_all([fresh("axe"), fresh("axe"), fresh("axe"), "", "", "1"])
+
+        stats = pool.stats()
+
+        assert stats.strings == 3
+        assert stats.lookups == 6
+        assert stats.bytes_saved == 2 * sys.getsizeof("axe")
+
+    def test_clear(self) -> None:
+        """
+        Verifies that clearing the pool empties it and resets its stats.
+        """
+        pool = Diablo2TxtStringPool()
+        pool.intern_all(["axe", "axe"])
+        pool.clear()
+
+        assert len(pool) == 0
+        assert pool.stats() == (0, 0, 0)
+
+    def test_pickled_empty(self) -> None:
+        """
+        Verifies that a pool is pickled without its strings.
+        """
+        pool = Diablo2TxtStringPool()
+        pool.intern("axe")
+
+        copy = pickle.loads(pickle.dumps(pool))
+
+        assert len(copy) == 0
+        assert copy.intern("axe") == "axe"
+
+
+class TestStringPoolParsing:
+    """
+    Tests parsing with a
+    :py:class:`~d2lfg.d2core.data.txtintern.Diablo2TxtStringPool`.
+    """
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_pool_shared_across_files(
+        self, weapons_txt_snippet_path: Path, use_mmap: bool
+    ) -> None:
+        """
+        Verifies that values from different files and parsers share
+        objects through a common pool, and that parsing is unchanged.
+        """
+        pool = Diablo2TxtStringPool(track_savings=True)
+        plain = Diablo2TxtParser().parse(weapons_txt_snippet_path)
+        pooled = Diablo2TxtParser(use_mmap=use_mmap, string_pool=pool)
+        first = pooled.parse(weapons_txt_snippet_path)
+        second = Diablo2TxtParser(string_pool=pool).parse(weapons_txt_snippet_path)
+
+        assert list(first.records) == list(plain.records)
+        assert first.records[0]["type"] is second.records[1]["type"]
+        assert first.records[0]["type"] is first.records[1]["type"]
+        assert pool.stats().bytes_saved > 0
+
+    def test_projected_columns_are_interned(self) -> None:
+        """
+        Verifies that only kept columns pass through the pool.
+        """
+        pool = Diablo2TxtStringPool()
+        parser = Diablo2TxtParser(columns=["type"], string_pool=pool)
+
+        parser.parse(StringIO("code\ttype\r\nhax\taxe\r\naxe\taxe\r\n"))
+
+        assert pool.stats().strings == 1
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_skipped_rows_are_not_interned(
+        self, tmp_path: Path, use_mmap: bool
+    ) -> None:
+        """
+        Verifies that the values of comment and incomplete rows are not
+        added to the pool.
+        """
+        path = tmp_path / "Weapons.txt"
+        path.write_text(
+            "name\tcode\ttype\r\nExpansion\t\t\r\nBroken\tbrk\r\nAxe\taxe\taxe\r\n"
+        )
+        pool = Diablo2TxtStringPool()
+
+        Diablo2TxtParser(use_mmap=use_mmap, string_pool=pool).parse(path)
+
+        assert len(pool) == 2
+        assert pool.stats().lookups == 3
@@ -0,0 +1,232 @@
+"""
+``tests.d2core.data.test_txtjoin``
+==================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtjoin`.
+"""
+
+from io import StringIO
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtjoin import Diablo2TxtJoinType, join
+from d2lfg.error import DataLookupError
+from tests.testhelper.txtgen import write_txt_tables
+
+ITEMS_TXT = (
+    "name\tcode\ttype\r\n"
+    "Hand Axe\thax\taxe\r\n"
+    "Short Bow\tsbw\tbow\r\n"
+    "Wand\twnd\twand\r\n"
+    "Stone\tstn\t\r\n"
+)
+
+TYPES_TXT = (
+    "ItemType\tCode\tEquiv1\r\n"
+    "Weapon\tweap\t\r\n"
+    "Axe\taxe\tweap\r\n"
+    "Bow\tbow\tweap\r\n"
+    "Axe Again\taxe\tweap\r\n"
+)
+
+#: A joined row, as the codes of its rows.
+_Pair = Tuple[str, Optional[str]]
+
+
+@pytest.fixture
+def items(txt_parser: Diablo2TxtParser) -> Diablo2TxtFile:
+    """
+    A small item table.
+    """
+    return txt_parser.parse(StringIO(ITEMS_TXT))
+
+
+@pytest.fixture
+def item_types(txt_parser: Diablo2TxtParser) -> Diablo2TxtFile:
+    """
+    A small item type table, with a duplicated code.
+    """
+    return txt_parser.parse(StringIO(TYPES_TXT))
+
+
+def _nested_loop(
+    left: Diablo2TxtFile,
+    right: Diablo2TxtFile,
+    left_on: str,
+    right_on: str,
+    left_key: str,
+    right_key: str,
+    keep_unmatched: bool,
+) -> List[_Pair]:
+    """
+    Joins two tables the slow way, returning the keys of the joined rows.
+    """
+    pairs: List[_Pair] = list()
+    for lr in left.records:
+        matches = [
+            rr[right_key]
+            for rr in right.records
+            if lr[left_on] and lr[left_on] == rr[right_on]
+        ]
+        if matches:
+            pairs.extend((lr[left_key], m) for m in matches)
+        elif keep_unmatched:
+            pairs.append((lr[left_key], None))
+    return pairs
+
+
+class TestDiablo2TxtJoin:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtjoin.Diablo2TxtJoin`.
+    """
+
+    def test_inner_join(
+        self, items: Diablo2TxtFile, item_types: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that an inner join pairs each left row with every matching
+        right row, and drops left rows without a match.
+        """
+        rows = [
+            (r.left["code"], r.right["ItemType"])
+            for r in join(items, item_types, "type", "code")
+            if r.right is not None
+        ]
+        assert rows == [("hax", "Axe"), ("hax", "Axe Again"), ("sbw", "Bow")]
+
+    def test_left_join(self, items: Diablo2TxtFile, item_types: Diablo2TxtFile) -> None:
+        """
+        Verifies that a left join keeps left rows without a match, and that
+        empty keys do not match.
+        """
+        j = join(items, item_types, "type", "code", Diablo2TxtJoinType.LEFT)
+        assert [r.field("itemtype") for r in j] == ["Axe", "Axe Again", "Bow", "", ""]
+        assert [r.left["code"] for r in j if r.right is None] == ["wnd", "stn"]
+
+    def test_self_join(self, item_types: Diablo2TxtFile) -> None:
+        """
+        Verifies that a table can be joined with itself.
+        """
+        j = join(item_types, item_types, "Equiv1", "Code")
+        assert [(a["code"], b["itemtype"]) for a, b in j if b is not None] == [
+            ("axe", "Weapon"),
+            ("bow", "Weapon"),
+            ("axe", "Weapon"),
+        ]
+
+    def test_reuses_existing_index(
+        self, items: Diablo2TxtFile, item_types: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that an index that has already been built is used as the
+        hash table, on either side, without changing the result.
+        """
+        expected = [
+            (a["code"], b["code"] if b else None)
+            for a, b in join(items, item_types, "type", "code", build_indexes=False)
+        ]
+        assert items.cached_index("type") is None
+        assert item_types.cached_index("code") is None
+
+        items.index("type")
+        j = join(items, item_types, "type", "code")
+        assert j.explain()[0].startswith("existing hash index on left 'type'")
+        assert [(a["code"], b["code"] if b else None) for a, b in j] == expected
+
+        item_types.index("code")
+        assert j.explain()[0].startswith("existing hash index on right 'code'")
+        assert [(a["code"], b["code"] if b else None) for a, b in j] == expected
+
+    def test_indexes_smaller_side(
+        self, items: Diablo2TxtFile, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that without existing indexes, the smaller table is
+        indexed, and the index is kept only if indexes may be built.
+        """
+        small = txt_parser.parse(StringIO("Code\tName\r\naxe\tAxes\r\n"))
+        j = join(items, small, "type", "code", build_indexes=False)
+        assert j.explain()[0].startswith("temporary hash index on right 'code'")
+        assert small.cached_index("code") is None
+
+        j = join(small, items, "code", "type")
+        assert j.explain()[0].startswith("new hash index on left 'code'")
+        assert [b["code"] for _, b in j if b is not None] == ["hax"]
+        assert small.cached_index("code") is not None
+
+    def test_explain_builds_nothing(
+        self, items: Diablo2TxtFile, item_types: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that explaining a join does not build a hash table.
+        """
+        for build_indexes in (True, False):
+            j = join(items, item_types, "type", "code", build_indexes=build_indexes)
+            j.explain()
+            assert items.cached_index("type") is None
+            assert item_types.cached_index("code") is None
+
+    def test_field_of_short_row(self) -> None:
+        """
+        Verifies that a field of a row that ends before the column is
+        empty.
+        """
+        parser = Diablo2TxtParser(None)
+        left = parser.parse(StringIO("name\ttype\tlevel\r\nHand Axe\taxe\r\n"))
+        right = parser.parse(StringIO("code\tname\textra\r\naxe\tAxes\r\n"))
+        (row,) = join(left, right, "type", "code")
+        assert row.field("level") == ""
+        assert row.field("extra") == ""
+        assert row.field("name") == "Hand Axe"
+
+    def test_missing_column_raises(
+        self, items: Diablo2TxtFile, item_types: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that joining on a column that does not exist raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        with pytest.raises(DataLookupError):
+            join(items, item_types, "quality", "code").count()
+        with pytest.raises(DataLookupError):
+            join(items, item_types, "type").count()
+
+
+class TestJoinGeneratedTables:
+    """
+    Tests joins of generated tables against nested loops.
+    """
+
+    @pytest.mark.parametrize("join_type", list(Diablo2TxtJoinType))
+    @pytest.mark.parametrize("index_left", [False, True])
+    def test_matches_nested_loop(
+        self,
+        tmp_path: Path,
+        txt_parser: Diablo2TxtParser,
+        join_type: Diablo2TxtJoinType,
+        index_left: bool,
+    ) -> None:
+        """
+        Verifies that joining weapons to their item types, and item types
+        to their parents, matches a nested loop, whichever side is indexed.
+        """
+        tables = write_txt_tables(tmp_path, tables=("Weapons", "ItemTypes"))
+        weapons = txt_parser.parse(tables["Weapons"].path)
+        item_types = txt_parser.parse(tables["ItemTypes"].path)
+        keep_unmatched = join_type is Diablo2TxtJoinType.LEFT
+        if index_left:
+            weapons.index("type")
+            item_types.index("equiv1")
+
+        j = join(weapons, item_types, "type", "code", join_type)
+        assert [(a["code"], b["code"] if b else None) for a, b in j] == _nested_loop(
+            weapons, item_types, "type", "code", "code", "code", keep_unmatched
+        )
+
+        j = join(item_types, item_types, "equiv1", "code", join_type)
+        assert [(a["code"], b["code"] if b else None) for a, b in j] == _nested_loop(
+            item_types, item_types, "equiv1", "code", "code", "code", keep_unmatched
+        )
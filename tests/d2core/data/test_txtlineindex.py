@@ -0,0 +1,158 @@
+"""
+``tests.d2core.data.test_txtlineindex``
+=======================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtlineindex`.
+"""
+
+import marshal
+import os
+from pathlib import Path
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser
+from d2lfg.d2core.data.txtlineindex import Diablo2TxtLineIndex, index_path_for
+from tests.testhelper.txtgen import write_txt_table
+
+
+@pytest.fixture
+def weapons_path(tmp_path: Path) -> Path:
+    """
+    Writes a generated ``Weapons.txt``, with comment and incomplete rows.
+    """
+    return write_txt_table(tmp_path, "Weapons").path
+
+
+class TestDiablo2TxtLineIndex:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtlineindex.Diablo2TxtLineIndex`.
+    """
+
+    def test_rows_match_parse(
+        self, weapons_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that indexed rows are numbered like the records of a full
+        parse, skipping the same rows.
+        """
+        txt_file = txt_parser.parse(weapons_path)
+        index = Diablo2TxtLineIndex.build(weapons_path)
+        assert len(index) == len(txt_file.records)
+        assert index.header == txt_file.header
+        assert index.newline == txt_file.newline
+        assert index.fields == txt_file.fields
+        ordinals = [0, 17, len(index) - 1]
+        assert index.records(ordinals) == [txt_file.records[i] for i in ordinals]
+
+    def test_snippet(
+        self, weapons_txt_snippet_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that every row of a real file can be read by number.
+        """
+        txt_file = txt_parser.parse(weapons_txt_snippet_path)
+        index = Diablo2TxtLineIndex.build(weapons_txt_snippet_path)
+        assert index.records(range(len(index))) == list(txt_file.records)
+
+    def test_lookup_by_key(
+        self, weapons_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that rows can be read by the value of a key column.
+        """
+        txt_file = txt_parser.parse(weapons_path)
+        index = Diablo2TxtLineIndex.build(weapons_path, ["Code", "type"])
+        record = txt_file.records[42]
+        assert index.lookup("code", record["code"]) == [record]
+        assert index.lookup("TYPE", record["type"]) == txt_file.index("type").lookup(
+            record["type"]
+        )
+        assert index.lookup("code", "no such code") == []
+        with pytest.raises(KeyError):
+            index.lookup("name", record["name"])
+
+    def test_out_of_range_raises(self, weapons_path: Path) -> None:
+        """
+        Verifies that reading a row that does not exist raises
+        :py:class:`IndexError`.
+        """
+        index = Diablo2TxtLineIndex.build(weapons_path)
+        with pytest.raises(IndexError):
+            index.record(len(index))
+
+    def test_save_and_load(self, weapons_path: Path) -> None:
+        """
+        Verifies that a saved index is loaded next to its file.
+        """
+        built = Diablo2TxtLineIndex.build(weapons_path, ["code"])
+        built.save()
+        assert index_path_for(weapons_path).name == "Weapons.txt.lineidx"
+
+        loaded = Diablo2TxtLineIndex.load(weapons_path)
+        assert loaded is not None
+        assert list(loaded.offsets) == list(built.offsets)
+        assert loaded.header == built.header
+        assert loaded.keys == built.keys
+        assert loaded.record(5) == built.record(5)
+
+    def test_stale_index_is_not_loaded(self, weapons_path: Path) -> None:
+        """
+        Verifies that an index is not loaded once its file changes.
+        """
+        Diablo2TxtLineIndex.build(weapons_path).save()
+        with open(weapons_path, "ab") as f:
+            f.write(b"Extra\textr\r\n")
+        assert Diablo2TxtLineIndex.load(weapons_path) is None
+
+    def test_missing_or_corrupt_index_is_not_loaded(self, weapons_path: Path) -> None:
+        """
+        Verifies that a missing or unreadable index is not loaded.
+        """
+        assert Diablo2TxtLineIndex.load(weapons_path) is None
+        index_path_for(weapons_path).write_bytes(b"not an index")
+        assert Diablo2TxtLineIndex.load(weapons_path) is None
+
+    @pytest.mark.parametrize("offsets", [b"\x00" * 3, "not bytes"])
+    def test_index_with_bad_contents_is_not_loaded(
+        self, weapons_path: Path, offsets: object
+    ) -> None:
+        """
+        Verifies that a saved index that unmarshals, but whose contents are
+        wrong, is not loaded.
+        """
+        Diablo2TxtLineIndex.build(weapons_path).save()
+        path = index_path_for(weapons_path)
+        state = list(marshal.loads(path.read_bytes()))
+        state[6] = offsets
+        path.write_bytes(marshal.dumps(tuple(state)))
+        assert Diablo2TxtLineIndex.load(weapons_path) is None
+
+        path.write_bytes(marshal.dumps(tuple(state[:3])))
+        assert Diablo2TxtLineIndex.load(weapons_path) is None
+
+    def test_open_builds_once(self, weapons_path: Path) -> None:
+        """
+        Verifies that opening an index saves it, reuses it while it has the
+        requested key columns, and rebuilds it otherwise.
+        """
+        index_path = index_path_for(weapons_path)
+        first = Diablo2TxtLineIndex.open(weapons_path, ["code"])
+        assert index_path.exists()
+        saved = os.stat(index_path).st_mtime_ns
+
+        again = Diablo2TxtLineIndex.open(weapons_path, ["Code"])
+        assert os.stat(index_path).st_mtime_ns == saved
+        assert list(again.offsets) == list(first.offsets)
+
+        with_type = Diablo2TxtLineIndex.open(weapons_path, ["type"])
+        assert "type" in with_type.keys
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """
+        Verifies that an empty file has no header and no rows.
+        """
+        path = tmp_path / "Empty.txt"
+        path.write_bytes(b"")
+        index = Diablo2TxtLineIndex.build(path)
+        assert (len(index), list(index.header)) == (0, [])
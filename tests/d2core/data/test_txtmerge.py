@@ -0,0 +1,127 @@
+"""
+``tests.d2core.data.test_txtmerge``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtmerge`.
+"""
+
+from io import StringIO
+from typing import Dict
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtmerge import (
+    Diablo2MergedRowData,
+    Diablo2MergedTxtFile,
+    merge_item_tables,
+)
+from d2lfg.error import DataLookupError
+
+
+@pytest.fixture
+def item_tables(txt_parser: Diablo2TxtParser) -> Dict[str, Diablo2TxtFile]:
+    """
+    Small ``Weapons``, ``Armor`` and ``Misc`` tables with partly shared
+    columns.
+    """
+    return {
+        "weapons": txt_parser.parse(
+            StringIO("name\tcode\tmindam\r\nAxe\taxe\t4\r\nWand\twnd\t2\r\n")
+        ),
+        "Armor": txt_parser.parse(StringIO("name\tcode\tminac\r\nCap\tcap\t3\r\n")),
+        "Misc": txt_parser.parse(StringIO("name\tcode\r\nRing\trin\r\n")),
+    }
+
+
+class TestDiablo2MergedTxtFile:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtmerge.Diablo2MergedTxtFile`.
+    """
+
+    def test_union_of_columns(self, item_tables: Dict[str, Diablo2TxtFile]) -> None:
+        """
+        Verifies that the merged file has every column, in order of first
+        appearance.
+        """
+        merged = merge_item_tables(item_tables)
+
+        assert list(merged.fields) == ["name", "code", "mindam", "minac"]
+
+    def test_rows_are_numbered_across_parts(
+        self, item_tables: Dict[str, Diablo2TxtFile]
+    ) -> None:
+        """
+        Verifies that rows are numbered in the order the game reads the
+        item tables.
+        """
+        merged = merge_item_tables(item_tables)
+
+        assert merged.column("code") == ["axe", "wnd", "cap", "rin"]
+        assert [r["code"] for r in merged.records] == ["axe", "wnd", "cap", "rin"]
+        assert merged.locate(2) == (1, 0)
+        assert merged.ordinal(2, 0) == 3
+
+    def test_missing_columns_are_empty(
+        self, item_tables: Dict[str, Diablo2TxtFile]
+    ) -> None:
+        """
+        Verifies that a row reads columns its own table lacks as empty.
+        """
+        merged = merge_item_tables(item_tables)
+
+        assert merged.column("minac") == ["", "", "3", ""]
+        assert list(merged.records[2].data) == ["Cap", "cap", "", "3"]
+        assert merged.records[-1]["mindam"] == ""
+
+    def test_rows_are_not_copied(self, item_tables: Dict[str, Diablo2TxtFile]) -> None:
+        """
+        Verifies that merged records read the data of the original rows.
+        """
+        merged = merge_item_tables(item_tables)
+        armor = item_tables["Armor"].records[0]
+
+        data = merged.records[2].data
+        assert isinstance(data, Diablo2MergedRowData)
+        assert data.data is armor.data
+
+    def test_indexes_span_all_parts(
+        self, item_tables: Dict[str, Diablo2TxtFile]
+    ) -> None:
+        """
+        Verifies that indexes over the merged file find rows from any part.
+        """
+        merged = merge_item_tables(item_tables)
+
+        assert merged.index("code", unique=True)["rin"]["name"] == "Ring"
+        assert merged.range_index("mindam", None).top(1)[0]["code"] == "axe"
+
+    def test_invalidate_recounts_rows(
+        self, item_tables: Dict[str, Diablo2TxtFile]
+    ) -> None:
+        """
+        Verifies that invalidating the merged file picks up new part
+        records.
+        """
+        merged = Diablo2MergedTxtFile([item_tables["Misc"], item_tables["Armor"]])
+        item_tables["Misc"].records = []
+        merged.invalidate()
+
+        assert len(merged.records) == 1
+        assert merged.records[0]["code"] == "cap"
+
+
+class TestMergeItemTables:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtmerge.merge_item_tables`.
+    """
+
+    def test_missing_table_raises(self, item_tables: Dict[str, Diablo2TxtFile]) -> None:
+        """
+        Verifies that a missing item table raises a
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        del item_tables["Misc"]
+
+        with pytest.raises(DataLookupError):
+            merge_item_tables(item_tables)
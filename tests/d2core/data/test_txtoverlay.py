@@ -0,0 +1,227 @@
+"""
+``tests.d2core.data.test_txtoverlay``
+=====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtoverlay`.
+"""
+
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from random import Random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtoverlay import Diablo2OverlayTxtFile
+from d2lfg.error import DataLookupError, DuplicateKeyError
+from tests.testhelper.txtgen import write_txt_table
+
+BASE_TXT = "".join(
+    [
+        "name\tcode\tlevel\r\n",
+        "Hand Axe\thax\t3\r\n",
+        "Axe\taxe\t7\r\n",
+        "Wand\twnd\t2\r\n",
+    ]
+)
+
+
+@pytest.fixture
+def base(txt_parser: Diablo2TxtParser) -> Diablo2TxtFile:
+    """
+    A small base table.
+    """
+    return txt_parser.parse(StringIO(BASE_TXT))
+
+
+def _rows(txt_file: Diablo2TxtFile) -> List[Tuple[str, ...]]:
+    """
+    Returns the data of each record of a file.
+    """
+    return [tuple(r.data) for r in txt_file.records]
+
+
+class TestDiablo2OverlayTxtFile:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtoverlay.Diablo2OverlayTxtFile`.
+    """
+
+    def test_unchanged_rows_are_base_records(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that a new overlay reads the base's own records.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        assert overlay.header == base.header
+        assert all(o is b for o, b in zip(overlay.records, base.records))
+
+    def test_set_copies_on_write(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that setting a field changes the overlay but not the base.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        overlay.set(1, "Level", "9")
+        assert overlay.records[1]["level"] == "9"
+        assert base.records[1]["level"] == "7"
+        assert overlay.changed_rows == 1
+
+        overlay.set(1, "level", "7")
+        assert overlay.changed_rows == 0
+        assert overlay.records[1] is base.records[1]
+
+    def test_set_invalidates_indexes(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that indexes built on an overlay see later changes.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        assert overlay.index("code", unique=True).get("axe") is not None
+        overlay.set(1, "code", "axx")
+        assert overlay.index("code", unique=True).get("axe") is None
+        assert overlay.index("code", unique=True)["axx"]["name"] == "Axe"
+
+    def test_revert(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that reverting a row discards its changes.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        overlay.set(0, "name", "Small Axe")
+        overlay.revert(0)
+        assert _rows(overlay) == _rows(base)
+
+    def test_append_and_delete(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that rows can be added and removed.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        assert overlay.append({"Code": "9ha", "name": "Hatchet"}) == 3
+        overlay.set(3, "level", "31")
+        overlay.delete(0)
+        assert _rows(overlay) == [
+            ("Axe", "axe", "7"),
+            ("Wand", "wnd", "2"),
+            ("Hatchet", "9ha", "31"),
+        ]
+        assert len(base.records) == 3
+
+    def test_add_column(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that added columns are empty in base rows.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        overlay.add_column("Sockets")
+        overlay.set(2, "sockets", "2")
+        assert overlay.header == ["name", "code", "level", "Sockets"]
+        assert overlay.column("sockets") == ["", "", "2"]
+        assert base.header == ["name", "code", "level"]
+        with pytest.raises(ValueError):
+            overlay.add_column("sockets")
+
+    def test_missing_column_raises(self, base: Diablo2TxtFile) -> None:
+        """
+        Verifies that setting a column that does not exist raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        overlay = Diablo2OverlayTxtFile(base)
+        with pytest.raises(DataLookupError):
+            overlay.set(0, "sockets", "1")
+
+    def test_from_variant(
+        self, base: Diablo2TxtFile, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that an overlay built from a variant has the variant's
+        content, with new columns and rows at the end.
+        """
+        variant = txt_parser.parse(
+            StringIO(
+                "name\tcode\tsockets\tlevel\r\n"
+                "Hand Axe\thax\t\t4\r\n"
+                "Wand\twnd\t1\t2\r\n"
+                "Hatchet\t9ha\t2\t31\r\n"
+            )
+        )
+        overlay = Diablo2OverlayTxtFile.from_variant(base, variant, "code")
+        assert overlay.header == ["name", "code", "level", "sockets"]
+        assert _rows(overlay) == [
+            ("Hand Axe", "hax", "4", ""),
+            ("Wand", "wnd", "2", "1"),
+            ("Hatchet", "9ha", "31", "2"),
+        ]
+        assert (overlay.changed_rows, overlay.appended_rows) == (2, 1)
+
+    def test_from_variant_with_duplicate_keys(
+        self, base: Diablo2TxtFile, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that an overlay cannot be built from a variant if either
+        file has a key more than once.
+        """
+        variant = txt_parser.parse(
+            StringIO("name\tcode\tlevel\r\nAxe\tc\t4\r\nAxe\tc\t5\r\n")
+        )
+        with pytest.raises(DuplicateKeyError):
+            Diablo2OverlayTxtFile.from_variant(base, variant, "code")
+        with pytest.raises(DuplicateKeyError):
+            Diablo2OverlayTxtFile.from_variant(variant, base, "code")
+
+
+class TestOverlayVariants:
+    """
+    Tests overlays of a larger generated table.
+    """
+
+    @pytest.fixture
+    def variants(
+        self, tmp_path: Path, txt_parser: Diablo2TxtParser
+    ) -> Tuple[Path, Dict[Path, Dict[str, Tuple[str, ...]]]]:
+        """
+        Writes a generated ``Weapons.txt`` and ten variants of it, each with
+        a few changed cells, one removed row and one added row. Returns the
+        path of the base, and the expected rows of each variant by code.
+        """
+        path = write_txt_table(tmp_path, "Weapons").path
+        base = txt_parser.parse(path)
+        rng = Random(0)
+        variants: Dict[Path, Dict[str, Tuple[str, ...]]] = dict()
+        for v in range(10):
+            rows = [list(r.data) for r in base.records]
+            for _ in range(20):
+                rows[rng.randrange(len(rows))][rng.randrange(10, 40)] = "99"
+            del rows[rng.randrange(len(rows))]
+            rows.append(rows[0][:3] + [f"new{v}"] + rows[0][4:])
+            variant_path = tmp_path / f"Weapons{v}.txt"
+            lines = [base.header] + rows
+            text = "".join("\t".join(r) + "\r\n" for r in lines)
+            variant_path.write_bytes(text.encode())
+            variants[variant_path] = {r[3]: tuple(r) for r in rows}
+        return path, variants
+
+    def test_variants_share_base(
+        self,
+        variants: Tuple[Path, Dict[Path, Dict[str, Tuple[str, ...]]]],
+        txt_parser: Diablo2TxtParser,
+    ) -> None:
+        """
+        Verifies that overlays reproduce their variants, and ten of them
+        take less memory than the base table.
+        """
+        path, expected = variants
+        tracemalloc.start()
+        try:
+            base = txt_parser.parse(path)
+            base_bytes, _ = tracemalloc.get_traced_memory()
+            overlays: List[Diablo2OverlayTxtFile] = list()
+            for variant_path in expected:
+                variant = txt_parser.parse(variant_path)
+                overlays.append(
+                    Diablo2OverlayTxtFile.from_variant(base, variant, "code")
+                )
+                del variant
+            total_bytes, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert total_bytes - base_bytes < base_bytes
+        for overlay, rows in zip(overlays, expected.values()):
+            assert {r["code"]: tuple(r.data) for r in overlay.records} == rows
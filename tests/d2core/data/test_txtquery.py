@@ -0,0 +1,287 @@
+"""
+``tests.d2core.data.test_txtquery``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtquery`.
+"""
+
+from io import StringIO
+from pathlib import Path
+from typing import Iterable, List
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtcolumntypes import Diablo2TxtColumnType
+from d2lfg.d2core.data.txtfilter import (
+    Diablo2TxtColumnEquals,
+    Diablo2TxtColumnIn,
+    Diablo2TxtColumnRange,
+    Diablo2TxtNotCommentRow,
+    Diablo2TxtRowFilter,
+)
+from d2lfg.d2core.data.txtquery import query
+from d2lfg.error import DataLookupError
+from tests.testhelper.txtgen import write_txt_tables
+
+ITEMS_TXT = (
+    "name\tcode\ttype\tlevel\tgemsockets\r\n"
+    "Hand Axe\thax\taxe\t3\t2\r\n"
+    "Axe\taxe\taxe\t7\t4\r\n"
+    "Short Bow\tsbw\tbow\t1\t\r\n"
+    "Long Bow\tlbw\tbow\t7\t5\r\n"
+    "Wand\twnd\twand\t2\t1\r\n"
+)
+
+
+@pytest.fixture
+def items(txt_parser: Diablo2TxtParser) -> Diablo2TxtFile:
+    """
+    A small item table.
+    """
+    return txt_parser.parse(StringIO(ITEMS_TXT))
+
+
+def _as_int(v: str) -> int:
+    """
+    Converts a field to an integer, the way queries do.
+    """
+    return int(v) if v.strip() else 0
+
+
+class TestDiablo2TxtQuery:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtquery.Diablo2TxtQuery`.
+    """
+
+    def test_no_conditions_scans(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that a query without conditions returns every row.
+        """
+        q = query(items)
+        assert list(q) == list(items.records)
+        assert q.explain().steps == ("scan 5 rows",)
+
+    def test_range_uses_range_index(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that a range condition is answered by a range index and
+        rows come back in row order.
+        """
+        q = query(items).where(Diablo2TxtColumnRange("gemsockets", low=4))
+        assert list(q.select("code")) == [("axe",), ("lbw",)]
+        plan = q.explain()
+        assert plan.steps[0].startswith("range index on 'gemsockets'")
+        assert plan.candidates == 2
+
+    def test_empty_fields_are_zero(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that range conditions treat empty fields as ``0``, as
+        :py:class:`~d2lfg.d2core.data.txtfilter.Diablo2TxtColumnRange` does.
+        """
+        q = query(items).where(Diablo2TxtColumnRange("gemsockets", high=1))
+        assert list(q.select("code")) == [("sbw",), ("wnd",)]
+
+    def test_most_selective_index_drives(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that the condition matching the fewest rows is answered
+        by an index, and the others are filters.
+        """
+        q = query(items).where(Diablo2TxtColumnRange("level", low=2), type="bow")
+        assert list(q.select("code")) == [("lbw",)]
+        steps = q.explain().steps
+        assert steps[0].startswith("hash index on 'type'")
+        assert steps[1].startswith("filter range('level'")
+
+    def test_in_keeps_row_order(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that rows found for several values come back in row
+        order.
+        """
+        q = query(items).where(Diablo2TxtColumnIn("type", ["wand", "axe"]))
+        assert list(q.select("code")) == [("hax",), ("axe",), ("wnd",)]
+
+    def test_without_building_indexes(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that only already built indexes are used if indexes may
+        not be built.
+        """
+        q = query(items, build_indexes=False).where(type="bow")
+        assert q.explain().steps[0] == "scan 5 rows"
+        items.index("type")
+        assert q.explain().steps[0].startswith("hash index on 'type'")
+        assert q.count() == 2
+
+    @pytest.mark.parametrize(
+        "conditions",
+        [
+            [Diablo2TxtColumnEquals("b", "")],
+            [Diablo2TxtColumnEquals("b", ""), Diablo2TxtColumnEquals("a", "y")],
+            [Diablo2TxtColumnIn("b", ["", "q"]), Diablo2TxtColumnRange("n", high=1)],
+            [Diablo2TxtColumnRange("n", high=0), Diablo2TxtColumnEquals("b", "")],
+            [Diablo2TxtColumnRange("n", low=1), Diablo2TxtColumnIn("a", ["x", "y"])],
+        ],
+    )
+    def test_index_matches_scan_for_short_rows(
+        self, conditions: List[Diablo2TxtRowFilter]
+    ) -> None:
+        """
+        Verifies that rows that end before a column match the same
+        conditions whether the conditions are answered by an index or
+        checked against each row.
+        """
+        parser = Diablo2TxtParser(None)
+        txt = "a\tb\tn\r\nx\t\t1\r\ny\r\nz\tq\t5\r\nw\t\t\r\n"
+        indexed = query(parser.parse(StringIO(txt))).where(*conditions)
+        scanned = query(parser.parse(StringIO(txt)), build_indexes=False).where(
+            *conditions
+        )
+
+        assert scanned.explain().steps[0] == "scan 4 rows"
+        for q in (indexed, indexed.where(*reversed(conditions))):
+            assert "index" in q.explain().steps[0]
+            assert list(q.select("a")) == list(scanned.select("a"))
+
+    def test_ignores_non_integer_range_index(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that a range index built with a type other than an integer
+        type is not used to answer range conditions.
+        """
+        items.range_index("gemsockets", Diablo2TxtColumnType.BOOL)
+        q = query(items).where(Diablo2TxtColumnRange("gemsockets", low=4))
+        assert list(q.select("code")) == [("axe",), ("lbw",)]
+
+    def test_function_and_line_conditions(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that functions of records and row filters that read whole
+        lines are applied as filters.
+        """
+        q = query(items).where(
+            lambda r: r["name"].endswith("Bow"), Diablo2TxtNotCommentRow()
+        )
+        assert list(q.select("code")) == [("sbw",), ("lbw",)]
+
+    def test_order_by(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that integer columns sort numerically and rows with equal
+        values keep their order in either direction.
+        """
+        q = query(items)
+        assert [c for (c,) in q.order_by("level").select("code")] == [
+            "sbw",
+            "wnd",
+            "hax",
+            "axe",
+            "lbw",
+        ]
+        assert [c for (c,) in q.order_by("level", True).select("code")] == [
+            "axe",
+            "lbw",
+            "hax",
+            "wnd",
+            "sbw",
+        ]
+        assert [c for (c,) in q.order_by("name").select("code")] == [
+            "axe",
+            "hax",
+            "lbw",
+            "sbw",
+            "wnd",
+        ]
+
+    def test_column_type_is_inferred_once(
+        self, items: Diablo2TxtFile, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Verifies that sorting and filtering by a text column do not try to
+        convert it to integers again on every query.
+        """
+        infer = Diablo2TxtColumnType.infer
+        calls: List[str] = list()
+
+        def counting_infer(values: Iterable[str]) -> Diablo2TxtColumnType:
+            calls.append("infer")
+            return infer(values)
+
+        monkeypatch.setattr(Diablo2TxtColumnType, "infer", counting_infer)
+        for _ in range(3):
+            assert query(items).order_by("name").count() == 5
+            assert (
+                query(items).where(Diablo2TxtColumnRange("name", high=0)).count() == 0
+            )
+        assert calls == ["infer"]
+
+    def test_top_k_walks_index(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that the first rows in order of an integer column are read
+        from its range index.
+        """
+        q = query(items).order_by("gemsockets", descending=True).limit(2)
+        assert list(q.select("code")) == [("lbw",), ("axe",)]
+        assert "already ordered by 'gemsockets' descending" in q.explain().steps
+
+    def test_limit(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that a limit caps the number of rows.
+        """
+        assert query(items).where(type="axe").limit(1).count() == 1
+        assert query(items).limit(0).count() == 0
+
+    def test_missing_column_raises(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that naming a column the table does not have raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        with pytest.raises(DataLookupError):
+            query(items).where(quality="high").count()
+        with pytest.raises(DataLookupError):
+            list(query(items).select("quality"))
+        with pytest.raises(DataLookupError):
+            query(items).order_by("quality").count()
+
+    def test_queries_are_immutable(self, items: Diablo2TxtFile) -> None:
+        """
+        Verifies that refining a query does not change it.
+        """
+        q = query(items)
+        q.where(type="axe").limit(1)
+        assert q.count() == 5
+
+
+class TestQuery:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtquery.query`.
+    """
+
+    def test_requires_a_table(self) -> None:
+        """
+        Verifies that a query needs at least one table.
+        """
+        with pytest.raises(ValueError):
+            query()
+
+    def test_sockets_across_item_tables(
+        self, tmp_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that querying several tables matches a scan of their rows.
+        """
+        tables = [
+            txt_parser.parse(t.path)
+            for t in write_txt_tables(tmp_path, tables=("Weapons", "Armor")).values()
+        ]
+        expected: List[str] = [
+            r["code"]
+            for t in tables
+            for r in t.records
+            if _as_int(r["gemsockets"]) >= 4
+        ]
+        q = query(*tables).where(Diablo2TxtColumnRange("gemsockets", low=4))
+        assert [c for (c,) in q.select("code")] == expected
+
+        top = q.order_by("level", descending=True).limit(10)
+        by_level = sorted(
+            (r for t in tables for r in t.records if _as_int(r["gemsockets"]) >= 4),
+            key=lambda r: _as_int(r["level"]),
+            reverse=True,
+        )
+        assert [c for (c,) in top.select("code")] == [r["code"] for r in by_level[:10]]
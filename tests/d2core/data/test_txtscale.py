@@ -0,0 +1,115 @@
+"""
+``tests.d2core.data.test_txtscale``
+===================================
+
+This module contains tests that parse generated tables at multiples of
+their vanilla size. See :py:mod:`tests.testhelper.txtgen`.
+"""
+
+from typing import Dict
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser
+from d2lfg.d2core.data.txtfilter import DEFAULT_ROW_FILTERS
+from tests.testhelper.txtgen import (
+    COLUMNS,
+    GeneratedTxtTable,
+    measure_parse,
+    SCALES,
+    TABLES,
+    write_txt_tables,
+)
+from tests.testhelper.typing import FixtureRequest
+
+# 100x tables take several seconds to generate, so they are left to
+# manual performance runs.
+TESTED_SCALES = [s for s in SCALES if s <= 10]
+
+
+@pytest.fixture(
+    scope="module", params=TESTED_SCALES, ids=[f"{s}x" for s in TESTED_SCALES]
+)
+def generated_tables(
+    request: FixtureRequest[int], tmp_path_factory: pytest.TempPathFactory
+) -> Dict[str, GeneratedTxtTable]:
+    """
+    Generated tables at each tested scale. They are shared by the tests
+    in this module, which must not modify them.
+    """
+    directory = tmp_path_factory.mktemp(f"txt{request.param}x")
+    return write_txt_tables(directory, request.param)
+
+
+class TestGeneratedTables:
+    """
+    Tests parsing tables generated by :py:mod:`tests.testhelper.txtgen`.
+    """
+
+    def test_headers_match_vanilla(
+        self, generated_tables: Dict[str, GeneratedTxtTable]
+    ) -> None:
+        """
+        Verifies that generated files have the vanilla headers.
+        """
+        parser = Diablo2TxtParser()
+        for table, generated in generated_tables.items():
+            assert parser.parse(generated.path).header == COLUMNS[table]
+
+    def test_skip_record_skips_generated_junk(
+        self, generated_tables: Dict[str, GeneratedTxtTable]
+    ) -> None:
+        """
+        Verifies that exactly the comment and incomplete rows are skipped,
+        both by ``skip_record`` and by the default row filters.
+        """
+        parsers = [
+            Diablo2TxtParser(),
+            Diablo2TxtParser(use_mmap=True),
+            Diablo2TxtParser(skip_record=None, filters=DEFAULT_ROW_FILTERS),
+        ]
+        assert set(generated_tables) == set(TABLES)
+        for generated in generated_tables.values():
+            assert generated.skipped > 0
+            for parser in parsers:
+                records = parser.parse(generated.path).records
+                assert len(records) == generated.rows - generated.skipped
+
+    def test_item_types_are_defined(
+        self, generated_tables: Dict[str, GeneratedTxtTable]
+    ) -> None:
+        """
+        Verifies that item ``type`` columns refer to generated item types.
+        """
+        parser = Diablo2TxtParser()
+        item_types = parser.parse(generated_tables["ItemTypes"].path)
+        codes = set(item_types.column("code"))
+        for table in ("Weapons", "Armor", "Misc"):
+            assert (
+                set(parser.parse(generated_tables[table].path).column("type")) <= codes
+            )
+
+    def test_item_codes_are_unique(
+        self, generated_tables: Dict[str, GeneratedTxtTable]
+    ) -> None:
+        """
+        Verifies that generated item codes can be uniquely indexed.
+        """
+        parser = Diablo2TxtParser()
+        for table in ("Weapons", "Armor", "Misc"):
+            txt_file = parser.parse(generated_tables[table].path)
+            assert len(txt_file.index("code", unique=True)) == len(txt_file.records)
+
+    def test_measure_parse(
+        self, generated_tables: Dict[str, GeneratedTxtTable]
+    ) -> None:
+        """
+        Verifies that parsing can be measured.
+        """
+        generated = generated_tables["Weapons"]
+
+        measurement = measure_parse(Diablo2TxtParser(), generated.path)
+
+        assert measurement.records == generated.rows - generated.skipped
+        assert measurement.peak_bytes > generated.path.stat().st_size
+        assert measurement.records_per_second > 0
@@ -0,0 +1,309 @@
+"""
+``tests.d2core.data.test_txtschema``
+====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtschema`.
+"""
+
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from d2lfg.d2core.d2types.bodyloc import Diablo2BodyLocs
+from d2lfg.d2core.d2types.item import Diablo2ItemType
+from d2lfg.d2core.d2types.playerclass import Diablo2PlayerClasses
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtParser
+from d2lfg.d2core.data.txtmerge import merge_item_tables
+from d2lfg.d2core.data.txtschema import (
+    DEFAULT_SCHEMAS,
+    ITEM_SCHEMA,
+    ITEM_TYPE_SCHEMA,
+    Diablo2TxtConversionContext,
+    Diablo2TxtFieldSpec,
+    Diablo2TxtFieldType,
+    Diablo2TxtSchema,
+    load_item_types,
+    load_items,
+)
+from d2lfg.error import DataConversionError, DataLookupError
+from tests.testhelper.txtgen import write_txt_tables
+
+ITEM_TYPES_TXT = (
+    "ItemType\tCode\tEquiv1\tEquiv2\tBody\tBodyLoc1\tBodyLoc2\tShoots\tQuiver\t"
+    "MaxSock1\tStaffMods\tClass\tStorePage\r\n"
+    # Refers to an item type later in the file.
+    "Axe\taxe\tmele\t\t1\trarm\tlarm\t\t\t4\t\t\tweap\r\n"
+    "Melee Weapon\tmele\tweap\t\t1\trarm\tlarm\t\t\t3\t\t\tweap\r\n"
+    "Weapon\tweap\t\t\t0\t\t\t\t\t\t\t\t\r\n"
+    "Amazon Bow\tabow\tweap\t\t1\trarm\tlarm\t\t\t3\tama\tama\tweap\r\n"
+)
+
+
+@pytest.fixture
+def item_types_txt_file(txt_parser: Diablo2TxtParser) -> Diablo2TxtFile:
+    """
+    A small ``ItemTypes.txt``.
+    """
+    return txt_parser.parse(StringIO(ITEM_TYPES_TXT))
+
+
+@pytest.fixture
+def item_types(item_types_txt_file: Diablo2TxtFile) -> Dict[str, Diablo2ItemType]:
+    """
+    The item types of :py:func:`item_types_txt_file`.
+    """
+    return load_item_types(item_types_txt_file)
+
+
+class TestDiablo2TxtSchema:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtschema.Diablo2TxtSchema`.
+    """
+
+    def test_every_attribute_needs_a_spec(self) -> None:
+        """
+        Verifies that a schema without a spec for an attribute of its
+        target is rejected.
+        """
+        specs = [s for s in ITEM_TYPE_SCHEMA.specs if s.attribute != "storepage"]
+        with pytest.raises(ValueError, match="storepage"):
+            Diablo2TxtSchema("ItemTypes", Diablo2ItemType, specs)
+
+    def test_converter_is_generated_once_per_header(
+        self, weapons_txt_file: Diablo2TxtFile, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that files with the same header share a generated
+        converter.
+        """
+        schema = Diablo2TxtSchema("Weapons", ITEM_SCHEMA.target, ITEM_SCHEMA.specs)
+        context = Diablo2TxtConversionContext(lambda code: ITEM_TYPE_STUB)
+        schema.converter(weapons_txt_file.fields, context)
+        schema.converter(dict(weapons_txt_file.fields), context)
+        assert len(schema._factories) == 1
+
+    def test_source_reads_fields_by_index(
+        self, item_types_txt_file: Diablo2TxtFile
+    ) -> None:
+        """
+        Verifies that generated code reads each field by index, and uses
+        constants for missing columns.
+        """
+        source = ITEM_TYPE_SCHEMA.source(item_types_txt_file.fields)
+        assert "data[0]," in source
+        assert "(int(data[4]) != 0 if data[4] else False)" in source
+        # Throwable is not in the file.
+        assert "        False,\n" in source
+
+    def test_missing_required_column_raises(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that a converter cannot be made for a file without a
+        required column.
+        """
+        txt_file = txt_parser.parse(StringIO("ItemType\tEquiv1\r\nAxe\t\r\n"))
+        with pytest.raises(DataLookupError, match="Code"):
+            ITEM_TYPE_SCHEMA.converter(txt_file.fields)
+
+    def test_converts_every_field_type(
+        self, item_types: Dict[str, Diablo2ItemType]
+    ) -> None:
+        """
+        Verifies that fields are converted according to their type.
+        """
+        bow = item_types["abow"]
+        assert bow.name == "Amazon Bow"
+        assert bow.equiv1 is item_types["weap"]
+        assert bow.equiv2 is None
+        assert bow.body is True
+        assert bow.bodyloc1 == Diablo2BodyLocs.RARM
+        assert bow.maxsock1 == 3
+        assert bow.maxsock25 == 0
+        assert bow.class_ == Diablo2PlayerClasses.AMAZON
+        assert bow.storepage == "weap"
+        assert item_types["weap"].storepage is None
+
+    def test_whitespace_fields_are_empty(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that fields containing only whitespace are treated as
+        empty.
+        """
+        txt_file = txt_parser.parse(
+            StringIO("ItemType\tCode\tMaxSock1\r\nWeapon\tweap\t \r\n")
+        )
+        (weapon,) = ITEM_TYPE_SCHEMA.convert(txt_file)
+        assert weapon.maxsock1 == 0
+
+    def test_invalid_field_names_column(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that the error for a field that cannot be converted names
+        the row and column.
+        """
+        txt_file = txt_parser.parse(
+            StringIO("ItemType\tCode\tMaxSock1\r\nWeapon\tweap\tmany\r\n")
+        )
+        with pytest.raises(DataConversionError, match="row 0, column 'MaxSock1'"):
+            ITEM_TYPE_SCHEMA.convert(txt_file)
+
+    def test_unknown_reference_names_column(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that a code that does not resolve raises
+        :py:class:`~d2lfg.error.DataLookupError` naming the row and column.
+        """
+        txt_file = txt_parser.parse(
+            StringIO("ItemType\tCode\tBodyLoc1\r\nWeapon\tweap\tarms\r\n")
+        )
+        with pytest.raises(DataLookupError, match="'BodyLoc1'.*arms"):
+            ITEM_TYPE_SCHEMA.convert(txt_file)
+
+    def test_custom_target(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that schemas work with dataclasses other than the
+        built-in models.
+        """
+        txt_file = txt_parser.parse(StringIO("Code\tLevel\r\nabc\t5\r\n"))
+        schema = Diablo2TxtSchema(
+            "Levels",
+            LevelStub,
+            [
+                Diablo2TxtFieldSpec("code", "Code", Diablo2TxtFieldType.STR),
+                Diablo2TxtFieldSpec("level", "Level", Diablo2TxtFieldType.INT),
+            ],
+        )
+        assert schema.convert(txt_file) == [LevelStub("abc", 5)]
+
+
+class TestDiablo2TxtSchemaRegistry:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtschema.Diablo2TxtSchemaRegistry`.
+    """
+
+    def test_item_tables_share_a_schema(self) -> None:
+        """
+        Verifies that the default registry has a schema for each item
+        table, looked up case insensitively.
+        """
+        assert DEFAULT_SCHEMAS.get("weapons") is ITEM_SCHEMA
+        assert DEFAULT_SCHEMAS.get("ARMOR") is ITEM_SCHEMA
+        assert DEFAULT_SCHEMAS.get("ItemTypes") is ITEM_TYPE_SCHEMA
+        assert "Misc" in DEFAULT_SCHEMAS
+
+    def test_missing_schema_raises(self) -> None:
+        """
+        Verifies that looking up a table without a schema raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        assert "Skills" not in DEFAULT_SCHEMAS
+        with pytest.raises(DataLookupError):
+            DEFAULT_SCHEMAS.get("Skills")
+
+
+class TestLoadItemTypes:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtschema.load_item_types`.
+    """
+
+    def test_forward_references(self, item_types: Dict[str, Diablo2ItemType]) -> None:
+        """
+        Verifies that item types may refer to item types later in the file.
+        """
+        assert [t.code for t in item_types["axe"].all_types()] == [
+            "axe",
+            "mele",
+            "weap",
+        ]
+
+    def test_unknown_item_type_raises(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that an item type that refers to one that does not exist
+        raises :py:class:`~d2lfg.error.DataLookupError` naming the row and
+        column.
+        """
+        txt_file = txt_parser.parse(StringIO("ItemType\tCode\tEquiv1\r\nA\ta\tzzz\r\n"))
+        with pytest.raises(DataLookupError, match="row 0, column 'Equiv1': zzz"):
+            load_item_types(txt_file)
+
+    def test_cycle_raises(self, txt_parser: Diablo2TxtParser) -> None:
+        """
+        Verifies that item types that refer to each other in a cycle are
+        reported.
+        """
+        txt_file = txt_parser.parse(
+            StringIO("ItemType\tCode\tEquiv1\r\nA\ta\tb\r\nB\tb\ta\r\n")
+        )
+        with pytest.raises(DataConversionError, match="a -> b -> a"):
+            load_item_types(txt_file)
+
+
+class TestLoadItems:
+    """
+    Tests :py:func:`~d2lfg.d2core.data.txtschema.load_items`.
+    """
+
+    def test_snippet(
+        self,
+        weapons_txt_file: Diablo2TxtFile,
+        txt_parser: Diablo2TxtParser,
+    ) -> None:
+        """
+        Verifies that a real ``Weapons.txt`` converts.
+        """
+        codes = set(weapons_txt_file.column("type"))
+        codes.update(c for c in weapons_txt_file.column("type2") if c)
+        item_types_txt = "ItemType\tCode\r\n" + "".join(
+            f"{c}\t{c}\r\n" for c in sorted(codes)
+        )
+        item_types = load_item_types(txt_parser.parse(StringIO(item_types_txt)))
+        items = load_items([weapons_txt_file], item_types)
+        axe = items["hax"]
+        assert axe.name == "Hand Axe"
+        assert axe.type.code == "axe"
+        assert axe.mindam == 3
+        assert axe.f2handed is None or axe.f2handed is False
+        assert len(items) == len(weapons_txt_file.records)
+
+    def test_unknown_item_type_raises(self, weapons_txt_file: Diablo2TxtFile) -> None:
+        """
+        Verifies that an item whose item type does not exist raises
+        :py:class:`~d2lfg.error.DataLookupError`.
+        """
+        with pytest.raises(DataLookupError, match="column 'type'"):
+            load_items([weapons_txt_file], {})
+
+    def test_generated_tables(
+        self, tmp_path: Path, txt_parser: Diablo2TxtParser
+    ) -> None:
+        """
+        Verifies that generated tables convert, whether item tables are
+        passed separately or merged.
+        """
+        tables = {
+            name: txt_parser.parse(table.path)
+            for name, table in write_txt_tables(tmp_path).items()
+        }
+        item_types = load_item_types(tables["ItemTypes"])
+        assert len(item_types) == len(tables["ItemTypes"].records)
+
+        parts = [tables["Weapons"], tables["Armor"], tables["Misc"]]
+        items = load_items(parts, item_types)
+        assert len(items) == sum(len(p.records) for p in parts)
+        merged = load_items([merge_item_tables(tables)], item_types)
+        assert merged == items
+
+
+ITEM_TYPE_STUB = Diablo2ItemType(
+    "Stub", "stub", None, None, False, None, None, None, None, False, False,
+    False, False, False, False, 0, 0, 0, None, None, None,
+)  # fmt: skip
+
+
+@dataclass
+class LevelStub:
+    """
+    A dataclass for testing custom schema targets.
+    """
+
+    code: str
+    level: int
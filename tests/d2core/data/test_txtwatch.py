@@ -0,0 +1,140 @@
+"""
+``tests.d2core.data.test_txtwatch``
+===================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtwatch`.
+"""
+
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtFile, Diablo2TxtSource
+from d2lfg.d2core.data.txtdiff import Diablo2TxtTableDiff
+from d2lfg.d2core.data.txtwatch import Diablo2TxtTableHandle
+
+
+@pytest.fixture
+def txt_path(tmp_path: Path) -> Path:
+    """
+    Path to a small .txt file that tests may modify.
+    """
+    path = tmp_path / "Weapons.txt"
+    path.write_text("code\tlevel\r\naxe\t7\r\nhax\t3\r\n")
+    return path
+
+
+def touch_later(path: Path) -> None:
+    """
+    Moves the modification time of a file forward by one second.
+    """
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestDiablo2TxtTableHandle:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtwatch.Diablo2TxtTableHandle`.
+    """
+
+    def test_poll_unchanged_file(self, txt_path: Path) -> None:
+        """
+        Verifies that polling an unchanged file reports nothing.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+
+        assert handle.poll() is None
+        assert handle.table.column("code") == ["axe", "hax"]
+
+    def test_poll_changed_file_notifies(self, txt_path: Path) -> None:
+        """
+        Verifies that polling a changed file reloads it and notifies
+        subscribers of the changed rows.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+        seen: List[Diablo2TxtTableDiff] = list()
+        handle.subscribe(seen.append)
+
+        txt_path.write_text("code\tlevel\r\naxe\t8\r\nhax\t3\r\nwnd\t1\r\n")
+        diff = handle.poll()
+
+        assert diff is not None
+        assert seen == [diff]
+        assert list(diff.changed) == ["axe"]
+        assert list(diff.added) == ["wnd"]
+        assert handle.table.column("code") == ["axe", "hax", "wnd"]
+
+    def test_touched_but_unchanged_file(self, txt_path: Path) -> None:
+        """
+        Verifies that a file whose rows did not change is reloaded without
+        notifying subscribers.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+        seen: List[Diablo2TxtTableDiff] = list()
+        handle.subscribe(seen.append)
+
+        touch_later(txt_path)
+
+        assert handle.poll() is None
+        assert seen == []
+
+    def test_unsubscribe(self, txt_path: Path) -> None:
+        """
+        Verifies that unsubscribed callbacks are not called.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+        seen: List[Diablo2TxtTableDiff] = list()
+        unsubscribe = handle.subscribe(seen.append)
+        unsubscribe()
+
+        txt_path.write_text("code\tlevel\r\naxe\t7\r\n")
+
+        assert handle.poll() is not None
+        assert seen == []
+
+    def test_unsubscribe_twice(self, txt_path: Path) -> None:
+        """
+        Verifies that unsubscribing a second time does nothing, even when
+        the same callback is subscribed again.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+        seen: List[Diablo2TxtTableDiff] = list()
+        unsubscribe = handle.subscribe(seen.append)
+        handle.subscribe(seen.append)
+        unsubscribe()
+        unsubscribe()
+
+        txt_path.write_text("code\tlevel\r\naxe\t7\r\n")
+
+        assert handle.poll() is not None
+        assert len(seen) == 1
+
+    def test_failed_reload_is_retried(
+        self, txt_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Verifies that a change whose reload fails is reloaded by the next
+        poll, without the file changing again.
+        """
+        handle = Diablo2TxtTableHandle(txt_path, "code")
+        parse = handle.parser.parse
+
+        def fail_once(file: Diablo2TxtSource) -> Diablo2TxtFile:
+            monkeypatch.setattr(handle.parser, "parse", parse)
+            raise OSError("file is being written")
+
+        monkeypatch.setattr(handle.parser, "parse", fail_once)
+        txt_path.write_text("code\tlevel\r\naxe\t8\r\nhax\t3\r\n")
+
+        with pytest.raises(OSError):
+            handle.poll()
+        assert handle.table.column("level") == ["7", "3"]
+
+        diff = handle.poll()
+
+        assert diff is not None
+        assert list(diff.changed) == ["axe"]
+        assert handle.table.column("level") == ["8", "3"]
+        assert handle.poll() is None
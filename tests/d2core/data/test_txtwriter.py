@@ -0,0 +1,90 @@
+"""
+``tests.d2core.data.test_txtwriter``
+====================================
+
+This module contains tests for :py:mod:`d2lfg.d2core.data.txtwriter`.
+"""
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from d2lfg.d2core.data.txt import Diablo2TxtParser, Diablo2TxtRecord
+from d2lfg.d2core.data.txtwriter import Diablo2TxtWriter
+
+
+class TestDiablo2TxtWriter:
+    """
+    Tests :py:class:`~d2lfg.d2core.data.txtwriter.Diablo2TxtWriter`.
+    """
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_round_trip_is_byte_identical(
+        self, tmp_path: Path, weapons_txt_snippet_path: Path, use_mmap: bool
+    ) -> None:
+        """
+        Verifies that writing a parsed file reproduces it exactly.
+        """
+        parser = Diablo2TxtParser(skip_record=None, use_mmap=use_mmap)
+        path = tmp_path / "Weapons.txt"
+
+        count = Diablo2TxtWriter().write(parser.parse(weapons_txt_snippet_path), path)
+
+        assert count == 2
+        assert path.read_bytes() == weapons_txt_snippet_path.read_bytes()
+
+    def test_preserves_header_and_line_endings(self, tmp_path: Path) -> None:
+        """
+        Verifies that header case, duplicate column names, comment rows
+        and ``\\n`` line endings are written back unchanged.
+        """
+        original = tmp_path / "original.txt"
+        original.write_bytes(
+            b"Name\tCode\tcode\n" b"Axe\taxe\tx\n" b"Expansion\t\t\n" b"Wand\twnd\tw\n"
+        )
+        path = tmp_path / "written.txt"
+
+        txt_file = Diablo2TxtParser(skip_record=None).parse(original)
+        Diablo2TxtWriter(batch_size=1).write(txt_file, path)
+
+        assert txt_file.header == ["Name", "Code", "code"]
+        assert txt_file.newline == "\n"
+        assert path.read_bytes() == original.read_bytes()
+
+    def test_streams_records(self, weapons_txt_snippet_path: Path) -> None:
+        """
+        Verifies that records can be written straight from
+        :py:meth:`~d2lfg.d2core.data.txt.Diablo2TxtParser.iter_records`,
+        taking the header from the first record.
+        """
+        parser = Diablo2TxtParser(columns=["name", "code"])
+        io = StringIO()
+
+        count = Diablo2TxtWriter().write_records(
+            parser.iter_records(weapons_txt_snippet_path), io
+        )
+
+        assert count == 2
+        assert io.getvalue() == "name\tcode\r\nHand Axe\thax\r\nAxe\taxe\r\n"
+
+    def test_explicit_header(self) -> None:
+        """
+        Verifies that a given header and line ending are used.
+        """
+        records = [Diablo2TxtRecord({"name": 0}, ["Axe"])]
+        io = StringIO()
+
+        Diablo2TxtWriter().write_records(records, io, ["Name"], "\n")
+
+        assert io.getvalue() == "Name\nAxe\n"
+
+    def test_no_records_or_header_writes_nothing(self) -> None:
+        """
+        Verifies that an empty file is written back empty.
+        """
+        io = StringIO()
+        txt_file = Diablo2TxtParser().parse(StringIO(""))
+
+        assert Diablo2TxtWriter().write(txt_file, io) == 0
+        assert io.getvalue() == ""
@@ -0,0 +1,435 @@
+"""
+``testhelper.txtgen``
+=====================
+
+This module generates synthetic Diablo 2 .txt files for performance
+testing.
+
+Generated tables have the same columns as the vanilla ``Weapons.txt``,
+``Armor.txt``, ``Misc.txt`` and ``ItemTypes.txt`` and roughly vanilla
+values: item codes are unique, ``type`` and ``type2`` refer to generated
+item types, flags are ``0``/``1``, and most other columns are small
+integers. Like the real files, they also contain comment rows (e.g.
+``Expansion`` with every other field empty) and a few incomplete rows,
+both of which :py:func:`~d2lfg.d2core.data.txt.skip_record` skips.
+
+Tables are generated at a multiple of their vanilla row count; see
+:py:data:`SCALES`. Generation is deterministic for a given seed.
+"""
+
+from pathlib import Path
+from random import Random
+import time
+import tracemalloc
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Union
+
+from d2lfg.d2core.d2types.bodyloc import Diablo2BodyLocs
+from d2lfg.d2core.d2types.playerclass import Diablo2PlayerClasses
+from d2lfg.d2core.data.txt import Diablo2TxtParser, Diablo2TxtRecord
+from d2lfg.d2core.data.txtwriter import Diablo2TxtWriter
+
+#: The multiples of vanilla size that performance tests are run at.
+SCALES = (1, 10, 100)
+
+#: The approximate number of data rows in each vanilla table.
+VANILLA_ROWS = {"Weapons": 306, "Armor": 202, "Misc": 172, "ItemTypes": 106}
+
+#: The tables that can be generated, in dependency order.
+TABLES = ("ItemTypes", "Weapons", "Armor", "Misc")
+
+#: The vendors that have columns in the item tables.
+_VENDORS = (
+    "Charsi",
+    "Gheed",
+    "Akara",
+    "Fara",
+    "Lysander",
+    "Drognan",
+    "Hralti",
+    "Alkor",
+    "Ormus",
+    "Elzix",
+    "Asheara",
+    "Cain",
+    "Halbu",
+    "Jamella",
+    "Larzuk",
+    "Drehya",
+    "Malah",
+)
+
+
+def _vendor_columns() -> List[str]:
+    """
+    Returns the vendor columns shared by the item tables.
+    """
+    columns: List[str] = list()
+    for vendor in _VENDORS:
+        columns.extend(
+            f"{vendor}{suffix}"
+            for suffix in ("Min", "Max", "MagicMin", "MagicMax", "MagicLvl")
+        )
+    # The vanilla files misspell this one.
+    columns[columns.index("HraltiMagicLvl")] = "HratliMagicLvl"
+    return columns
+
+
+def _columns(text: str) -> List[str]:
+    """
+    Splits a comma separated list of column names. Some column names
+    contain spaces, and ``Weapons.txt`` has a column with no name.
+
+    :param text: the column names, separated by commas
+    """
+    return [c.strip() for c in text.split(",")]
+
+
+_ITEM_TAIL = _columns(
+    "Source Art, Game Art, Transform, InvTrans, SkipName, NightmareUpgrade, "
+    "HellUpgrade"
+)
+
+#: The header of each table.
+COLUMNS: Dict[str, List[str]] = {
+    "ItemTypes": _columns(
+        "ItemType, Code, Equiv1, Equiv2, Repair, Body, BodyLoc1, BodyLoc2, "
+        "Shoots, Quiver, Throwable, Reload, ReEquip, AutoStack, Magic, Rare, "
+        "Normal, Charm, Gem, Beltable, MaxSock1, MaxSock25, MaxSock40, "
+        "TreasureClass, Rarity, StaffMods, CostFormula, Class, VarInvGfx, "
+        "InvGfx1, InvGfx2, InvGfx3, InvGfx4, InvGfx5, InvGfx6, StorePage, eol"
+    ),
+    "Weapons": _columns(
+        "name, type, type2, code, alternateGfx, namestr, version, compactsave, "
+        "rarity, spawnable, mindam, maxdam, 1or2handed, 2handed, 2handmindam, "
+        "2handmaxdam, minmisdam, maxmisdam, , rangeadder, speed, StrBonus, "
+        "DexBonus, reqstr, reqdex, durability, nodurability, level, levelreq, "
+        "cost, gamble cost, magic lvl, auto prefix, OpenBetaGfx, normcode, "
+        "ubercode, ultracode, wclass, 2handedwclass, component, hit class, "
+        "invwidth, invheight, stackable, minstack, maxstack, spawnstack, "
+        "flippyfile, invfile, uniqueinvfile, setinvfile, hasinv, gemsockets, "
+        "gemapplytype, special, useable, dropsound, dropsfxframe, usesound, "
+        "unique, transparent, transtbl, quivered, lightradius, belt, quest, "
+        "questdiffcheck, missiletype, durwarning, qntwarning, gemoffset, "
+        "bitfield1"
+    )
+    + _vendor_columns()
+    + _ITEM_TAIL
+    + _columns("Nameable, PermStoreItem"),
+    "Armor": _columns(
+        "name, version, compactsave, rarity, spawnable, minac, maxac, absorbs, "
+        "speed, reqstr, block, durability, nodurability, level, levelreq, cost, "
+        "gamble cost, code, namestr, magic lvl, auto prefix, alternategfx, "
+        "OpenBetaGfx, normcode, ubercode, ultracode, spelloffset, component, "
+        "invwidth, invheight, hasinv, gemsockets, gemapplytype, flippyfile, "
+        "invfile, uniqueinvfile, setinvfile, rArm, lArm, Torso, Legs, rSPad, "
+        "lSPad, useable, throwable, stackable, minstack, maxstack, type, type2, "
+        "dropsound, dropsfxframe, usesound, unique, transparent, transtbl, "
+        "quivered, lightradius, belt, quest, missiletype, durwarning, "
+        "qntwarning, mindam, maxdam, StrBonus, DexBonus, gemoffset, bitfield1"
+    )
+    + _vendor_columns()
+    + _ITEM_TAIL
+    + _columns("Nameable, PermStoreItem"),
+    "Misc": _columns(
+        "name, *name, szFlavorText, compactsave, version, level, levelreq, "
+        "rarity, spawnable, speed, nodurability, cost, gamble cost, code, "
+        "alternategfx, namestr, component, invwidth, invheight, hasinv, "
+        "gemsockets, gemapplytype, flippyfile, invfile, uniqueinvfile, special, "
+        "Transmogrify, TMogType, TMogMin, TMogMax, useable, throwable, type, "
+        "type2, dropsound, dropsfxframe, usesound, unique, transparent, "
+        "transtbl, lightradius, belt, autobelt, stackable, minstack, maxstack, "
+        "spawnstack, quest, questdiffcheck, missiletype, spellicon, pSpell, "
+        "state, cstate1, cstate2, len, stat1, calc1, stat2, calc2, stat3, "
+        "calc3, spelldesc, spelldescstr, spelldesccalc, durwarning, qntwarning, "
+        "gemoffset, BetterGem, bitfield1"
+    )
+    + _vendor_columns()
+    + _ITEM_TAIL
+    + _columns("mindam, maxdam, PermStoreItem, multibuy, Nameable"),
+}
+
+#: Columns that hold ``0``/``1`` flags.
+_FLAGS = frozenset(
+    c.casefold()
+    for c in _columns(
+        "spawnable, 1or2handed, 2handed, nodurability, stackable, hasinv, "
+        "useable, unique, transparent, quivered, belt, autobelt, Repair, Body, "
+        "Throwable, Reload, ReEquip, AutoStack, Magic, Rare, Normal, Charm, "
+        "Gem, Beltable, VarInvGfx, compactsave, SkipName, Nameable, "
+        "PermStoreItem, multibuy"
+    )
+)
+
+#: Columns that hold item codes.
+_ITEM_CODES = frozenset(["code", "normcode", "ubercode", "ultracode", "alternategfx"])
+
+#: Columns that hold free text.
+_TEXT = frozenset(
+    c.casefold()
+    for c in _columns(
+        "namestr, *name, szFlavorText, wclass, 2handedwclass, hit class, "
+        "flippyfile, invfile, uniqueinvfile, setinvfile, dropsound, usesound, "
+        "TreasureClass, InvGfx1, InvGfx2, InvGfx3, InvGfx4, InvGfx5, InvGfx6, "
+        "calc1, calc2, calc3, spelldescstr, CostFormula, auto prefix, "
+        "Source Art, Game Art"
+    )
+)
+
+_BODY_LOCS = sorted(b.code for b in Diablo2BodyLocs.all())
+_CLASSES = sorted(c.code for c in Diablo2PlayerClasses.all())
+_STORE_PAGES = ("weap", "armo", "misc", "")
+
+#: The share of rows that are comments.
+_COMMENT_RATE = 0.01
+
+#: The share of rows that are incomplete.
+_INCOMPLETE_RATE = 0.005
+
+
+class GeneratedTxtTable(NamedTuple):
+    """
+    A generated .txt file.
+    """
+
+    #: The path of the file.
+    path: Path
+
+    #: The number of rows in the file, not counting the header. This
+    #: includes comment and incomplete rows.
+    rows: int
+
+    #: The number of comment and incomplete rows, which
+    #: :py:func:`~d2lfg.d2core.data.txt.skip_record` skips.
+    skipped: int
+
+
+class ParseMeasurement(NamedTuple):
+    """
+    The cost of parsing a file.
+    """
+
+    #: The number of records parsed.
+    records: int
+
+    #: The time taken to parse the file, in seconds.
+    seconds: float
+
+    #: The peak memory allocated while parsing, in bytes.
+    peak_bytes: int
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        The parsing throughput.
+        """
+        return self.records / self.seconds if self.seconds else float("inf")
+
+
+def measure_parse(parser: Diablo2TxtParser, path: Path) -> ParseMeasurement:
+    """
+    Parses a file, measuring the time and peak memory it takes.
+
+    Memory is traced with :py:mod:`tracemalloc`, which slows parsing
+    down, so time is measured in a separate untraced parse.
+
+    :param parser: the parser to measure
+    :param path: the file to parse
+    """
+    start = time.perf_counter()
+    records = len(parser.parse(path).records)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        txt_file = parser.parse(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del txt_file
+    return ParseMeasurement(records, seconds, peak)
+
+
+def item_type_codes(scale: int) -> List[str]:
+    """
+    Returns the item type codes defined by a generated ``ItemTypes.txt``.
+
+    :param scale: the multiple of vanilla size
+    """
+    return [_code(i, "t") for i in range(VANILLA_ROWS["ItemTypes"] * scale)]
+
+
+def generate_rows(table: str, scale: int = 1, seed: int = 0) -> Iterator[Sequence[str]]:
+    """
+    Yields the rows of a generated table.
+
+    There are :py:data:`VANILLA_ROWS` times ``scale`` data rows. As in the
+    real files, comment and incomplete rows are mixed in between them.
+
+    :param table: one of :py:data:`TABLES`
+    :param scale: the multiple of vanilla size
+    :param seed: the random seed
+    """
+    rng = Random(f"{table};{scale};{seed}")
+    columns = COLUMNS[table]
+    types = item_type_codes(scale)
+    prefix = table[0].lower()
+
+    def row(i: int, code: str) -> List[str]:
+        if table == "ItemTypes":
+            return _item_type_row(rng, columns, f"Item Type {i}", code, types[:i])
+        return _item_row(rng, columns, f"{table} {i}", code, types)
+
+    for i in range(VANILLA_ROWS[table] * scale):
+        draw = rng.random()
+        if draw < _COMMENT_RATE:
+            yield ["Expansion"] + [""] * (len(columns) - 1)
+        elif draw < _COMMENT_RATE + _INCOMPLETE_RATE:
+            # Incomplete rows get codes no complete row uses.
+            yield row(i, _code(i, "z" + prefix))[: rng.randrange(1, len(columns))]
+        yield row(i, types[i] if table == "ItemTypes" else _code(i, prefix))
+
+
+def write_txt_table(
+    directory: Union[Path, str], table: str, scale: int = 1, seed: int = 0
+) -> GeneratedTxtTable:
+    """
+    Writes a generated table to ``<directory>/<table>.txt``.
+
+    :param directory: the directory to write to
+    :param table: one of :py:data:`TABLES`
+    :param scale: the multiple of vanilla size
+    :param seed: the random seed
+    """
+    path = Path(directory) / f"{table}.txt"
+    columns = COLUMNS[table]
+    fields = {c.casefold(): i for i, c in enumerate(columns)}
+    skipped = 0
+
+    def records() -> Iterable[Diablo2TxtRecord]:
+        nonlocal skipped
+        for row in generate_rows(table, scale, seed):
+            if len(row) < len(columns) or not any(row[1:]):
+                skipped += 1
+            yield Diablo2TxtRecord(fields, row)
+
+    rows = Diablo2TxtWriter().write_records(records(), path, columns)
+    return GeneratedTxtTable(path, rows, skipped)
+
+
+def write_txt_tables(
+    directory: Union[Path, str],
+    scale: int = 1,
+    seed: int = 0,
+    tables: Iterable[str] = TABLES,
+) -> Dict[str, GeneratedTxtTable]:
+    """
+    Writes generated tables to a directory, keyed by table name.
+
+    :param directory: the directory to write to; it must exist
+    :param scale: the multiple of vanilla size
+    :param seed: the random seed
+    :param tables: the tables to write
+    """
+    return {t: write_txt_table(directory, t, scale, seed) for t in tables}
+
+
+def _code(i: int, prefix: str) -> str:
+    """
+    Returns a unique code for the ``i``th row of a table.
+
+    :param i: the row number
+    :param prefix: a prefix that is unique to the table
+    """
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    code = ""
+    while True:
+        i, d = divmod(i, len(digits))
+        code = digits[d] + code
+        if i == 0:
+            break
+    return prefix + code.rjust(2, "0")
+
+
+def _item_row(
+    rng: Random, columns: Sequence[str], name: str, code: str, types: Sequence[str]
+) -> List[str]:
+    """
+    Returns a generated row of an item table.
+
+    :param rng: the random number generator
+    :param columns: the columns of the table
+    :param name: the item's name
+    :param code: the item's code
+    :param types: the item type codes to choose from
+    """
+    row: List[str] = list()
+    for column in columns:
+        c = column.casefold()
+        if c == "name":
+            row.append(name)
+        elif c in _ITEM_CODES:
+            row.append(code if c == "code" or rng.random() < 0.8 else "")
+        elif c == "type":
+            row.append(rng.choice(types))
+        elif c == "type2":
+            row.append(rng.choice(types) if rng.random() < 0.1 else "")
+        else:
+            row.append(_value(rng, c))
+    return row
+
+
+def _item_type_row(
+    rng: Random, columns: Sequence[str], name: str, code: str, parents: Sequence[str]
+) -> List[str]:
+    """
+    Returns a generated row of ``ItemTypes.txt``.
+
+    Parent types always come earlier in the file, so types never form
+    a cycle.
+
+    :param rng: the random number generator
+    :param columns: the columns of the table
+    :param name: the item type's name
+    :param code: the item type's code
+    :param parents: the item type codes defined before this row
+    """
+    row: List[str] = list()
+    for column in columns:
+        c = column.casefold()
+        if c == "itemtype":
+            row.append(name)
+        elif c == "code":
+            row.append(code)
+        elif c in ("equiv1", "equiv2", "shoots", "quiver"):
+            chance = 0.9 if c == "equiv1" else 0.1
+            row.append(rng.choice(parents) if parents and rng.random() < chance else "")
+        elif c in ("bodyloc1", "bodyloc2"):
+            row.append(rng.choice(_BODY_LOCS) if rng.random() < 0.3 else "")
+        elif c in ("staffmods", "class"):
+            row.append(rng.choice(_CLASSES) if rng.random() < 0.1 else "")
+        elif c == "storepage":
+            row.append(rng.choice(_STORE_PAGES))
+        elif c == "eol":
+            row.append("0")
+        else:
+            row.append(_value(rng, c))
+    return row
+
+
+def _value(rng: Random, column: str) -> str:
+    """
+    Returns a generated value for a column with no special meaning.
+
+    :param rng: the random number generator
+    :param column: the :py:meth:`~str.casefold` ed name of the column
+    """
+    if column in _FLAGS:
+        return "1" if rng.random() < 0.3 else "0"
+    if column in _TEXT:
+        return f"{column}{rng.randrange(100)}" if rng.random() < 0.5 else ""
+    draw = rng.random()
+    if draw < 0.4:
+        return ""
+    if draw < 0.6:
+        return "0"
+    return str(rng.randrange(1, 256))